@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
+
+from app.runtime import get_service
+from app.service import LottoService
+from app.services.results_export import MEDIA_TYPES, export_chunks, gzip_chunks
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/results")
+def export_results(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    player: str | None = None,
+    accept_encoding: str | None = Header(default=None),
+    service: LottoService = Depends(get_service),
+) -> StreamingResponse:
+    # A sync generator: Starlette pulls it from the threadpool, so the event loop
+    # keeps serving other requests while the export is read and encoded.
+    chunks = export_chunks(service.export_results(since=since, until=until, player=player), format)
+    headers = {"Content-Disposition": f'attachment; filename="results.{format}"', "Vary": "Accept-Encoding"}
+    if _accepts_gzip(accept_encoding):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format], headers=headers)
+
+
+def _accepts_gzip(accept_encoding: str | None) -> bool:
+    """``Accept-Encoding`` check per RFC 9110: ``q=0`` refuses a coding, ``*`` stands for unlisted ones."""
+    if not accept_encoding:
+        return False
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in weights:
+            return weights[coding] > 0
+    return False
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from pydantic import BaseModel, Field
 
-from app.api.errors import api_error
+from app.api.etags import etag_matches, not_modified
 from app.domain import DomainValidationError, GameEvent, GameEventType
-from app.runtime import service
+from app.runtime import get_service
+from app.service import LottoService
 
 router = APIRouter(prefix="/games", tags=["games"])
 
+# A settlement is final once written, so any cache may keep it for as long as it likes.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 
 class StartGameRequest(BaseModel):
     players: list[str] = Field(min_length=2)
@@ -20,54 +26,109 @@ class EventRequest(BaseModel):
     players: list[str] = Field(min_length=1)
 
 
+class CardRequest(BaseModel):
+    player: str
+    rows: list[list[int]]
+
+
+class DrawRequest(BaseModel):
+    # Stored in an SQLite INTEGER column, which is a signed 64-bit value.
+    seed: int = Field(ge=-(2**63), le=2**63 - 1)
+    numbers: list[int]
+    cards: list[CardRequest] = Field(min_length=1)
+
+
+class FinishedGameRequest(BaseModel):
+    players: list[str] = Field(min_length=2)
+    card_price_kopecks: int = Field(gt=0)
+    line_bonus_kopecks: int = Field(gt=0)
+    line_winners: list[str] = Field(default_factory=list)
+    card_winners: list[str] = Field(min_length=1)
+    finished_at: datetime | None = None
+
+
+class GamesBatchRequest(BaseModel):
+    games: list[FinishedGameRequest] = Field(min_length=1, max_length=10_000)
+
+
 @router.post("")
-def start_game(payload: StartGameRequest) -> dict[str, int]:
+def start_game(payload: StartGameRequest, service: LottoService = Depends(get_service)) -> dict[str, int]:
     try:
         game_id = service.start_game(
-            payload.players,
-            payload.card_price_kopecks,
-            payload.line_bonus_kopecks,
+            payload.players, payload.card_price_kopecks, payload.line_bonus_kopecks
         )
     except DomainValidationError as exc:
-        raise api_error(code="invalid_game", message=str(exc)) from exc
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return {"game_id": game_id}
 
 
+@router.post("/batch")
+def create_games_batch(
+    payload: GamesBatchRequest, service: LottoService = Depends(get_service)
+) -> dict[str, object]:
+    results = service.record_finished_games([game.model_dump() for game in payload.games])
+    return {
+        "created": sum(1 for result in results if "game_id" in result),
+        "failed": sum(1 for result in results if "error" in result),
+        "results": results,
+    }
+
+
 @router.post("/{game_id}/events/line")
-def add_line_event(game_id: int, payload: EventRequest) -> dict[str, str]:
+def add_line_event(
+    game_id: int, payload: EventRequest, service: LottoService = Depends(get_service)
+) -> dict[str, str]:
     try:
-        service.add_event(
-            game_id,
-            GameEvent(type=GameEventType.LINE_CLOSED, players=tuple(payload.players)),
-        )
+        service.add_event(game_id, GameEvent(event_type=GameEventType.LINE_CLOSED, player_ids=tuple(payload.players)))
     except DomainValidationError as exc:
-        raise api_error(code="invalid_event", message=str(exc)) from exc
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return {"status": "ok"}
 
 
 @router.post("/{game_id}/events/card")
-def add_card_event(game_id: int, payload: EventRequest) -> dict[str, str]:
+def add_card_event(
+    game_id: int, payload: EventRequest, service: LottoService = Depends(get_service)
+) -> dict[str, str]:
     try:
-        service.add_event(
-            game_id,
-            GameEvent(type=GameEventType.CARD_CLOSED, players=tuple(payload.players)),
+        service.add_event(game_id, GameEvent(event_type=GameEventType.CARD_CLOSED, player_ids=tuple(payload.players)))
+    except DomainValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"status": "ok"}
+
+
+@router.post("/{game_id}/draw")
+def record_draw(
+    game_id: int, payload: DrawRequest, service: LottoService = Depends(get_service)
+) -> dict[str, str]:
+    try:
+        service.record_draw(
+            game_id, payload.seed, payload.numbers, [card.model_dump() for card in payload.cards]
         )
     except DomainValidationError as exc:
-        raise api_error(code="invalid_event", message=str(exc)) from exc
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return {"status": "ok"}
 
 
 @router.post("/{game_id}/finish")
-def finish_game(game_id: int) -> dict[str, object]:
+def finish_game(game_id: int, service: LottoService = Depends(get_service)) -> dict[str, object]:
     try:
         return service.finish_game(game_id)
     except DomainValidationError as exc:
-        raise api_error(code="invalid_game_state", message=str(exc)) from exc
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.get("/{game_id}/settlement")
-def settlement(game_id: int) -> dict[str, object]:
+def settlement(
+    game_id: int,
+    if_none_match: str | None = Header(default=None),
+    service: LottoService = Depends(get_service),
+) -> Response:
     try:
-        return service.get_settlement(game_id)
+        settlement = service.get_settlement(game_id)
     except DomainValidationError as exc:
-        raise api_error(code="invalid_game_state", message=str(exc)) from exc
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    headers = {"ETag": settlement.etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(if_none_match, settlement.etag):
+        return not_modified(settlement.etag, headers)
+    return Response(content=settlement.body, media_type="application/json", headers=headers)
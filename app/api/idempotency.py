@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from typing import TYPE_CHECKING
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+if TYPE_CHECKING:
+    from app.idempotency import IdempotencyStore
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+MAX_KEY_LENGTH = 255
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+PROTECTED_PREFIXES = ("/games", "/sessions")
+
+
+class IdempotencyMiddleware:
+    """Honors ``Idempotency-Key`` on mutating game and session requests.
+
+    The first request with a key runs normally and its response is stored; a
+    retry with the same key and the same request gets the stored response back
+    without touching the game or the session again. A key reused for another
+    request is rejected with 422, and a retry that arrives while the first
+    attempt is still running gets 409 instead of running twice. Failed attempts
+    (5xx, a 409 conflict or an exception) are forgotten, so they can be retried.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in MUTATING_METHODS
+            or not scope["path"].startswith(PROTECTED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+        key = Headers(scope=scope).get(IDEMPOTENCY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _error(
+                400,
+                "idempotency_key_invalid",
+                f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters",
+            )(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        fingerprint = _fingerprint(scope, body)
+        store = scope["app"].state.runtime.idempotency
+        existing = await asyncio.to_thread(store.claim, key, fingerprint)
+        if existing is not None:
+            if existing.fingerprint != fingerprint:
+                response = _error(
+                    422,
+                    "idempotency_key_reused",
+                    "Idempotency-Key was already used for a different request",
+                )
+            elif existing.status_code is None:
+                response = _error(
+                    409,
+                    "idempotency_key_in_progress",
+                    "A request with this Idempotency-Key is still being processed",
+                    headers={"Retry-After": "1"},
+                )
+            else:
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": existing.status_code,
+                        "headers": [
+                            *((name.encode("latin-1"), value.encode("latin-1")) for name, value in existing.headers),
+                            (REPLAYED_HEADER.encode("latin-1"), b"true"),
+                        ],
+                    }
+                )
+                await send({"type": "http.response.body", "body": existing.body})
+                return
+            await response(scope, receive, send)
+            return
+
+        await self._run_once(scope, _replay_body(body, receive), send, store, key)
+
+    async def _run_once(
+        self, scope: Scope, receive: Receive, send: Send, store: IdempotencyStore, key: str
+    ) -> None:
+        start: Message = {}
+        chunks: list[bytes] = []
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            # Released even on cancellation: a key stuck "in progress" would answer every retry with 409.
+            # Shielded so that a second cancellation cannot abandon the write halfway.
+            await asyncio.shield(asyncio.to_thread(store.release, key))
+            raise
+        status_code = start.get("status", 500)
+        # A 409 asks the client to retry, so it must not be replayed to that retry.
+        if status_code >= 500 or status_code == 409:
+            await asyncio.to_thread(store.release, key)
+            return
+        headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in start.get("headers", [])]
+        await asyncio.to_thread(store.complete, key, status_code, headers, b"".join(chunks))
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+def _fingerprint(scope: Scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (scope["method"], scope["path"], scope.get("query_string", b"").decode("latin-1")):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _error(
+    status_code: int, code: str, message: str, *, headers: dict[str, str] | None = None
+) -> JSONResponse:
+    # Same shape as ``api_error`` responses raised from routes.
+    return JSONResponse(
+        {"detail": {"code": code, "message": message, "details": None}},
+        status_code=status_code,
+        headers=headers,
+    )
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from app.api.etags import etag_matches, not_modified
+from app.domain import GameSettings, build_transfers, calculate_net
+from app.runtime import get_session_events, get_session_views, get_sessions
+from app.session_events import SessionEventBroker, format_event, frame_event_id
+from app.session_history import SessionHistory
+from app.session_store import SessionConflictError, SessionStore
+from app.versioned_cache import VersionedCache
+
+router = APIRouter(prefix="/sessions", tags=["sessions"])
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+class SessionCreateRequest(BaseModel):
+    players: list[str] = Field(min_length=2)
+    card_price_kopecks: int = Field(gt=0)
+    line_bonus_kopecks: int = Field(gt=0)
+
+
+class SessionWinnersRequest(BaseModel):
+    players: list[str] = Field(min_length=1)
+
+
+class SessionGameRequest(BaseModel):
+    line_winners: list[str] = Field(default_factory=list)
+    card_winners: list[str] = Field(min_length=1)
+    start_next: bool = True
+
+
+def _kopecks_to_rubles(value: int) -> float:
+    return value / 100
+
+
+def _add_ruble_fields_to_transfers(transfers: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [
+        {
+            **transfer,
+            "amount_rub": _kopecks_to_rubles(transfer["amount_kopecks"]),
+        }
+        for transfer in transfers
+    ]
+
+
+def _add_ruble_fields_to_net(net: dict[str, int]) -> dict[str, float]:
+    return {player: _kopecks_to_rubles(amount) for player, amount in net.items()}
+
+
+def _history_entry_view(game_result: dict[str, Any]) -> dict[str, Any]:
+    return {
+        **game_result,
+        "net_rub": _add_ruble_fields_to_net(game_result["net"]),
+        "transfers_rub": _add_ruble_fields_to_transfers(game_result["transfers"]),
+    }
+
+
+def _session_public_view(
+    session: dict[str, Any],
+    *,
+    history_limit: int | None = None,
+    since_game_number: int | None = None,
+) -> dict[str, Any]:
+    history = session["history"]
+    page = history.window(limit=history_limit, since_game_number=since_game_number)
+    totals = history.totals()
+    return {
+        **session,
+        "card_price_rub": _kopecks_to_rubles(session["card_price_kopecks"]),
+        "line_bonus_rub": _kopecks_to_rubles(session["line_bonus_kopecks"]),
+        "history": [_history_entry_view(history.entry(position)) for position in page],
+        "summary": {
+            "games_count": len(history),
+            "last_game_number": history.game_numbers[-1] if len(history) else None,
+            "totals": totals,
+            "totals_rub": _add_ruble_fields_to_net(totals),
+        },
+    }
+
+
+@router.post("")
+def create_session(payload: SessionCreateRequest, sessions: SessionStore = Depends(get_sessions)) -> dict[str, Any]:
+    players = [player.strip() for player in payload.players if player.strip()]
+    if len(set(players)) < 2:
+        raise HTTPException(status_code=400, detail="at least two unique players required")
+
+    session = sessions.create(
+        {
+            "players": players,
+            "card_price_kopecks": payload.card_price_kopecks,
+            "line_bonus_kopecks": payload.line_bonus_kopecks,
+            "created_at": datetime.utcnow().isoformat(),
+            "active_game": {
+                "game_number": 1,
+                "line_winners": [],
+                "card_winners": [],
+            },
+            "history": SessionHistory(players),
+        }
+    )
+    return _session_public_view(session)
+
+
+@router.post("/{session_id}/line")
+def session_line(
+    session_id: int,
+    payload: SessionWinnersRequest,
+    sessions: SessionStore = Depends(get_sessions),
+    events: SessionEventBroker = Depends(get_session_events),
+) -> dict[str, Any]:
+    with sessions.locked(session_id):
+        session = _session_or_404(sessions, session_id, for_update=True)
+        winners = _validate_winners(session, payload.players)
+        session["active_game"]["line_winners"] = winners
+        _save_session(sessions, session)
+    _publish(
+        events,
+        session,
+        "line_winners_set",
+        {"game_number": session["active_game"]["game_number"], "players": winners},
+    )
+    return {"status": "ok", "line_winners": winners}
+
+
+@router.post("/{session_id}/card")
+def session_card(
+    session_id: int,
+    payload: SessionWinnersRequest,
+    sessions: SessionStore = Depends(get_sessions),
+    events: SessionEventBroker = Depends(get_session_events),
+) -> dict[str, Any]:
+    with sessions.locked(session_id):
+        session = _session_or_404(sessions, session_id, for_update=True)
+        winners = _validate_winners(session, payload.players)
+        session["active_game"]["card_winners"] = winners
+        _save_session(sessions, session)
+    _publish(
+        events,
+        session,
+        "card_winners_set",
+        {"game_number": session["active_game"]["game_number"], "players": winners},
+    )
+    return {"status": "ok", "card_winners": winners}
+
+
+@router.post("/{session_id}/finish")
+def finish_session_game(
+    session_id: int,
+    sessions: SessionStore = Depends(get_sessions),
+    events: SessionEventBroker = Depends(get_session_events),
+) -> dict[str, Any]:
+    with sessions.locked(session_id):
+        session = _session_or_404(sessions, session_id, for_update=True)
+        _finish_active_game(session)
+        _save_session(sessions, session)
+    result = _history_entry_view(session["history"].entry(-1))
+    _publish(events, session, "game_finished", result)
+    return result
+
+
+@router.post("/{session_id}/new-game")
+def new_game_in_session(
+    session_id: int,
+    sessions: SessionStore = Depends(get_sessions),
+    events: SessionEventBroker = Depends(get_session_events),
+) -> dict[str, Any]:
+    with sessions.locked(session_id):
+        session = _session_or_404(sessions, session_id, for_update=True)
+        _start_next_game(session)
+        _save_session(sessions, session)
+    _publish(events, session, "game_started", session["active_game"])
+    return session["active_game"]
+
+
+@router.post("/{session_id}/games")
+def record_session_game(
+    session_id: int,
+    payload: SessionGameRequest,
+    sessions: SessionStore = Depends(get_sessions),
+    events: SessionEventBroker = Depends(get_session_events),
+) -> dict[str, Any]:
+    with sessions.locked(session_id):
+        session = _session_or_404(sessions, session_id, for_update=True)
+        game = session["active_game"]
+        game["line_winners"] = _validate_winners(session, payload.line_winners, allow_empty=True)
+        game["card_winners"] = _validate_winners(session, payload.card_winners)
+        _finish_active_game(session)
+        if payload.start_next:
+            _start_next_game(session)
+        _save_session(sessions, session)
+
+    result = _history_entry_view(session["history"].entry(-1))
+    _publish(events, session, "game_finished", result)
+    if payload.start_next:
+        _publish(events, session, "game_started", session["active_game"])
+    return {"game": result, "active_game": session["active_game"], "version": session["version"]}
+
+
+@router.get("/{session_id}")
+def get_session(
+    session_id: int,
+    history_limit: int | None = Query(default=None, ge=0),
+    since_game_number: int | None = Query(default=None, ge=0),
+    if_none_match: str | None = Header(default=None),
+    sessions: SessionStore = Depends(get_sessions),
+    session_views: VersionedCache = Depends(get_session_views),
+) -> Response:
+    version = sessions.version(session_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="session not found")
+    etag = _session_etag(session_id, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, {"Cache-Control": "no-cache"})
+
+    # Only the full view is cached; pages are small and cheap to build.
+    paged = history_limit is not None or since_game_number is not None
+    body = None if paged else session_views.get(session_id, version)
+    if body is None:
+        session = _session_or_404(sessions, session_id)
+        version = session["version"]
+        etag = _session_etag(session_id, version)
+        body = JSONResponse(
+            _session_public_view(session, history_limit=history_limit, since_game_number=since_game_number)
+        ).body
+        if not paged:
+            session_views.put(session_id, version, body)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+@router.get("/{session_id}/events")
+async def session_event_stream(
+    session_id: int,
+    sessions: SessionStore = Depends(get_sessions),
+    events: SessionEventBroker = Depends(get_session_events),
+) -> StreamingResponse:
+    version = await asyncio.to_thread(sessions.version, session_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="session not found")
+
+    async def stream() -> AsyncIterator[str]:
+        subscription = events.subscribe(session_id)
+        sent_version = version
+        try:
+            yield format_event("ready", {"session_id": session_id, "version": version}, event_id=version)
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscription.queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except TimeoutError:
+                    # Events are only published in the worker that handled the change, so a change
+                    # made through another worker shows up here as a newer version in the database.
+                    stored_version = await asyncio.to_thread(sessions.version, session_id)
+                    if stored_version is None:
+                        return
+                    if stored_version != sent_version:
+                        sent_version = stored_version
+                        yield format_event("resync", {}, event_id=stored_version)
+                    else:
+                        yield ": keepalive\n\n"
+                    continue
+                sent_version = frame_event_id(frame) or sent_version
+                yield frame
+        finally:
+            events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _session_etag(session_id: int, version: int) -> str:
+    return f'"session-{session_id}-v{version}"'
+
+
+def _session_or_404(sessions: SessionStore, session_id: int, *, for_update: bool = False) -> dict[str, Any]:
+    session = sessions.get_for_update(session_id) if for_update else sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="session not found")
+    return session
+
+
+def _save_session(sessions: SessionStore, session: dict[str, Any]) -> None:
+    try:
+        sessions.save(session)
+    except SessionConflictError as exc:
+        raise HTTPException(status_code=409, detail="session was modified concurrently, retry") from exc
+
+
+def _publish(events: SessionEventBroker, session: dict[str, Any], event: str, data: dict[str, Any]) -> None:
+    events.publish(session["session_id"], event, data, event_id=session["version"])
+
+
+def _finish_active_game(session: dict[str, Any]) -> None:
+    game = session["active_game"]
+    if not game["card_winners"]:
+        raise HTTPException(status_code=400, detail="card winners are required before finish")
+    history = session["history"]
+    if len(history) and history.game_numbers[-1] == game["game_number"]:
+        raise HTTPException(status_code=400, detail="game already finished")
+
+    settings = GameSettings(
+        card_price_kopecks=session["card_price_kopecks"],
+        line_bonus_kopecks=session["line_bonus_kopecks"],
+    )
+    net = calculate_net(
+        players=session["players"],
+        settings=settings,
+        line_winners=game["line_winners"],
+        card_winners=game["card_winners"],
+    )
+    history.append(
+        game_number=game["game_number"],
+        line_winners=game["line_winners"],
+        card_winners=game["card_winners"],
+        net=net,
+        transfers=build_transfers(net),
+        finished_at=datetime.utcnow(),
+    )
+
+
+def _start_next_game(session: dict[str, Any]) -> None:
+    session["active_game"] = {
+        "game_number": len(session["history"]) + 1,
+        "line_winners": [],
+        "card_winners": [],
+    }
+
+
+def _validate_winners(session: dict[str, Any], winners: list[str], *, allow_empty: bool = False) -> list[str]:
+    players = session["history"].player_index
+    normalized = []
+    seen = set()
+    for winner in winners:
+        name = winner.strip()
+        if not name:
+            continue
+        if name not in players:
+            raise HTTPException(status_code=400, detail=f"unknown player: {name}")
+        if name not in seen:
+            seen.add(name)
+            normalized.append(name)
+
+    if not normalized and not allow_empty:
+        raise HTTPException(status_code=400, detail="at least one winner is required")
+    return normalized
@@ -1,20 +1,33 @@
 from __future__ import annotations
 
+import hashlib
+from collections.abc import Awaitable, Callable
 from typing import Literal
 
-from fastapi import APIRouter, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
+from fastapi.routing import APIRoute
+from starlette.types import Message, Receive
 
 from app.api.speech_schemas import SpeechInterpretRequest, SpeechInterpretResponse
+from app.runtime import (
+    get_command_parser,
+    get_settings,
+    get_speech_admission,
+    get_transcriber,
+    get_transcription_cache,
+    get_transcription_guard,
+)
 from app.services.command_parser import CommandParser, EventType, ParseStatus
 from app.services.transcription_service import (
+    AsyncTranscriptionProvider,
     TranscriptionConfigError,
+    TranscriptionProvider,
     TranscriptionProviderError,
-    transcribe_audio as default_transcribe_audio,
 )
-
-router = APIRouter(prefix="/speech", tags=["speech"])
-
-parser = CommandParser()
+from app.settings import Settings
+from app.speech_admission import SpeechAdmission, SpeechOverloaded
+from app.transcription_cache import TranscriptionCache
+from app.transcription_guard import ProviderCircuitOpen, TranscriptionGuard
 
 SUPPORTED_MIME_TYPES = {
     "audio/webm",
@@ -23,17 +36,54 @@ SUPPORTED_MIME_TYPES = {
     "audio/mp4",
     "audio/x-m4a",
 }
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Room for the multipart boundaries and part headers around an upload of the maximum size.
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+def _payload_too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Audio payload exceeds {max_bytes} bytes")
+
+
+def _limit_body(receive: Receive, max_body_bytes: int, max_upload_bytes: int) -> Receive:
+    received = 0
+
+    async def limited() -> Message:
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_body_bytes:
+                raise _payload_too_large(max_upload_bytes)
+        return message
+
+    return limited
 
 
+class UploadLimitRoute(APIRoute):
+    """Refuses a request body past ``speech_max_upload_bytes`` before it is parsed.
 
+    A declared ``Content-Length`` over the limit is a 413 up front; otherwise
+    the body is counted as it streams in and the 413 is raised as soon as it
+    goes over, so an oversized upload is never spooled whole.
+    """
 
-def _resolve_transcribe_audio():
-    try:
-        from app import main as main_module
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
 
-        return getattr(main_module, "transcribe_audio", default_transcribe_audio)
-    except Exception:
-        return default_transcribe_audio
+        async def limited_handler(request: Request) -> Response:
+            max_upload_bytes = get_settings(request).speech_max_upload_bytes
+            max_body_bytes = max_upload_bytes + FORM_OVERHEAD_BYTES
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > max_body_bytes:
+                raise _payload_too_large(max_upload_bytes)
+            receive = _limit_body(request.receive, max_body_bytes, max_upload_bytes)
+            return await handler(Request(request.scope, receive))
+
+        return limited_handler
+
+
+router = APIRouter(prefix="/speech", tags=["speech"], route_class=UploadLimitRoute)
 
 
 def _transcribe_missing_dependency_response() -> None:
@@ -43,25 +93,71 @@ def _transcribe_missing_dependency_response() -> None:
     )
 
 
+async def _hash_upload(file: UploadFile, max_bytes: int) -> tuple[str, int]:
+    """SHA-256 and size of the upload, read a chunk at a time; larger than ``max_bytes`` is a 413.
+
+    The multipart parser has already spooled the file (to disk past 1 MiB), so
+    it is only ever held here one chunk at a time and is rewound for the provider.
+    :class:`UploadLimitRoute` has capped the whole body; this is the exact limit
+    on the file itself.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise _payload_too_large(max_bytes)
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest(), size
+
+
 try:
     @router.post("/transcribe")
-    async def transcribe(file: UploadFile = File(...)) -> dict[str, str | float | None]:
+    async def transcribe(
+        file: UploadFile = File(...),
+        transcriber: TranscriptionProvider | AsyncTranscriptionProvider = Depends(get_transcriber),
+        admission: SpeechAdmission = Depends(get_speech_admission),
+        cache: TranscriptionCache = Depends(get_transcription_cache),
+        guard: TranscriptionGuard = Depends(get_transcription_guard),
+        settings: Settings = Depends(get_settings),
+    ) -> dict[str, str | float | None]:
         if file.content_type not in SUPPORTED_MIME_TYPES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported MIME type: {file.content_type}",
             )
 
-        data = await file.read()
-        if not data:
+        audio_sha256, size = await _hash_upload(file, settings.speech_max_upload_bytes)
+        if not size:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty audio payload")
 
         try:
-            result = _resolve_transcribe_audio()(
-                filename=file.filename or "audio",
-                content_type=file.content_type,
-                data=data,
+            # Identical audio is answered from the cache, or joins the call already in flight,
+            # without taking an admission slot. Each retry is admitted anew, so backoff holds no slot.
+            result = await cache.get_or_transcribe(
+                cache.key_for_digest(audio_sha256, provider=transcriber.name, model=getattr(transcriber, "model", "")),
+                lambda: guard.call(
+                    lambda: admission.run(
+                        transcriber.transcribe,
+                        filename=file.filename or "audio",
+                        content_type=file.content_type,
+                        data=file.file,
+                    )
+                ),
             )
+        except SpeechOverloaded as exc:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(exc),
+                headers={"Retry-After": str(exc.retry_after_seconds)},
+            ) from exc
+        except ProviderCircuitOpen as exc:
+            raise HTTPException(
+                status_code=exc.status_code,
+                detail=str(exc),
+                headers={"Retry-After": str(exc.retry_after_seconds)},
+            ) from exc
         except TranscriptionProviderError as exc:
             raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
         except TranscriptionConfigError as exc:
@@ -80,7 +176,10 @@ except RuntimeError:
 
 
 @router.post("/interpret", response_model=SpeechInterpretResponse)
-def interpret(payload: SpeechInterpretRequest) -> SpeechInterpretResponse:
+def interpret(
+    payload: SpeechInterpretRequest,
+    parser: CommandParser = Depends(get_command_parser),
+) -> SpeechInterpretResponse:
     parsed = parser.parse(payload.text, payload.players)
 
     intent: Literal["close_line", "close_card", "unknown"] = "unknown"
@@ -1,3 +1,11 @@
+from .draws import (
+    BARREL_COUNT,
+    DrawLog,
+    LottoCard,
+    ReplayOutcome,
+    draw_order,
+    replay_draws,
+)
 from .game import (
     DomainValidationError,
     GameEvent,
@@ -19,18 +27,24 @@ from .settlement import (
 )
 
 __all__ = [
+    "BARREL_COUNT",
     "DomainValidationError",
+    "DrawLog",
     "GameEvent",
     "GameEventType",
     "GameSettings",
     "GameState",
+    "LottoCard",
+    "ReplayOutcome",
     "SettlementResult",
     "apply_event",
     "build_transfers",
     "calculate_net",
     "calculate_settlement",
     "calculate_transfers",
+    "draw_order",
     "normalize_player",
+    "replay_draws",
     "settle",
     "settle_game",
     "unique_preserve_order",
@@ -0,0 +1,103 @@
+"""Deterministic draw order and card replay for the lotto game."""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from .game import DomainValidationError, normalize_player
+
+BARREL_COUNT = 90
+CARD_ROWS = 3
+NUMBERS_PER_ROW = 5
+
+_NOT_DRAWN = BARREL_COUNT + 1
+
+
+def draw_order(seed: int) -> list[int]:
+    """Full barrel order produced by ``seed``; a draw log is a prefix of it."""
+    numbers = list(range(1, BARREL_COUNT + 1))
+    random.Random(seed).shuffle(numbers)
+    return numbers
+
+
+@dataclass(frozen=True)
+class DrawLog:
+    seed: int
+    numbers: tuple[int, ...]
+
+    def __post_init__(self) -> None:
+        numbers = tuple(int(number) for number in self.numbers)
+        for number in numbers:
+            if not 1 <= number <= BARREL_COUNT:
+                raise DomainValidationError(f"draw number out of range: {number}")
+        if len(set(numbers)) != len(numbers):
+            raise DomainValidationError("draw numbers must be unique")
+        object.__setattr__(self, "numbers", numbers)
+
+    @classmethod
+    def from_seed(cls, seed: int, count: int = BARREL_COUNT) -> DrawLog:
+        return cls(seed=seed, numbers=tuple(draw_order(seed)[:count]))
+
+    def matches_seed(self) -> bool:
+        return list(self.numbers) == draw_order(self.seed)[: len(self.numbers)]
+
+
+@dataclass(frozen=True)
+class LottoCard:
+    player: str
+    rows: tuple[tuple[int, ...], ...]
+
+    def __post_init__(self) -> None:
+        rows = tuple(tuple(int(number) for number in row) for row in self.rows)
+        if len(rows) != CARD_ROWS or any(len(row) != NUMBERS_PER_ROW for row in rows):
+            raise DomainValidationError(f"card must have {CARD_ROWS} rows of {NUMBERS_PER_ROW} numbers")
+        numbers = [number for row in rows for number in row]
+        if any(not 1 <= number <= BARREL_COUNT for number in numbers):
+            raise DomainValidationError("card number out of range")
+        if len(set(numbers)) != len(numbers):
+            raise DomainValidationError("card numbers must be unique")
+        object.__setattr__(self, "player", normalize_player(self.player))
+        object.__setattr__(self, "rows", rows)
+
+
+@dataclass(frozen=True)
+class ReplayOutcome:
+    line_winners: tuple[str, ...]
+    card_winners: tuple[str, ...]
+    line_draw: int | None
+    card_draw: int | None
+
+
+def replay_draws(numbers: Sequence[int], cards: Iterable[LottoCard]) -> ReplayOutcome:
+    """Replay a draw log against issued cards.
+
+    The line goes to every player holding a card with a completed row at the
+    earliest draw where any row completes; the card goes to every player whose
+    card is fully covered at the earliest such draw. Draw positions are 1-based.
+    """
+    drawn_at = [_NOT_DRAWN] * (BARREL_COUNT + 1)
+    for position, number in enumerate(numbers, start=1):
+        drawn_at[number] = position
+
+    scored: list[tuple[str, int, int]] = []
+    for card in cards:
+        row_completions = [max(drawn_at[number] for number in row) for row in card.rows]
+        scored.append((card.player, min(row_completions), max(row_completions)))
+
+    line_draw = min((line for _, line, _ in scored), default=_NOT_DRAWN)
+    card_draw = min((full for _, _, full in scored), default=_NOT_DRAWN)
+    return ReplayOutcome(
+        line_winners=_players_at(scored, line_draw, index=1),
+        card_winners=_players_at(scored, card_draw, index=2),
+        line_draw=line_draw if line_draw != _NOT_DRAWN else None,
+        card_draw=card_draw if card_draw != _NOT_DRAWN else None,
+    )
+
+
+def _players_at(scored: list[tuple[str, int, int]], position: int, *, index: int) -> tuple[str, ...]:
+    if position == _NOT_DRAWN:
+        return ()
+    players = dict.fromkeys(entry[0] for entry in scored if entry[index] == position)
+    return tuple(players)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from app.repository import IdempotencyRow, LottoRepository
+
+DEFAULT_IDEMPOTENCY_TTL_SECONDS = 24 * 3600.0
+DEFAULT_IDEMPOTENCY_MAX_KEYS = 10_000
+# Longer than any game or session request takes; an in-progress key older than this was abandoned.
+DEFAULT_IDEMPOTENCY_LEASE_SECONDS = 30.0
+# Eviction scans the key index, so it runs once per this many new keys rather than on every request.
+EVICT_EVERY = 64
+
+
+class IdempotencyStore:
+    """Responses of mutating requests kept by their ``Idempotency-Key``.
+
+    Keys live in the database next to the state they protect, so a retry is
+    recognised by any worker. The table is bounded twice: keys older than
+    ``ttl_seconds`` are dropped, and beyond ``max_keys`` the oldest go first.
+    A key whose request is still in progress after ``lease_seconds`` is taken
+    to belong to a worker that died mid-request, and the next retry reclaims it.
+    """
+
+    def __init__(
+        self,
+        repo: LottoRepository,
+        *,
+        ttl_seconds: float = DEFAULT_IDEMPOTENCY_TTL_SECONDS,
+        max_keys: int = DEFAULT_IDEMPOTENCY_MAX_KEYS,
+        lease_seconds: float = DEFAULT_IDEMPOTENCY_LEASE_SECONDS,
+        wall_clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ) -> None:
+        if max_keys < 1:
+            raise ValueError("max_keys must be positive")
+        self.repo = repo
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self.lease_seconds = lease_seconds
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._claims = 0
+        self._replays = 0
+        self._conflicts = 0
+        self._evicted = 0
+
+    def claim(self, key: str, fingerprint: str) -> IdempotencyRow | None:
+        """``None`` if the caller should run the request, else the row already stored for ``key``."""
+        now = self._wall_clock()
+        existing = self.repo.claim_idempotency_key(
+            key,
+            fingerprint,
+            created_at=now.isoformat(),
+            expired_before=self._expired_before(now),
+            lease_expired_before=(now - timedelta(seconds=self.lease_seconds)).isoformat(),
+        )
+        with self._lock:
+            if existing is None:
+                self._claims += 1
+                evict = self._claims % EVICT_EVERY == 0
+            elif existing.fingerprint == fingerprint and existing.status_code is not None:
+                self._replays += 1
+                evict = False
+            else:
+                self._conflicts += 1
+                evict = False
+        if evict:
+            self.evict()
+        return existing
+
+    def complete(self, key: str, status_code: int, headers: list[tuple[str, str]], body: bytes) -> None:
+        self.repo.complete_idempotency_key(key, status_code, headers, body)
+
+    def release(self, key: str) -> None:
+        """Forget a key whose request failed, so that a retry runs it again."""
+        self.repo.release_idempotency_key(key)
+
+    def evict(self) -> int:
+        evicted = self.repo.evict_idempotency_keys(self._expired_before(self._wall_clock()), self.max_keys)
+        with self._lock:
+            self._evicted += evicted
+        return evicted
+
+    def _expired_before(self, now: datetime) -> str:
+        return (now - timedelta(seconds=self.ttl_seconds)).isoformat()
+
+    def metrics(self) -> dict[str, int | float]:
+        keys = self.repo.count_idempotency_keys()
+        with self._lock:
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "max_keys": self.max_keys,
+                "lease_seconds": self.lease_seconds,
+                "keys": keys,
+                "claims": self._claims,
+                "replays": self._replays,
+                "conflicts": self._conflicts,
+                "evicted": self._evicted,
+            }
@@ -1,96 +1,66 @@
 from __future__ import annotations
 
-from datetime import datetime
-from itertools import count
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
-from pydantic import BaseModel, Field
 
-from app.api.speech import router as speech_router
-from app.domain import DomainValidationError, GameEvent, GameEventType, GameSettings, build_transfers, calculate_net
-from app.repository import LottoRepository
-from app.service import LottoService
-from app.services.command_parser import CommandParser, EventType, ParseStatus
-
-
-class StartGameRequest(BaseModel):
-    players: list[str] = Field(min_length=2)
-    card_price_kopecks: int = Field(gt=0)
-    line_bonus_kopecks: int = Field(gt=0)
-
-
-class EventRequest(BaseModel):
-    players: list[str] = Field(min_length=1)
-
-
-class SessionCreateRequest(BaseModel):
-    players: list[str] = Field(min_length=2)
-    card_price_kopecks: int = Field(gt=0)
-    line_bonus_kopecks: int = Field(gt=0)
-
-
-class SessionWinnersRequest(BaseModel):
-    players: list[str] = Field(min_length=1)
-
-
-class SpeechInterpretRequest(BaseModel):
-    text: str
-    players: list[str] = Field(default_factory=list)
-
-
-repo = LottoRepository()
-service = LottoService(repo)
-command_parser = CommandParser()
-app = FastAPI(title="Lotto Game API")
-app.include_router(speech_router)
-
-session_counter = count(1)
-SESSIONS: dict[int, dict[str, Any]] = {}
-
-
-def _kopecks_to_rubles(value: int) -> float:
-    return value / 100
-
-
-def _add_ruble_fields_to_transfers(transfers: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    return [
-        {
-            **transfer,
-            "amount_rub": _kopecks_to_rubles(transfer["amount_kopecks"]),
-        }
-        for transfer in transfers
+from app.api.export import router as export_router
+from app.api.games import router as games_router
+from app.api.idempotency import IdempotencyMiddleware
+from app.api.sessions import router as sessions_router
+from app.api.stats import router as stats_router
+from app.runtime import Runtime, get_runtime
+from app.settings import Settings
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """Build the API for one process; repository and subsystems are created on first use."""
+    settings = settings or Settings.from_env()
+    app = FastAPI(title="Lotto Game API", lifespan=_lifespan)
+    app.state.runtime = Runtime(settings)
+    app.add_middleware(IdempotencyMiddleware)
+    app.add_api_route("/", frontend, methods=["GET"], response_class=HTMLResponse)
+    app.include_router(games_router)
+    app.include_router(stats_router)
+    app.include_router(export_router)
+    if settings.speech_enabled:
+        # Imported here so deployments without speech never load multipart parsing or its schemas.
+        from app.api.speech import router as speech_router
+
+        app.include_router(speech_router)
+    app.include_router(sessions_router)
+    app.add_api_route("/metrics", metrics, methods=["GET"])
+    return app
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    runtime = app.state.runtime
+    tasks = [
+        asyncio.create_task(worker.run())
+        for worker in (runtime.session_sweeper, runtime.stats_snapshot)
+        if worker.enabled
     ]
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await runtime.aclose()
 
 
-def _add_ruble_fields_to_net(net: dict[str, int]) -> dict[str, float]:
-    return {player: _kopecks_to_rubles(amount) for player, amount in net.items()}
-
-
-def _session_public_view(session: dict[str, Any]) -> dict[str, Any]:
-    history_with_rubles = []
-    for game_result in session["history"]:
-        history_with_rubles.append(
-            {
-                **game_result,
-                "net_rub": game_result.get("net_rub", _add_ruble_fields_to_net(game_result["net"])),
-                "transfers_rub": game_result.get(
-                    "transfers_rub",
-                    _add_ruble_fields_to_transfers(game_result["transfers"]),
-                ),
-            }
-        )
-
-    return {
-        **session,
-        "card_price_rub": _kopecks_to_rubles(session["card_price_kopecks"]),
-        "line_bonus_rub": _kopecks_to_rubles(session["line_bonus_kopecks"]),
-        "history": history_with_rubles,
-    }
+def metrics(request: Request) -> dict[str, Any]:
+    return get_runtime(request).metrics()
 
 
-@app.get("/", response_class=HTMLResponse)
 def frontend() -> str:
     return """
 <!doctype html>
@@ -258,6 +228,9 @@ def frontend() -> str:
 let currentSessionId = null;
 let step = "line";
 let sessionPlayers = [];
+let lastGameNumber = 0;
+let lineWinners = [];
+let sessionEvents = null;
 
 function selectedPlayers() {
   const selected = [...document.querySelectorAll('input[name="winner"]:checked')].map(el => el.value);
@@ -296,77 +269,92 @@ function formatFinishedAt(isoValue) {
   return parsed.toLocaleString("ru-RU");
 }
 
+function renderGameRow(game) {
+  const netEntries = Object.entries(game.net || {})
+    .map(([player, value]) => `<div><strong>${escapeHtml(player)}</strong>: <span class="${moneyClass(value)}">${formatRub(value)}</span></div>`)
+    .join("");
+  return `
+    <tr>
+      <td class="num">${escapeHtml(game.game_number)}</td>
+      <td>${escapeHtml((game.line_winners || []).join(", ") || "—")}</td>
+      <td>${escapeHtml((game.card_winners || []).join(", ") || "—")}</td>
+      <td>${netEntries || "—"}</td>
+      <td>${escapeHtml(formatFinishedAt(game.finished_at))}</td>
+    </tr>
+  `;
+}
+
+function resetHistory() {
+  lastGameNumber = 0;
+  document.getElementById("history").innerHTML = '<p class="friendly-state">Пока нет завершенных игр</p>';
+}
+
+function watchSession(sessionId) {
+  if (sessionEvents) sessionEvents.close();
+  sessionEvents = new EventSource(`/sessions/${sessionId}/events`);
+  sessionEvents.addEventListener("game_finished", () => refreshHistory());
+  sessionEvents.addEventListener("resync", () => {
+    resetHistory();
+    refreshHistory();
+  });
+}
+
 async function refreshHistory() {
   if (!currentSessionId) return;
-  const res = await fetch(`/sessions/${currentSessionId}`);
+  const res = await fetch(`/sessions/${currentSessionId}?since_game_number=${lastGameNumber}`);
   const data = await res.json();
   const historyRoot = document.getElementById("history");
-  const games = Array.isArray(data.history) ? data.history : [];
-  const playerBalances = Object.fromEntries((data.players || []).map((player) => [player, 0]));
-
-  for (const game of games) {
-    const net = game.net || {};
-    for (const [player, value] of Object.entries(net)) {
-      playerBalances[player] = (playerBalances[player] || 0) + Number(value || 0);
-    }
-  }
+  // Guards against overlapping refreshes (own action + pushed event) appending twice.
+  const games = (Array.isArray(data.history) ? data.history : []).filter((game) => game.game_number > lastGameNumber);
+  const summary = data.summary || {};
 
-  if (!games.length) {
-    historyRoot.innerHTML = '<p class="friendly-state">Пока нет завершенных игр</p>';
+  if (!summary.games_count) {
     return;
   }
 
-  const gameRows = games.map((game) => {
-    const netEntries = Object.entries(game.net || {})
-      .map(([player, value]) => `<div><strong>${escapeHtml(player)}</strong>: <span class="${moneyClass(value)}">${formatRub(value)}</span></div>`)
-      .join("");
-    return `
-      <tr>
-        <td class="num">${escapeHtml(game.game_number)}</td>
-        <td>${escapeHtml((game.line_winners || []).join(", ") || "—")}</td>
-        <td>${escapeHtml((game.card_winners || []).join(", ") || "—")}</td>
-        <td>${netEntries || "—"}</td>
-        <td>${escapeHtml(formatFinishedAt(game.finished_at))}</td>
-      </tr>
+  if (!document.getElementById("historyRows")) {
+    historyRoot.innerHTML = `
+      <section>
+        <h3>История игр</h3>
+        <table>
+          <thead>
+            <tr>
+              <th>№ игры</th>
+              <th>Победители линии</th>
+              <th>Победители карты</th>
+              <th>Net (₽)</th>
+              <th>Завершена</th>
+            </tr>
+          </thead>
+          <tbody id="historyRows"></tbody>
+        </table>
+      </section>
+      <section>
+        <h3>Текущий баланс</h3>
+        <table>
+          <thead>
+            <tr>
+              <th>Игрок</th>
+              <th>Баланс (₽)</th>
+            </tr>
+          </thead>
+          <tbody id="balanceRows"></tbody>
+        </table>
+      </section>
     `;
-  }).join("");
+  }
 
-  const balanceRows = Object.entries(playerBalances).map(([player, value]) => `
+  if (games.length) {
+    document.getElementById("historyRows").insertAdjacentHTML("beforeend", games.map(renderGameRow).join(""));
+    lastGameNumber = games[games.length - 1].game_number;
+  }
+
+  document.getElementById("balanceRows").innerHTML = Object.entries(summary.totals || {}).map(([player, value]) => `
       <tr>
         <td>${escapeHtml(player)}</td>
         <td class="num ${moneyClass(value)}">${formatRub(value)}</td>
       </tr>
     `).join("");
-
-  historyRoot.innerHTML = `
-    <section>
-      <h3>История игр</h3>
-      <table>
-        <thead>
-          <tr>
-            <th>№ игры</th>
-            <th>Победители линии</th>
-            <th>Победители карты</th>
-            <th>Net (₽)</th>
-            <th>Завершена</th>
-          </tr>
-        </thead>
-        <tbody>${gameRows}</tbody>
-      </table>
-    </section>
-    <section>
-      <h3>Текущий баланс</h3>
-      <table>
-        <thead>
-          <tr>
-            <th>Игрок</th>
-            <th>Баланс (₽)</th>
-          </tr>
-        </thead>
-        <tbody>${balanceRows}</tbody>
-      </table>
-    </section>
-  `;
 }
 
 document.getElementById("createSessionForm").addEventListener("submit", async (e) => {
@@ -391,6 +379,8 @@ document.getElementById("createSessionForm").addEventListener("submit", async (e
   document.getElementById("gameFlow").classList.remove("hidden");
   document.getElementById("question").textContent = "Кто закрыл линию?";
   renderWinners(sessionPlayers);
+  resetHistory();
+  watchSession(currentSessionId);
   await refreshHistory();
 });
 
@@ -408,16 +398,17 @@ document.getElementById("confirmStep").addEventListener("click", async () => {
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ players })
     });
+    lineWinners = players;
     step = "card";
     document.getElementById("question").textContent = "Кто закрыл карту?";
     renderWinners(sessionPlayers);
   } else {
-    await fetch(`/sessions/${currentSessionId}/card`, {
+    await fetch(`/sessions/${currentSessionId}/games`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ players })
+      body: JSON.stringify({ line_winners: lineWinners, card_winners: players, start_next: false })
     });
-    await fetch(`/sessions/${currentSessionId}/finish`, { method: "POST" });
+    lineWinners = [];
     step = "line";
     document.getElementById("question").textContent = "Игра завершена. Начните новую игру в сессии";
   }
@@ -428,206 +419,25 @@ document.getElementById("confirmStep").addEventListener("click", async () => {
 document.getElementById("newGame").addEventListener("click", async () => {
   if (!currentSessionId) return;
   await fetch(`/sessions/${currentSessionId}/new-game`, { method: "POST" });
+  lineWinners = [];
   step = "line";
   document.getElementById("question").textContent = "Кто закрыл линию?";
   renderWinners(sessionPlayers);
   await refreshHistory();
 });
+
+const watchedSessionId = new URLSearchParams(window.location.search).get("session");
+if (watchedSessionId) {
+  currentSessionId = Number(watchedSessionId);
+  document.getElementById("sessionInfo").textContent = `Наблюдение за сессией #${currentSessionId}`;
+  resetHistory();
+  watchSession(currentSessionId);
+  refreshHistory();
+}
 </script>
 </body>
 </html>
 """
 
 
-@app.post("/games")
-def start_game(payload: StartGameRequest) -> dict[str, int]:
-    try:
-        game_id = service.start_game(
-            payload.players, payload.card_price_kopecks, payload.line_bonus_kopecks
-        )
-    except DomainValidationError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return {"game_id": game_id}
-
-
-@app.post("/games/{game_id}/events/line")
-def add_line_event(game_id: int, payload: EventRequest) -> dict[str, str]:
-    try:
-        service.add_event(game_id, GameEvent(event_type=GameEventType.LINE_CLOSED, player_ids=tuple(payload.players)))
-    except DomainValidationError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return {"status": "ok"}
-
-
-@app.post("/games/{game_id}/events/card")
-def add_card_event(game_id: int, payload: EventRequest) -> dict[str, str]:
-    try:
-        service.add_event(game_id, GameEvent(event_type=GameEventType.CARD_CLOSED, player_ids=tuple(payload.players)))
-    except DomainValidationError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return {"status": "ok"}
-
-
-@app.post("/games/{game_id}/finish")
-def finish_game(game_id: int) -> dict[str, object]:
-    try:
-        return service.finish_game(game_id)
-    except DomainValidationError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-
-
-@app.get("/games/{game_id}/settlement")
-def settlement(game_id: int) -> dict[str, object]:
-    try:
-        return service.get_settlement(game_id)
-    except DomainValidationError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-
-
-@app.get("/stats/balance")
-def stats() -> dict[str, object]:
-    return service.get_stats()
-
-
-@app.post("/speech/interpret")
-def speech_interpret(payload: SpeechInterpretRequest) -> dict[str, object]:
-    parsed = command_parser.parse(payload.text, payload.players)
-
-    endpoint_map = {
-        EventType.CLOSE_LINE: "/games/{game_id}/events/line",
-        EventType.CLOSE_CARD: "/games/{game_id}/events/card",
-    }
-
-    if parsed.status is ParseStatus.OK:
-        return {
-            "raw_text": parsed.raw_text,
-            "normalized_text": parsed.normalized_text,
-            "intent": "close_line" if parsed.event_type is EventType.CLOSE_LINE else "close_card",
-            "confidence": parsed.confidence,
-            "player_id": parsed.player_name,
-            "event_endpoint": endpoint_map.get(parsed.event_type),
-            "errors": [],
-        }
-
-    return {
-        "raw_text": parsed.raw_text,
-        "normalized_text": parsed.normalized_text,
-        "intent": "unknown",
-        "confidence": None,
-        "player_id": None,
-        "event_endpoint": None,
-        "errors": [parsed.error] if parsed.error else [parsed.status.value],
-    }
-
-
-@app.post("/sessions")
-def create_session(payload: SessionCreateRequest) -> dict[str, Any]:
-    players = [player.strip() for player in payload.players if player.strip()]
-    if len(set(players)) < 2:
-        raise HTTPException(status_code=400, detail="at least two unique players required")
-
-    session_id = next(session_counter)
-    SESSIONS[session_id] = {
-        "session_id": session_id,
-        "players": players,
-        "card_price_kopecks": payload.card_price_kopecks,
-        "line_bonus_kopecks": payload.line_bonus_kopecks,
-        "created_at": datetime.utcnow().isoformat(),
-        "active_game": {
-            "game_number": 1,
-            "line_winners": [],
-            "card_winners": [],
-        },
-        "history": [],
-    }
-    return _session_public_view(SESSIONS[session_id])
-
-
-@app.post("/sessions/{session_id}/line")
-def session_line(session_id: int, payload: SessionWinnersRequest) -> dict[str, Any]:
-    session = _session_or_404(session_id)
-    winners = _validate_winners(session, payload.players)
-    session["active_game"]["line_winners"] = winners
-    return {"status": "ok", "line_winners": winners}
-
-
-@app.post("/sessions/{session_id}/card")
-def session_card(session_id: int, payload: SessionWinnersRequest) -> dict[str, Any]:
-    session = _session_or_404(session_id)
-    winners = _validate_winners(session, payload.players)
-    session["active_game"]["card_winners"] = winners
-    return {"status": "ok", "card_winners": winners}
-
-
-@app.post("/sessions/{session_id}/finish")
-def finish_session_game(session_id: int) -> dict[str, Any]:
-    session = _session_or_404(session_id)
-    game = session["active_game"]
-    if not game["card_winners"]:
-        raise HTTPException(status_code=400, detail="card winners are required before finish")
-
-    settings = GameSettings(
-        card_price_kopecks=session["card_price_kopecks"],
-        line_bonus_kopecks=session["line_bonus_kopecks"],
-    )
-    net = calculate_net(
-        players=session["players"],
-        settings=settings,
-        line_winners=game["line_winners"],
-        card_winners=game["card_winners"],
-    )
-    transfers = build_transfers(net)
-    result = {
-        "game_number": game["game_number"],
-        "line_winners": game["line_winners"],
-        "card_winners": game["card_winners"],
-        "net": net,
-        "transfers": transfers,
-        "net_rub": _add_ruble_fields_to_net(net),
-        "transfers_rub": _add_ruble_fields_to_transfers(transfers),
-        "finished_at": datetime.utcnow().isoformat(),
-    }
-    session["history"].append(result)
-    return result
-
-
-@app.post("/sessions/{session_id}/new-game")
-def new_game_in_session(session_id: int) -> dict[str, Any]:
-    session = _session_or_404(session_id)
-    next_number = len(session["history"]) + 1
-    session["active_game"] = {
-        "game_number": next_number,
-        "line_winners": [],
-        "card_winners": [],
-    }
-    return session["active_game"]
-
-
-@app.get("/sessions/{session_id}")
-def get_session(session_id: int) -> dict[str, Any]:
-    return _session_public_view(_session_or_404(session_id))
-
-
-def _session_or_404(session_id: int) -> dict[str, Any]:
-    session = SESSIONS.get(session_id)
-    if session is None:
-        raise HTTPException(status_code=404, detail="session not found")
-    return session
-
-
-def _validate_winners(session: dict[str, Any], winners: list[str]) -> list[str]:
-    normalized = []
-    seen = set()
-    for winner in winners:
-        name = winner.strip()
-        if not name:
-            continue
-        if name not in session["players"]:
-            raise HTTPException(status_code=400, detail=f"unknown player: {name}")
-        if name not in seen:
-            seen.add(name)
-            normalized.append(name)
-
-    if not normalized:
-        raise HTTPException(status_code=400, detail="at least one winner is required")
-    return normalized
+app = create_app()
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import sqlite3
+import threading
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
 
-from app.domain import GameEventType
+from app.domain import DrawLog, GameEventType, LottoCard
 
 
 @dataclass(slots=True)
@@ -19,11 +24,63 @@ class GameRow:
     finished_at: str | None
 
 
+@dataclass(slots=True)
+class FinishedGameRow:
+    players: list[str]
+    card_price_kopecks: int
+    line_bonus_kopecks: int
+    line_winners: list[str]
+    card_winners: list[str]
+    finished_at: str
+    net: dict[str, int]
+    transfers: list[dict[str, Any]]
+
+
+@dataclass(slots=True, frozen=True)
+class SettlementRow:
+    etag: str
+    body: bytes
+
+
+@dataclass(slots=True, frozen=True)
+class IdempotencyRow:
+    fingerprint: str
+    # ``None`` while the first request with this key is still running.
+    status_code: int | None
+    headers: list[tuple[str, str]]
+    body: bytes
+
+
 class LottoRepository:
-    def __init__(self, db_path: str = "lotto.db") -> None:
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self._create_tables()
+    def __init__(self, db_path: str = "lotto.db", *, read_only: bool = False) -> None:
+        """``read_only`` opens an existing database without creating it or its schema."""
+        self.db_path = db_path
+        self.read_only = read_only
+        # A sqlite3 connection must not be used by two threads at once, and
+        # handlers run in the threadpool: each thread gets its own connection.
+        self._local = threading.local()
+        self._version_lock = threading.Lock()
+        self._local_results_version = 0
+        if read_only:
+            # Opened now so that a missing file fails here rather than on the first query.
+            self.conn
+        else:
+            self._create_tables()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.read_only:
+                conn = sqlite3.connect(f"{Path(self.db_path).absolute().as_uri()}?mode=ro", uri=True)
+            else:
+                conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            if not self.read_only:
+                # WAL lets readers proceed while another thread or worker process writes.
+                conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
 
     def _create_tables(self) -> None:
         self.conn.executescript(
@@ -43,6 +100,45 @@ class LottoRepository:
                 net_kopecks INTEGER NOT NULL,
                 PRIMARY KEY (game_id, player)
             );
+            CREATE TABLE IF NOT EXISTS game_draws (
+                game_id INTEGER PRIMARY KEY,
+                seed INTEGER NOT NULL,
+                numbers_json TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS game_cards (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                game_id INTEGER NOT NULL,
+                player TEXT NOT NULL,
+                rows_json TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_game_cards_game_id ON game_cards(game_id);
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                state_json TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 1,
+                last_activity_at TEXT NOT NULL,
+                archived_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS ix_sessions_live_activity
+                ON sessions(last_activity_at) WHERE archived_at IS NULL;
+            CREATE TABLE IF NOT EXISTS settlements (
+                game_id INTEGER PRIMARY KEY,
+                body_json TEXT NOT NULL,
+                etag TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS idempotency_keys (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                status_code INTEGER,
+                headers_json TEXT NOT NULL DEFAULT '[]',
+                body BLOB NOT NULL DEFAULT x'',
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_idempotency_keys_created_at ON idempotency_keys(created_at);
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
             """
         )
         self.conn.commit()
@@ -62,15 +158,7 @@ class LottoRepository:
         row = self.conn.execute("SELECT * FROM games WHERE id = ?", (game_id,)).fetchone()
         if row is None:
             return None
-        return GameRow(
-            id=row["id"],
-            players=json.loads(row["players_json"]),
-            card_price_kopecks=row["card_price_kopecks"],
-            line_bonus_kopecks=row["line_bonus_kopecks"],
-            line_winners=json.loads(row["line_winners_json"]),
-            card_winners=json.loads(row["card_winners_json"]),
-            finished_at=row["finished_at"],
-        )
+        return _game_row(row)
 
     def append_winners(self, game_id: int, event_type: GameEventType, winners: list[str]) -> None:
         game = self.get_game(game_id)
@@ -89,18 +177,170 @@ class LottoRepository:
         )
         self.conn.commit()
 
+    def save_draw_log(self, game_id: int, draw: DrawLog, cards: list[LottoCard]) -> None:
+        """Store the draw log and issued cards of a game, replacing any recorded earlier."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO game_draws(game_id, seed, numbers_json) VALUES (?, ?, ?)",
+                (game_id, draw.seed, json.dumps(list(draw.numbers))),
+            )
+            self.conn.execute("DELETE FROM game_cards WHERE game_id = ?", (game_id,))
+            self.conn.executemany(
+                "INSERT INTO game_cards(game_id, player, rows_json) VALUES (?, ?, ?)",
+                [(game_id, card.player, json.dumps([list(row) for row in card.rows])) for card in cards],
+            )
+
+    def get_draw_logs(self, game_ids: list[int]) -> dict[int, tuple[DrawLog, list[LottoCard]]]:
+        """Draw log and cards, in issue order, of each of ``game_ids`` that has one."""
+        placeholders = ", ".join("?" * len(game_ids))
+        cards: dict[int, list[LottoCard]] = {}
+        for row in self.conn.execute(
+            f"SELECT game_id, player, rows_json FROM game_cards WHERE game_id IN ({placeholders}) ORDER BY id",
+            game_ids,
+        ):
+            rows = tuple(tuple(numbers) for numbers in json.loads(row["rows_json"]))
+            cards.setdefault(row["game_id"], []).append(LottoCard(player=row["player"], rows=rows))
+        draws = self.conn.execute(
+            f"SELECT game_id, seed, numbers_json FROM game_draws WHERE game_id IN ({placeholders})", game_ids
+        ).fetchall()
+        return {
+            row["game_id"]: (
+                DrawLog(seed=row["seed"], numbers=tuple(json.loads(row["numbers_json"]))),
+                cards.get(row["game_id"], []),
+            )
+            for row in draws
+        }
+
+    def get_drawn_finished_game_ids(self) -> list[int]:
+        rows = self.conn.execute(
+            """
+            SELECT d.game_id
+            FROM game_draws AS d
+            JOIN games AS g ON g.id = d.game_id
+            WHERE g.finished_at IS NOT NULL
+            ORDER BY d.game_id
+            """
+        ).fetchall()
+        return [row["game_id"] for row in rows]
+
+    def get_games(self, game_ids: list[int]) -> dict[int, GameRow]:
+        placeholders = ", ".join("?" * len(game_ids))
+        rows = self.conn.execute(f"SELECT * FROM games WHERE id IN ({placeholders})", game_ids).fetchall()
+        return {row["id"]: _game_row(row) for row in rows}
+
+    def get_results(self, game_ids: list[int]) -> dict[int, dict[str, int]]:
+        placeholders = ", ".join("?" * len(game_ids))
+        results: dict[int, dict[str, int]] = {}
+        for row in self.conn.execute(
+            f"SELECT game_id, player, net_kopecks FROM game_results WHERE game_id IN ({placeholders})", game_ids
+        ):
+            results.setdefault(row["game_id"], {})[row["player"]] = row["net_kopecks"]
+        return results
+
     def finish_game(self, game_id: int) -> None:
         finished_at = datetime.now(timezone.utc).isoformat()
         self.conn.execute("UPDATE games SET finished_at = ? WHERE id = ?", (finished_at, game_id))
         self.conn.commit()
 
-    def save_result(self, game_id: int, net: dict[str, int]) -> None:
+    def save_result(self, game_id: int, net: dict[str, int], transfers: list[dict[str, Any]]) -> None:
+        """Store the per-player results and the settlement ledger entry of a finished game."""
         self.conn.execute("DELETE FROM game_results WHERE game_id = ?", (game_id,))
         self.conn.executemany(
             "INSERT INTO game_results(game_id, player, net_kopecks) VALUES (?, ?, ?)",
             [(game_id, player, amount) for player, amount in net.items()],
         )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO settlements(game_id, body_json, etag) VALUES (?, ?, ?)",
+            _settlement_row(game_id, net, transfers),
+        )
+        _bump_counter(self.conn, RESULTS_COUNTER)
+        self.conn.commit()
+        self._results_changed()
+
+    def create_finished_games(self, games: list[FinishedGameRow]) -> list[int]:
+        """Insert finished games and their results in one transaction; returns the new ids."""
+        if not games:
+            return []
+        conn = self.conn
+        with conn:
+            # IMMEDIATE takes the write lock up front, so the id range below stays ours.
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT MAX(
+                    COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'games'), 0),
+                    COALESCE((SELECT MAX(id) FROM games), 0)
+                ) AS last_id
+                """
+            ).fetchone()
+            game_ids = list(range(row["last_id"] + 1, row["last_id"] + 1 + len(games)))
+            conn.executemany(
+                """
+                INSERT INTO games(
+                    id, players_json, card_price_kopecks, line_bonus_kopecks,
+                    line_winners_json, card_winners_json, finished_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        game_id,
+                        json.dumps(game.players, ensure_ascii=False),
+                        game.card_price_kopecks,
+                        game.line_bonus_kopecks,
+                        json.dumps(game.line_winners, ensure_ascii=False),
+                        json.dumps(game.card_winners, ensure_ascii=False),
+                        game.finished_at,
+                    )
+                    for game_id, game in zip(game_ids, games)
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO game_results(game_id, player, net_kopecks) VALUES (?, ?, ?)",
+                [
+                    (game_id, player, amount)
+                    for game_id, game in zip(game_ids, games)
+                    for player, amount in game.net.items()
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO settlements(game_id, body_json, etag) VALUES (?, ?, ?)",
+                [_settlement_row(game_id, game.net, game.transfers) for game_id, game in zip(game_ids, games)],
+            )
+            _bump_counter(conn, RESULTS_COUNTER)
+        self._results_changed()
+        return game_ids
+
+    def get_results_version(self) -> int:
+        """Stored results version, shared by every process using this database."""
+        row = self.conn.execute("SELECT value FROM counters WHERE name = ?", (RESULTS_COUNTER,)).fetchone()
+        return 0 if row is None else int(row["value"])
+
+    @property
+    def local_results_version(self) -> int:
+        """Number of result writes made through this repository; needs no database read."""
+        return self._local_results_version
+
+    def _results_changed(self) -> None:
+        with self._version_lock:
+            self._local_results_version += 1
+
+    def get_settlement(self, game_id: int) -> SettlementRow | None:
+        row = self.conn.execute(
+            "SELECT body_json, etag FROM settlements WHERE game_id = ?", (game_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return SettlementRow(etag=row["etag"], body=row["body_json"].encode("utf-8"))
+
+    def save_settlement(self, game_id: int, net: dict[str, int], transfers: list[dict[str, Any]]) -> SettlementRow:
+        """Ledger entry for a game finished before settlements were recorded; the first writer wins."""
+        self.conn.execute(
+            "INSERT OR IGNORE INTO settlements(game_id, body_json, etag) VALUES (?, ?, ?)",
+            _settlement_row(game_id, net, transfers),
+        )
         self.conn.commit()
+        return self.get_settlement(game_id)
 
     def get_result(self, game_id: int) -> dict[str, int]:
         rows = self.conn.execute(
@@ -119,6 +359,306 @@ class LottoRepository:
         ).fetchall()
         return {row["player"]: int(row["total"]) for row in rows}
 
+    def get_player_stats(self, player: str) -> dict[str, object]:
+        rows = self.conn.execute(
+            """
+            SELECT r.game_id, g.finished_at, r.net_kopecks, g.card_winners_json
+            FROM game_results AS r
+            JOIN games AS g ON g.id = r.game_id
+            WHERE r.player = ? AND g.finished_at IS NOT NULL
+            ORDER BY g.finished_at DESC, r.game_id DESC
+            """,
+            (player,),
+        ).fetchall()
+        history = [
+            {
+                "game_id": row["game_id"],
+                "finished_at": row["finished_at"],
+                "net_kopecks": row["net_kopecks"],
+                "card_closed": player in json.loads(row["card_winners_json"]),
+            }
+            for row in rows
+        ]
+        card_wins = sum(1 for game in history if game["card_closed"])
+        return {
+            "player": player,
+            "games_count": len(history),
+            "total_net_kopecks": sum(game["net_kopecks"] for game in history),
+            "win_rate": card_wins / len(history) if history else 0.0,
+            "history": history,
+        }
+
+    def get_player_summaries(self, *, since: str | None = None, until: str | None = None) -> dict[str, Any]:
+        """Per-player totals over games finished in ``[since, until)``; ISO dates or timestamps in UTC."""
+        conditions, params = _finished_between(since, until)
+        rows = self.conn.execute(
+            f"""
+            SELECT
+                r.player,
+                COUNT(*) AS games_count,
+                SUM(r.net_kopecks) AS total_net_kopecks,
+                MIN(r.net_kopecks) AS min_net_kopecks,
+                MAX(r.net_kopecks) AS max_net_kopecks,
+                SUM(EXISTS (SELECT 1 FROM json_each(g.card_winners_json) WHERE value = r.player)) AS card_wins
+            FROM game_results AS r
+            JOIN games AS g ON g.id = r.game_id
+            WHERE {" AND ".join(conditions)}
+            GROUP BY r.player
+            ORDER BY r.player
+            """,
+            params,
+        ).fetchall()
+        return {row["player"]: {key: row[key] for key in row.keys() if key != "player"} for row in rows}
+
+    def iter_results(
+        self,
+        *,
+        since: str | None = None,
+        until: str | None = None,
+        player: str | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[dict[str, Any]]:
+        """Per-player results of finished games in game order, fetched ``batch_size`` rows at a time.
+
+        ``since``/``until`` bound ``finished_at`` (inclusive/exclusive, UTC ISO strings). The
+        generator has its own read-only connection: it may be resumed on any thread and never
+        holds the per-thread connection that request handlers use.
+        """
+        conditions, params = _finished_between(since, until)
+        if player is not None:
+            conditions.append("r.player = ?")
+            params.append(player)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only = ON")
+            cursor = conn.execute(
+                f"""
+                SELECT
+                    g.id AS game_id,
+                    g.finished_at,
+                    r.player,
+                    r.net_kopecks,
+                    g.card_price_kopecks,
+                    g.line_bonus_kopecks,
+                    EXISTS (SELECT 1 FROM json_each(g.line_winners_json) WHERE value = r.player) AS line_closed,
+                    EXISTS (SELECT 1 FROM json_each(g.card_winners_json) WHERE value = r.player) AS card_closed
+                FROM game_results AS r
+                JOIN games AS g ON g.id = r.game_id
+                WHERE {" AND ".join(conditions)}
+                ORDER BY r.game_id, r.player
+                """,
+                params,
+            )
+            while rows := cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield {
+                        **dict(row),
+                        "line_closed": bool(row["line_closed"]),
+                        "card_closed": bool(row["card_closed"]),
+                    }
+        finally:
+            conn.close()
+
     def get_games_count(self) -> int:
         row = self.conn.execute("SELECT COUNT(*) AS c FROM games WHERE finished_at IS NOT NULL").fetchone()
         return int(row["c"])
+
+    def create_session(self, state: dict[str, Any], *, last_activity_at: str) -> int:
+        cur = self.conn.execute(
+            "INSERT INTO sessions(state_json, last_activity_at) VALUES (?, ?)",
+            (_dump_session_state(state), last_activity_at),
+        )
+        self.conn.commit()
+        return int(cur.lastrowid)
+
+    def get_session(self, session_id: int) -> dict[str, Any] | None:
+        """Live session state; archived sessions are treated as missing."""
+        row = self.conn.execute(
+            """
+            SELECT id, state_json, version, last_activity_at FROM sessions
+            WHERE id = ? AND archived_at IS NULL
+            """,
+            (session_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "session_id": row["id"],
+            **json.loads(row["state_json"]),
+            "version": row["version"],
+            "last_activity_at": row["last_activity_at"],
+        }
+
+    def get_session_version(self, session_id: int) -> int | None:
+        row = self.conn.execute(
+            "SELECT version FROM sessions WHERE id = ? AND archived_at IS NULL", (session_id,)
+        ).fetchone()
+        return None if row is None else int(row["version"])
+
+    def save_session(
+        self,
+        session_id: int,
+        state: dict[str, Any],
+        expected_version: int,
+        *,
+        last_activity_at: str,
+    ) -> bool:
+        """Compare-and-swap: write ``state`` only if the stored version is still ``expected_version``."""
+        cur = self.conn.execute(
+            """
+            UPDATE sessions SET state_json = ?, version = version + 1, last_activity_at = ?
+            WHERE id = ? AND version = ? AND archived_at IS NULL
+            """,
+            (_dump_session_state(state), last_activity_at, session_id, expected_version),
+        )
+        self.conn.commit()
+        return cur.rowcount == 1
+
+    def archive_idle_sessions(self, idle_before: str, limit: int) -> list[int]:
+        """Archive up to ``limit`` live sessions last touched before ``idle_before``; returns their ids.
+
+        Rows are kept with their state as is, so an active game stays unfinished.
+        """
+        with self.conn as conn:
+            rows = conn.execute(
+                """
+                UPDATE sessions SET archived_at = ?
+                WHERE id IN (
+                    SELECT id FROM sessions
+                    WHERE archived_at IS NULL AND last_activity_at < ?
+                    ORDER BY last_activity_at
+                    LIMIT ?
+                )
+                RETURNING id
+                """,
+                (datetime.now(timezone.utc).isoformat(), idle_before, limit),
+            ).fetchall()
+        return sorted(row["id"] for row in rows)
+
+    def count_sessions(self) -> dict[str, int]:
+        row = self.conn.execute(
+            "SELECT COUNT(*) - COUNT(archived_at) AS live, COUNT(archived_at) AS archived FROM sessions"
+        ).fetchone()
+        return {"live": int(row["live"]), "archived": int(row["archived"])}
+
+    def claim_idempotency_key(
+        self, key: str, fingerprint: str, *, created_at: str, expired_before: str, lease_expired_before: str
+    ) -> IdempotencyRow | None:
+        """Reserve ``key`` for a new request; returns the existing row instead if the key is taken.
+
+        ``created_at`` is the claim time. A row claimed before ``expired_before`` no longer counts
+        and is replaced, and so is one still in progress that was claimed before
+        ``lease_expired_before``: the worker running it died without completing or releasing it.
+        """
+        with self.conn as conn:
+            conn.execute(
+                """
+                DELETE FROM idempotency_keys
+                WHERE key = ? AND (created_at < ? OR (status_code IS NULL AND created_at < ?))
+                """,
+                (key, expired_before, lease_expired_before),
+            )
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO idempotency_keys(key, fingerprint, created_at) VALUES (?, ?, ?)",
+                (key, fingerprint, created_at),
+            )
+            if cur.rowcount == 1:
+                return None
+            row = conn.execute(
+                "SELECT fingerprint, status_code, headers_json, body FROM idempotency_keys WHERE key = ?", (key,)
+            ).fetchone()
+        return IdempotencyRow(
+            fingerprint=row["fingerprint"],
+            status_code=row["status_code"],
+            headers=[(name, value) for name, value in json.loads(row["headers_json"])],
+            body=bytes(row["body"]),
+        )
+
+    def complete_idempotency_key(
+        self, key: str, status_code: int, headers: list[tuple[str, str]], body: bytes
+    ) -> None:
+        self.conn.execute(
+            "UPDATE idempotency_keys SET status_code = ?, headers_json = ?, body = ? WHERE key = ?",
+            (status_code, json.dumps(headers, ensure_ascii=False), body, key),
+        )
+        self.conn.commit()
+
+    def release_idempotency_key(self, key: str) -> None:
+        self.conn.execute("DELETE FROM idempotency_keys WHERE key = ?", (key,))
+        self.conn.commit()
+
+    def evict_idempotency_keys(self, expired_before: str, max_rows: int) -> int:
+        """Drop expired keys, then the oldest ones beyond ``max_rows``; returns how many were removed."""
+        with self.conn as conn:
+            expired = conn.execute("DELETE FROM idempotency_keys WHERE created_at < ?", (expired_before,)).rowcount
+            overflow = conn.execute(
+                """
+                DELETE FROM idempotency_keys WHERE key IN (
+                    SELECT key FROM idempotency_keys ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (max_rows,),
+            ).rowcount
+        return expired + overflow
+
+    def count_idempotency_keys(self) -> int:
+        return int(self.conn.execute("SELECT COUNT(*) FROM idempotency_keys").fetchone()[0])
+
+
+_SESSION_COLUMNS = ("session_id", "version", "last_activity_at")
+
+RESULTS_COUNTER = "results"
+
+
+def _game_row(row: sqlite3.Row) -> GameRow:
+    return GameRow(
+        id=row["id"],
+        players=json.loads(row["players_json"]),
+        card_price_kopecks=row["card_price_kopecks"],
+        line_bonus_kopecks=row["line_bonus_kopecks"],
+        line_winners=json.loads(row["line_winners_json"]),
+        card_winners=json.loads(row["card_winners_json"]),
+        finished_at=row["finished_at"],
+    )
+
+
+def _settlement_row(game_id: int, net: dict[str, int], transfers: list[dict[str, Any]]) -> tuple[int, str, str]:
+    # Stored exactly as served (compact JSON, like FastAPI renders it), so a read is a single lookup.
+    body = json.dumps(
+        {"game_id": game_id, "net": net, "transfers": transfers},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    etag = f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+    return game_id, body, etag
+
+
+def _finished_between(since: str | None, until: str | None) -> tuple[list[str], list[Any]]:
+    # ISO strings in UTC order like the instants they name, so the range is a plain string comparison.
+    conditions = ["g.finished_at IS NOT NULL"]
+    params: list[Any] = []
+    if since is not None:
+        conditions.append("g.finished_at >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append("g.finished_at < ?")
+        params.append(until)
+    return conditions, params
+
+
+def _bump_counter(conn: sqlite3.Connection, name: str) -> None:
+    conn.execute(
+        """
+        INSERT INTO counters(name, value) VALUES (?, 1)
+        ON CONFLICT(name) DO UPDATE SET value = value + 1
+        """,
+        (name,),
+    )
+
+
+def _dump_session_state(state: dict[str, Any]) -> str:
+    return json.dumps(
+        {key: value for key, value in state.items() if key not in _SESSION_COLUMNS},
+        ensure_ascii=False,
+    )
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from datetime import date
+from functools import lru_cache
+from types import ModuleType
+from typing import Any
+
+from app.repository import LottoRepository
+
+DEFAULT_SNAPSHOT_INTERVAL_SECONDS = 300.0
+
+MAGIC = b"LOTTOCOL"
+FORMAT_VERSION = 1
+COLUMNS = ("game_id", "player_id", "net_kopecks", "finished_day", "card_closed")
+# magic, format version, column count, row count, results version, length of the players section
+_HEADER = struct.Struct("<8sIIQQQ")
+_ITEM = struct.calcsize("<q")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+logger = logging.getLogger(__name__)
+
+
+def day_number(value: date) -> int:
+    """Days since 1970-01-01, the unit of the ``finished_day`` column."""
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def build_snapshot(repo: LottoRepository, path: str) -> int:
+    """Write every finished result to ``path`` as fixed-width int64 columns; returns the row count.
+
+    The file is written to a temporary file of its own next to ``path`` and
+    renamed over it, so readers see either the old snapshot or the new one,
+    never a partial file, even when several workers rebuild at once.
+    """
+    # Read before the rows: a result written meanwhile makes the snapshot look stale, never fresher than it is.
+    results_version = repo.get_results_version()
+    player_ids: dict[str, int] = {}
+    columns = {name: array("q") for name in COLUMNS}
+    for row in repo.iter_results():
+        columns["game_id"].append(row["game_id"])
+        columns["player_id"].append(player_ids.setdefault(row["player"], len(player_ids)))
+        columns["net_kopecks"].append(row["net_kopecks"])
+        columns["finished_day"].append(day_number(date.fromisoformat(row["finished_at"][:10])))
+        columns["card_closed"].append(int(row["card_closed"]))
+
+    players = json.dumps(list(player_ids), ensure_ascii=False).encode("utf-8")
+    players += b" " * (-len(players) % _ITEM)  # keeps the columns 8-byte aligned for zero-copy views
+    rows = len(columns["game_id"])
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with open(fd, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(COLUMNS), rows, results_version, len(players)))
+            file.write(players)
+            for name in COLUMNS:
+                if sys.byteorder != "little":
+                    columns[name].byteswap()
+                columns[name].tofile(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    return rows
+
+
+class ResultsSnapshot:
+    """Read-only view of a snapshot file; columns are served straight from the mapping."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._stat = os.fstat(file.fileno())
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, column_count, rows, results_version, players_length = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != FORMAT_VERSION or column_count != len(COLUMNS):
+            self._mmap.close()
+            raise ValueError(f"{path} is not a results snapshot of format {FORMAT_VERSION}")
+        self.path = path
+        self.rows = rows
+        self.results_version = results_version
+        self.players: list[str] = json.loads(self._mmap[_HEADER.size : _HEADER.size + players_length])
+        self._columns_offset = _HEADER.size + players_length
+
+    def is_current_file(self) -> bool:
+        """False once a rebuild has replaced the file this snapshot maps."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns) == (self._stat.st_ino, self._stat.st_mtime_ns)
+
+    def column(self, name: str) -> Any:
+        """A NumPy array when NumPy is installed, otherwise a memoryview of int64 values."""
+        offset = self._columns_offset + COLUMNS.index(name) * self.rows * _ITEM
+        np = _numpy()
+        if np is not None:
+            return np.frombuffer(self._mmap, dtype="<i8", count=self.rows, offset=offset)
+        return memoryview(self._mmap)[offset : offset + self.rows * _ITEM].cast("q")
+
+    def player_summaries(self, *, since_day: int | None = None, until_day: int | None = None) -> dict[str, Any]:
+        """Per-player totals over games finished in ``[since_day, until_day)``."""
+        np = _numpy()
+        if np is None:
+            return self._player_summaries_python(since_day, until_day)
+
+        player_id = self.column("player_id")
+        net = self.column("net_kopecks")
+        card_closed = self.column("card_closed")
+        if since_day is not None or until_day is not None:
+            day = self.column("finished_day")
+            mask = np.ones(self.rows, dtype=bool)
+            if since_day is not None:
+                mask &= day >= since_day
+            if until_day is not None:
+                mask &= day < until_day
+            player_id, net, card_closed = player_id[mask], net[mask], card_closed[mask]
+
+        size = len(self.players)
+        games = np.bincount(player_id, minlength=size)
+        card_wins = np.bincount(player_id, weights=card_closed, minlength=size)
+        totals = np.zeros(size, dtype=np.int64)
+        np.add.at(totals, player_id, net)
+        lowest = np.full(size, np.iinfo(np.int64).max)
+        np.minimum.at(lowest, player_id, net)
+        highest = np.full(size, np.iinfo(np.int64).min)
+        np.maximum.at(highest, player_id, net)
+        return {
+            self.players[index]: _summary(
+                int(games[index]), int(totals[index]), int(lowest[index]), int(highest[index]), int(card_wins[index])
+            )
+            for index in sorted(np.flatnonzero(games), key=lambda index: self.players[index])
+        }
+
+    def _player_summaries_python(self, since_day: int | None, until_day: int | None) -> dict[str, Any]:
+        acc: dict[int, list[int]] = {}
+        columns = zip(
+            self.column("player_id"),
+            self.column("net_kopecks"),
+            self.column("finished_day"),
+            self.column("card_closed"),
+        )
+        for player_id, net, day, card_closed in columns:
+            if (since_day is not None and day < since_day) or (until_day is not None and day >= until_day):
+                continue
+            entry = acc.get(player_id)
+            if entry is None:
+                acc[player_id] = [1, net, net, net, card_closed]
+            else:
+                entry[0] += 1
+                entry[1] += net
+                entry[2] = min(entry[2], net)
+                entry[3] = max(entry[3], net)
+                entry[4] += card_closed
+        return {
+            self.players[player_id]: _summary(*entry)
+            for player_id, entry in sorted(acc.items(), key=lambda item: self.players[item[0]])
+        }
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+class SnapshotStats:
+    """Heavy per-player aggregates answered from the snapshot while it is up to date.
+
+    ``run`` rebuilds the file every ``interval_seconds`` once new results have
+    been written. Until then, or when no snapshot is configured, queries fall
+    back to SQL, so an answer is never older than the stored results.
+    """
+
+    def __init__(
+        self,
+        repo: LottoRepository,
+        path: str | None,
+        *,
+        interval_seconds: float = DEFAULT_SNAPSHOT_INTERVAL_SECONDS,
+    ) -> None:
+        self.repo = repo
+        self.path = path or None
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._snapshot: ResultsSnapshot | None = None
+        self._snapshot_queries = 0
+        self._sql_queries = 0
+        self._rebuilds = 0
+        self._failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None and self.interval_seconds > 0
+
+    def player_summaries(self, *, since: date | None = None, until: date | None = None) -> dict[str, Any]:
+        snapshot = self._open()
+        if snapshot is not None and snapshot.results_version == self.repo.get_results_version():
+            with self._lock:
+                self._snapshot_queries += 1
+            return snapshot.player_summaries(
+                since_day=None if since is None else day_number(since),
+                until_day=None if until is None else day_number(until),
+            )
+        with self._lock:
+            self._sql_queries += 1
+        return self.repo.get_player_summaries(
+            since=None if since is None else since.isoformat(),
+            until=None if until is None else until.isoformat(),
+        )
+
+    def rebuild(self) -> bool:
+        """Rewrite the snapshot if results changed since it was built; returns whether it did."""
+        if self.path is None:
+            return False
+        snapshot = self._open()
+        if snapshot is not None and snapshot.results_version == self.repo.get_results_version():
+            return False
+        build_snapshot(self.repo, self.path)
+        with self._lock:
+            self._rebuilds += 1
+        return True
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.rebuild)
+            except Exception:
+                logger.exception("results snapshot rebuild failed")
+                with self._lock:
+                    self._failures += 1
+            await asyncio.sleep(self.interval_seconds)
+
+    def _open(self) -> ResultsSnapshot | None:
+        if self.path is None:
+            return None
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.is_current_file():
+                return snapshot
+            # The previous mapping is left to the garbage collector: a query running on
+            # another thread may still be reading it.
+            try:
+                self._snapshot = ResultsSnapshot(self.path)
+            except (FileNotFoundError, ValueError):
+                self._snapshot = None
+            return self._snapshot
+
+    def metrics(self) -> dict[str, int | float | bool | None]:
+        snapshot = self._open()
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "numpy": _numpy() is not None,
+                "rows": None if snapshot is None else snapshot.rows,
+                "results_version": None if snapshot is None else snapshot.results_version,
+                "snapshot_queries": self._snapshot_queries,
+                "sql_queries": self._sql_queries,
+                "rebuilds": self._rebuilds,
+                "failures": self._failures,
+            }
+
+
+def _summary(games: int, total: int, lowest: int, highest: int, card_wins: int) -> dict[str, int]:
+    return {
+        "games_count": games,
+        "total_net_kopecks": total,
+        "min_net_kopecks": lowest,
+        "max_net_kopecks": highest,
+        "card_wins": card_wins,
+    }
+
+
+@lru_cache(maxsize=1)
+def _numpy() -> ModuleType | None:
+    # Optional: without NumPy the same columns are aggregated in pure Python.
+    try:
+        import numpy
+    except ModuleNotFoundError:
+        return None
+    return numpy
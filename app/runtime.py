@@ -1,9 +1,291 @@
 from __future__ import annotations
 
-from app.repository import LottoRepository
-from app.service import LottoService
-from app.services.command_parser import CommandParser
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, TypeVar
 
-repo = LottoRepository()
-service = LottoService(repo)
-command_parser = CommandParser()
+from fastapi import Request
+
+from app.settings import Settings
+
+if TYPE_CHECKING:
+    from app.idempotency import IdempotencyStore
+    from app.repository import LottoRepository
+    from app.results_snapshot import SnapshotStats
+    from app.service import LottoService
+    from app.services.command_parser import CommandParser
+    from app.services.transcription_service import AsyncTranscriptionProvider, TranscriptionProvider
+    from app.session_events import SessionEventBroker
+    from app.session_store import SessionStore
+    from app.session_sweeper import SessionSweeper
+    from app.speech_admission import SpeechAdmission
+    from app.stats_cache import StatsCache
+    from app.transcription_cache import TranscriptionCache
+    from app.transcription_guard import TranscriptionGuard
+    from app.versioned_cache import VersionedCache
+
+T = TypeVar("T")
+
+
+class Runtime:
+    """Objects shared by every request of one process, built on first use.
+
+    There is exactly one repository (one SQLite connection per thread) behind
+    the game service and the session store, and nothing is opened or imported
+    until a route actually needs it.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self._lock = threading.RLock()
+        self._objects: dict[str, Any] = {}
+
+    def _get(self, name: str, build: Callable[[], T]) -> T:
+        try:
+            return self._objects[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._objects:
+                self._objects[name] = build()
+            return self._objects[name]
+
+    @property
+    def repo(self) -> LottoRepository:
+        def build() -> LottoRepository:
+            from app.repository import LottoRepository
+
+            return LottoRepository(self.settings.db_path)
+
+        return self._get("repo", build)
+
+    @property
+    def service(self) -> LottoService:
+        def build() -> LottoService:
+            from app.service import LottoService
+
+            return LottoService(self.repo)
+
+        return self._get("service", build)
+
+    @property
+    def sessions(self) -> SessionStore:
+        def build() -> SessionStore:
+            from app.session_store import SessionStore
+
+            return SessionStore(
+                self.repo,
+                max_size=self.settings.session_cache_size,
+                ttl_seconds=self.settings.session_cache_ttl_seconds,
+                lock_stripes=self.settings.session_lock_stripes,
+            )
+
+        return self._get("sessions", build)
+
+    @property
+    def session_views(self) -> VersionedCache:
+        def build() -> VersionedCache:
+            from app.versioned_cache import VersionedCache
+
+            return VersionedCache(max_size=self.settings.session_cache_size)
+
+        return self._get("session_views", build)
+
+    @property
+    def session_events(self) -> SessionEventBroker:
+        def build() -> SessionEventBroker:
+            from app.session_events import SessionEventBroker
+
+            return SessionEventBroker()
+
+        return self._get("session_events", build)
+
+    @property
+    def session_sweeper(self) -> SessionSweeper:
+        def build() -> SessionSweeper:
+            from app.session_sweeper import SessionSweeper
+
+            return SessionSweeper(
+                self.sessions,
+                idle_ttl_seconds=self.settings.session_idle_ttl_seconds,
+                interval_seconds=self.settings.session_sweep_interval_seconds,
+                batch_size=self.settings.session_sweep_batch_size,
+            )
+
+        return self._get("session_sweeper", build)
+
+    @property
+    def command_parser(self) -> CommandParser:
+        def build() -> CommandParser:
+            from app.services.command_parser import CommandParser
+
+            return CommandParser()
+
+        return self._get("command_parser", build)
+
+    @property
+    def transcriber(self) -> TranscriptionProvider | AsyncTranscriptionProvider:
+        """Transcription provider selected by the settings, resolved once per process."""
+
+        def build() -> TranscriptionProvider | AsyncTranscriptionProvider:
+            from app.services.transcription_service import create_provider
+
+            return create_provider(self.settings.transcription_provider)
+
+        return self._get("transcriber", build)
+
+    @property
+    def speech_admission(self) -> SpeechAdmission:
+        def build() -> SpeechAdmission:
+            from app.speech_admission import SpeechAdmission
+
+            return SpeechAdmission(
+                max_concurrency=self.settings.speech_max_concurrency,
+                max_queue=self.settings.speech_max_queue,
+                retry_after_seconds=self.settings.speech_retry_after_seconds,
+            )
+
+        return self._get("speech_admission", build)
+
+    @property
+    def transcription_cache(self) -> TranscriptionCache:
+        def build() -> TranscriptionCache:
+            from app.transcription_cache import TranscriptionCache
+
+            return TranscriptionCache(
+                max_size=self.settings.transcription_cache_size,
+                directory=self.settings.transcription_cache_dir,
+                disk_max_entries=self.settings.transcription_cache_disk_max_entries,
+            )
+
+        return self._get("transcription_cache", build)
+
+    @property
+    def transcription_guard(self) -> TranscriptionGuard:
+        def build() -> TranscriptionGuard:
+            from app.transcription_guard import TranscriptionGuard
+
+            return TranscriptionGuard(
+                attempts=self.settings.transcription_retry_attempts,
+                budget_seconds=self.settings.transcription_retry_budget_seconds,
+                threshold=self.settings.transcription_breaker_threshold,
+                reset_seconds=self.settings.transcription_breaker_reset_seconds,
+            )
+
+        return self._get("transcription_guard", build)
+
+    @property
+    def stats_cache(self) -> StatsCache:
+        def build() -> StatsCache:
+            from app.stats_cache import StatsCache
+
+            return StatsCache(
+                self.repo,
+                max_size=self.settings.stats_cache_size,
+                shared=self.settings.stats_cache_shared,
+            )
+
+        return self._get("stats_cache", build)
+
+    @property
+    def stats_snapshot(self) -> SnapshotStats:
+        def build() -> SnapshotStats:
+            from app.results_snapshot import SnapshotStats
+
+            return SnapshotStats(
+                self.repo,
+                self.settings.stats_snapshot_path,
+                interval_seconds=self.settings.stats_snapshot_interval_seconds,
+            )
+
+        return self._get("stats_snapshot", build)
+
+    @property
+    def idempotency(self) -> IdempotencyStore:
+        def build() -> IdempotencyStore:
+            from app.idempotency import IdempotencyStore
+
+            return IdempotencyStore(
+                self.repo,
+                ttl_seconds=self.settings.idempotency_ttl_seconds,
+                max_keys=self.settings.idempotency_max_keys,
+                lease_seconds=self.settings.idempotency_lease_seconds,
+            )
+
+        return self._get("idempotency", build)
+
+    async def aclose(self) -> None:
+        """Release what built objects hold open, such as a provider's connection pool."""
+        for obj in list(self._objects.values()):
+            aclose = getattr(obj, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def metrics(self) -> dict[str, Any]:
+        metrics = {
+            "sessions": self.sessions.metrics(),
+            "session_sweeper": self.session_sweeper.metrics(),
+            "session_views": self.session_views.metrics(),
+            "session_events": self.session_events.metrics(),
+            "stats_cache": self.stats_cache.metrics(),
+            "stats_snapshot": self.stats_snapshot.metrics(),
+            "idempotency": self.idempotency.metrics(),
+        }
+        if self.settings.speech_enabled:
+            metrics["speech_admission"] = self.speech_admission.metrics()
+            metrics["transcription_cache"] = self.transcription_cache.metrics()
+            metrics["transcription_guard"] = self.transcription_guard.metrics()
+        return metrics
+
+
+def get_runtime(request: Request) -> Runtime:
+    return request.app.state.runtime
+
+
+def get_settings(request: Request) -> Settings:
+    return get_runtime(request).settings
+
+
+def get_service(request: Request) -> LottoService:
+    return get_runtime(request).service
+
+
+def get_sessions(request: Request) -> SessionStore:
+    return get_runtime(request).sessions
+
+
+def get_session_views(request: Request) -> VersionedCache:
+    return get_runtime(request).session_views
+
+
+def get_session_events(request: Request) -> SessionEventBroker:
+    return get_runtime(request).session_events
+
+
+def get_command_parser(request: Request) -> CommandParser:
+    return get_runtime(request).command_parser
+
+
+def get_transcriber(request: Request) -> TranscriptionProvider | AsyncTranscriptionProvider:
+    """Override in tests with ``app.dependency_overrides[get_transcriber]``."""
+    return get_runtime(request).transcriber
+
+
+def get_speech_admission(request: Request) -> SpeechAdmission:
+    return get_runtime(request).speech_admission
+
+
+def get_transcription_cache(request: Request) -> TranscriptionCache:
+    return get_runtime(request).transcription_cache
+
+
+def get_transcription_guard(request: Request) -> TranscriptionGuard:
+    return get_runtime(request).transcription_guard
+
+
+def get_stats_cache(request: Request) -> StatsCache:
+    return get_runtime(request).stats_cache
+
+
+def get_stats_snapshot(request: Request) -> SnapshotStats:
+    return get_runtime(request).stats_snapshot
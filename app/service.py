@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+from collections.abc import Iterator, Mapping, Sequence
+from datetime import datetime, timezone
+from typing import Any
+
 from app.domain import (
     DomainValidationError,
+    DrawLog,
     GameEvent,
     GameEventType,
     GameSettings,
+    GameState,
+    LottoCard,
+    apply_event,
     build_transfers,
     calculate_net,
     unique_preserve_order,
 )
-from app.storage.repository import LottoRepository
+from app.repository import FinishedGameRow, LottoRepository, SettlementRow
 
 
 class LottoService:
@@ -50,6 +58,23 @@ class LottoService:
 
         self.repo.append_winners(game_id, event.event_type, winners)
 
+    def record_draw(
+        self, game_id: int, seed: int, numbers: Sequence[int], cards: Sequence[Mapping[str, Any]]
+    ) -> None:
+        """Record the draw log and issued cards of a running game, for later replay by the draw verifier."""
+        game = self.repo.get_game(game_id)
+        if game is None:
+            raise DomainValidationError("game not found")
+        if game.finished_at is not None:
+            raise DomainValidationError("game already finished")
+
+        draw = DrawLog(seed=seed, numbers=tuple(numbers))
+        issued = [LottoCard(player=card["player"], rows=tuple(map(tuple, card["rows"]))) for card in cards]
+        for card in issued:
+            if card.player not in game.players:
+                raise DomainValidationError(f"unknown player: {card.player}")
+        self.repo.save_draw_log(game_id, draw, issued)
+
     def finish_game(self, game_id: int) -> dict[str, object]:
         game = self.repo.get_game(game_id)
         if game is None:
@@ -68,22 +93,50 @@ class LottoService:
             card_winners=game.card_winners,
         )
 
+        transfers = build_transfers(net)
         self.repo.finish_game(game_id)
-        self.repo.save_result(game_id, net)
+        self.repo.save_result(game_id, net, transfers)
         return {
             "game_id": game_id,
             "net": net,
-            "transfers": build_transfers(net),
+            "transfers": transfers,
         }
 
-    def get_settlement(self, game_id: int) -> dict[str, object]:
+    def record_finished_games(self, games: Sequence[Mapping[str, Any]]) -> list[dict[str, object]]:
+        """Validate and settle complete games, then store the valid ones in one transaction.
+
+        Returns one entry per input game, in order, with either the settlement or an error.
+        """
+        results: list[dict[str, object]] = []
+        accepted: list[tuple[int, FinishedGameRow]] = []
+        for index, game in enumerate(games):
+            try:
+                row = _settle_finished_game(game)
+            except DomainValidationError as exc:
+                results.append({"index": index, "error": str(exc)})
+                continue
+            accepted.append((len(results), row))
+            results.append({"index": index})
+
+        game_ids = self.repo.create_finished_games([row for _, row in accepted])
+        for (position, row), game_id in zip(accepted, game_ids):
+            results[position].update(game_id=game_id, net=row.net, transfers=row.transfers)
+        return results
+
+    def get_settlement(self, game_id: int) -> SettlementRow:
+        """Serialized settlement of a finished game from the ledger; it never changes once written."""
+        settlement = self.repo.get_settlement(game_id)
+        if settlement is not None:
+            return settlement
+
         game = self.repo.get_game(game_id)
         if game is None:
             raise DomainValidationError("game not found")
         result = self.repo.get_result(game_id)
         if not result:
             raise DomainValidationError("game is not finished")
-        return {"game_id": game_id, "net": result, "transfers": build_transfers(result)}
+        # Finished before the ledger existed: record it now so later reads are a single lookup.
+        return self.repo.save_settlement(game_id, result, build_transfers(result))
 
     def get_stats(self) -> dict[str, object]:
         games_count = self.repo.get_games_count()
@@ -95,3 +148,51 @@ class LottoService:
 
     def get_player_stats(self, name: str) -> dict[str, object]:
         return self.repo.get_player_stats(name)
+
+    def export_results(
+        self,
+        *,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        player: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        return self.repo.iter_results(since=_utc_iso(since), until=_utc_iso(until), player=player)
+
+
+def _settle_finished_game(game: Mapping[str, Any]) -> FinishedGameRow:
+    players = unique_preserve_order(game["players"])
+    if len(players) < 2:
+        raise DomainValidationError("at least 2 unique players required")
+    settings = GameSettings(
+        card_price_kopecks=game["card_price_kopecks"],
+        line_bonus_kopecks=game["line_bonus_kopecks"],
+    )
+    line_winners = unique_preserve_order(game.get("line_winners", []))
+    card_winners = unique_preserve_order(game.get("card_winners", []))
+
+    state = GameState(players=frozenset(players))
+    if line_winners:
+        state = apply_event(state, GameEvent(event_type=GameEventType.LINE_CLOSED, player_ids=tuple(line_winners)))
+    if card_winners:
+        apply_event(state, GameEvent(event_type=GameEventType.CARD_CLOSED, player_ids=tuple(card_winners)))
+
+    net = calculate_net(players=players, settings=settings, line_winners=line_winners, card_winners=card_winners)
+    return FinishedGameRow(
+        players=players,
+        card_price_kopecks=settings.card_price_kopecks,
+        line_bonus_kopecks=settings.line_bonus_kopecks,
+        line_winners=line_winners,
+        card_winners=card_winners,
+        finished_at=_utc_iso(game.get("finished_at") or datetime.now(timezone.utc)),
+        net=net,
+        transfers=build_transfers(net),
+    )
+
+
+def _utc_iso(value: datetime | None) -> str | None:
+    # Naive datetimes are taken as UTC, the zone ``finished_at`` is stored in.
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
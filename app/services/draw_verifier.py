@@ -0,0 +1,209 @@
+"""Replay recorded draw logs and cross-check stored winners and results.
+
+Usage::
+
+    python -m app.services.draw_verifier --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+
+from app.domain import (
+    DomainValidationError,
+    DrawLog,
+    GameSettings,
+    LottoCard,
+    calculate_net,
+    replay_draws,
+)
+from app.repository import LottoRepository
+
+DEFAULT_CHUNK_SIZE = 500
+
+_REPOS: dict[str, LottoRepository] = {}
+
+
+@dataclass(slots=True)
+class GameSnapshot:
+    game_id: int
+    players: list[str]
+    card_price_kopecks: int
+    line_bonus_kopecks: int
+    draw: DrawLog | None
+    cards: list[LottoCard]
+    line_winners: list[str]
+    card_winners: list[str]
+    net: dict[str, int]
+
+
+@dataclass(slots=True)
+class GameVerification:
+    game_id: int
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def verify_game(snapshot: GameSnapshot) -> GameVerification:
+    result = GameVerification(game_id=snapshot.game_id)
+    if snapshot.draw is None:
+        result.errors.append("draw log missing")
+        return result
+    if not snapshot.draw.matches_seed():
+        result.errors.append("draw numbers do not match seed")
+
+    unknown = sorted({card.player for card in snapshot.cards} - set(snapshot.players))
+    if unknown:
+        result.errors.append(f"cards issued to unknown players: {', '.join(unknown)}")
+
+    outcome = replay_draws(snapshot.draw.numbers, snapshot.cards)
+    if outcome.card_draw is None:
+        result.errors.append("no card is closed by the recorded draws")
+        return result
+    if len(snapshot.draw.numbers) > outcome.card_draw:
+        result.errors.append(f"draws continue after card closed at draw {outcome.card_draw}")
+
+    if set(outcome.line_winners) != set(snapshot.line_winners):
+        result.errors.append(
+            f"line winners mismatch: replay {list(outcome.line_winners)}, stored {snapshot.line_winners}"
+        )
+    card_winners = list(outcome.card_winners)
+    if set(card_winners) != set(snapshot.card_winners):
+        result.errors.append(f"card winners mismatch: replay {card_winners}, stored {snapshot.card_winners}")
+    else:
+        # Remainder kopecks go to card winners in recorded order.
+        card_winners = list(snapshot.card_winners)
+
+    try:
+        expected_net = calculate_net(
+            players=snapshot.players,
+            settings=GameSettings(
+                card_price_kopecks=snapshot.card_price_kopecks,
+                line_bonus_kopecks=snapshot.line_bonus_kopecks,
+            ),
+            line_winners=list(outcome.line_winners),
+            card_winners=card_winners,
+        )
+    except DomainValidationError as exc:
+        result.errors.append(f"cannot settle replayed game: {exc}")
+        return result
+
+    if expected_net != snapshot.net:
+        result.errors.append(f"net mismatch: replay {expected_net}, stored {snapshot.net}")
+    return result
+
+
+def load_snapshots(repo: LottoRepository, game_ids: Sequence[int]) -> list[GameSnapshot]:
+    """Load everything needed to verify ``game_ids`` with one query per table."""
+    ids = list(game_ids)
+    games = repo.get_games(ids)
+    draws = repo.get_draw_logs(ids)
+    nets = repo.get_results(ids)
+    return [
+        GameSnapshot(
+            game_id=game_id,
+            players=games[game_id].players,
+            card_price_kopecks=games[game_id].card_price_kopecks,
+            line_bonus_kopecks=games[game_id].line_bonus_kopecks,
+            draw=draws[game_id][0] if game_id in draws else None,
+            cards=draws[game_id][1] if game_id in draws else [],
+            line_winners=games[game_id].line_winners,
+            card_winners=games[game_id].card_winners,
+            net=nets.get(game_id, {}),
+        )
+        for game_id in ids
+        if game_id in games
+    ]
+
+
+def verify_games(
+    db_path: str,
+    game_ids: Sequence[int] | None = None,
+    *,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> list[GameVerification]:
+    """Verify games in chunks, spreading chunks across worker processes.
+
+    Without explicit ``game_ids`` every finished game with a draw log is checked.
+    """
+    if game_ids is None:
+        game_ids = _repo(db_path).get_drawn_finished_game_ids()
+
+    ids = list(game_ids)
+    chunks = [ids[start : start + chunk_size] for start in range(0, len(ids), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        return [result for chunk in chunks for result in _verify_chunk(db_path, chunk)]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        return [
+            result
+            for chunk_results in pool.map(_verify_chunk, repeat(db_path), chunks)
+            for result in chunk_results
+        ]
+
+
+def _verify_chunk(db_path: str, game_ids: Sequence[int]) -> list[GameVerification]:
+    snapshots = load_snapshots(_repo(db_path), game_ids)
+    found = {snapshot.game_id for snapshot in snapshots}
+    results = [verify_game(snapshot) for snapshot in snapshots]
+    results.extend(
+        GameVerification(game_id=game_id, errors=["game not found"]) for game_id in game_ids if game_id not in found
+    )
+    return results
+
+
+def _repo(db_path: str) -> LottoRepository:
+    # One repository per process: workers reuse its connection across chunks.
+    repo = _REPOS.get(db_path)
+    if repo is None:
+        repo = _REPOS[db_path] = LottoRepository(db_path, read_only=True)
+    return repo
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay draw logs and verify stored winners and results")
+    parser.add_argument("--db-path", default=os.getenv("LOTTO_DB_PATH", "lotto.db"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("game_ids", nargs="*", type=int)
+    args = parser.parse_args(argv)
+
+    # A mistyped path must not pass as a database with nothing to verify.
+    if not os.path.isfile(args.db_path):
+        print(f"database not found: {args.db_path}", file=sys.stderr)
+        return 2
+    try:
+        results = verify_games(
+            args.db_path,
+            args.game_ids or None,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+    except sqlite3.Error as exc:
+        print(f"cannot read {args.db_path}: {exc}", file=sys.stderr)
+        return 2
+    if not results:
+        print(f"no draw logs to verify in {args.db_path}", file=sys.stderr)
+        return 1
+    failed = [result for result in results if not result.ok]
+    for result in failed:
+        for message in result.errors:
+            print(f"game {result.game_id}: {message}")
+    print(f"verified {len(results)} games, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import os
+
+import httpx
+
+from app.services.openai_transcription import DEFAULT_BASE_URL, DEFAULT_MODEL, upstream_status_error
+from app.services.transcription_service import (
+    AudioData,
+    TranscriptionConfigError,
+    TranscriptionProviderError,
+    TranscriptionResult,
+)
+
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 5.0
+DEFAULT_READ_TIMEOUT_SECONDS = 60.0
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_SECONDS = 30.0
+
+
+class AsyncOpenAITranscriptionProvider:
+    """Whisper transcription over the OpenAI HTTP API without blocking the event loop.
+
+    One ``httpx.AsyncClient`` is kept for the life of the provider, so calls
+    reuse pooled keep-alive connections instead of a new TCP/TLS handshake
+    each time. Connecting, writing the upload, reading the response and
+    waiting for a pooled connection each have their own timeout.
+    """
+
+    name = "openai-async"
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None,
+        model: str = DEFAULT_MODEL,
+        base_url: str = DEFAULT_BASE_URL,
+        connect_timeout_seconds: float = DEFAULT_CONNECT_TIMEOUT_SECONDS,
+        read_timeout_seconds: float = DEFAULT_READ_TIMEOUT_SECONDS,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        keepalive_seconds: float = DEFAULT_KEEPALIVE_SECONDS,
+    ) -> None:
+        self.api_key = api_key
+        self.model = model
+        self.url = f"{base_url.rstrip('/')}/audio/transcriptions"
+        self.timeout = httpx.Timeout(
+            read_timeout_seconds,
+            connect=connect_timeout_seconds,
+            pool=connect_timeout_seconds,
+        )
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_seconds,
+        )
+        self._client: httpx.AsyncClient | None = None
+
+    @classmethod
+    def from_env(cls) -> AsyncOpenAITranscriptionProvider:
+        return cls(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            model=os.getenv("OPENAI_WHISPER_MODEL", DEFAULT_MODEL),
+            base_url=os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL),
+            read_timeout_seconds=float(os.getenv("OPENAI_TIMEOUT_SECONDS", DEFAULT_READ_TIMEOUT_SECONDS)),
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created on first use, inside the running loop the pool will belong to.
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    async def transcribe(self, *, filename: str, content_type: str, data: AudioData) -> TranscriptionResult:
+        if not self.api_key:
+            raise TranscriptionConfigError("OPENAI_API_KEY is not configured")
+        if not isinstance(data, bytes):
+            # httpx streams file objects in chunks; rewind so a retried call sends the whole file.
+            data.seek(0)
+
+        try:
+            response = await self.client.post(
+                self.url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                data={"model": self.model, "response_format": "verbose_json"},
+                files={"file": (filename, data, content_type)},
+            )
+        except httpx.TimeoutException as exc:
+            raise TranscriptionProviderError(
+                "Transcription provider timed out", status_code=504, retryable=True
+            ) from exc
+        except httpx.TransportError as exc:
+            raise TranscriptionProviderError(
+                f"Transcription provider unavailable: {exc}", status_code=503, retryable=True
+            ) from exc
+
+        if response.is_error:
+            raise upstream_status_error(response.status_code, response.text)
+        payload = response.json()
+        return TranscriptionResult(
+            text=payload.get("text", ""),
+            language=payload.get("language"),
+            duration_seconds=payload.get("duration"),
+            provider=self.name,
+        )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import uuid
+from collections.abc import Iterator
+from typing import BinaryIO
+from urllib import error, request
+
+from app.services.transcription_service import (
+    AudioData,
+    TranscriptionConfigError,
+    TranscriptionProviderError,
+    TranscriptionResult,
+)
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "whisper-1"
+DEFAULT_TIMEOUT_SECONDS = 60.0
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+
+class OpenAITranscriptionProvider:
+    """Whisper transcription over the OpenAI HTTP API."""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None,
+        model: str = DEFAULT_MODEL,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+    ) -> None:
+        self.api_key = api_key
+        self.model = model
+        self.url = f"{base_url.rstrip('/')}/audio/transcriptions"
+        self.timeout_seconds = timeout_seconds
+
+    @classmethod
+    def from_env(cls) -> OpenAITranscriptionProvider:
+        return cls(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            model=os.getenv("OPENAI_WHISPER_MODEL", DEFAULT_MODEL),
+            base_url=os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL),
+        )
+
+    def transcribe(self, *, filename: str, content_type: str, data: AudioData) -> TranscriptionResult:
+        if not self.api_key:
+            raise TranscriptionConfigError("OPENAI_API_KEY is not configured")
+
+        form_fields = {
+            "model": self.model,
+            "response_format": "verbose_json",
+        }
+        body, length, boundary = _encode_multipart(form_fields, "file", filename, content_type, data)
+
+        req = request.Request(
+            self.url,
+            data=body,
+            method="POST",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+                "Content-Length": str(length),
+            },
+        )
+
+        try:
+            with request.urlopen(req, timeout=self.timeout_seconds) as response:
+                payload = json.loads(response.read().decode("utf-8"))
+        except error.HTTPError as exc:
+            _handle_http_error(exc)
+        except error.URLError as exc:
+            raise TranscriptionProviderError(f"Transcription provider unavailable: {exc.reason}", status_code=503, retryable=True) from exc
+
+        return TranscriptionResult(
+            text=payload.get("text", ""),
+            language=payload.get("language"),
+            duration_seconds=payload.get("duration"),
+            provider=self.name,
+        )
+
+
+def _handle_http_error(exc: error.HTTPError) -> None:
+    raise upstream_status_error(exc.code, exc.read().decode("utf-8", errors="ignore")) from exc
+
+
+def upstream_status_error(status_code: int, raw_body: str) -> TranscriptionProviderError:
+    """Map an error response of the transcription API to the status this API answers with."""
+    message = _extract_error_message(raw_body) or "Transcription provider request failed"
+    if status_code == 429:
+        return TranscriptionProviderError(message, status_code=502, retryable=True)
+    if status_code >= 500:
+        return TranscriptionProviderError(message, status_code=503, retryable=True)
+    return TranscriptionProviderError(message, status_code=502)
+
+
+def _extract_error_message(raw_body: str) -> str | None:
+    try:
+        parsed = json.loads(raw_body)
+    except json.JSONDecodeError:
+        return raw_body or None
+
+    if isinstance(parsed, dict):
+        error_obj = parsed.get("error")
+        if isinstance(error_obj, dict):
+            message = error_obj.get("message")
+            if isinstance(message, str):
+                return message
+    return None
+
+
+def _encode_multipart(
+    form_fields: dict[str, str],
+    file_field_name: str,
+    filename: str,
+    content_type: str,
+    data: AudioData,
+) -> tuple[Iterator[bytes], int, str]:
+    """Multipart body as chunks plus its total length; the audio is read one chunk at a time, never whole."""
+    boundary = f"----lotto-boundary-{uuid.uuid4().hex}"
+    lines: list[bytes] = []
+
+    for key, value in form_fields.items():
+        lines.extend(
+            [
+                f"--{boundary}".encode("utf-8"),
+                f'Content-Disposition: form-data; name="{key}"'.encode("utf-8"),
+                b"",
+                str(value).encode("utf-8"),
+            ]
+        )
+
+    lines.extend(
+        [
+            f"--{boundary}".encode("utf-8"),
+            (
+                f'Content-Disposition: form-data; name="{file_field_name}"; '
+                f'filename="{filename}"'
+            ).encode("utf-8"),
+            f"Content-Type: {content_type}".encode("utf-8"),
+            b"",
+            b"",
+        ]
+    )
+    head = b"\r\n".join(lines)
+    tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+    audio = io.BytesIO(data) if isinstance(data, bytes) else data
+    # Rewound every time, so a retried call sends the whole file again.
+    size = audio.seek(0, io.SEEK_END)
+    audio.seek(0)
+    return _chunks(head, audio, tail), len(head) + size + len(tail), boundary
+
+
+def _chunks(head: bytes, audio: BinaryIO, tail: bytes) -> Iterator[bytes]:
+    yield head
+    while chunk := audio.read(UPLOAD_CHUNK_BYTES):
+        yield chunk
+    yield tail
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+from pathlib import Path
+
+from app.services.transcription_service import (
+    AudioData,
+    TranscriptionConfigError,
+    TranscriptionProviderError,
+    TranscriptionResult,
+)
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class ReplayTranscriptionProvider:
+    """Answers with recorded transcripts looked up by the SHA-256 of the audio.
+
+    Nothing leaves the process, so the speech pipeline can be load-tested
+    offline and repeatably. ``latency_seconds`` is awaited before every answer
+    to stand in for the upstream round trip without holding a thread. Audio
+    with no recording is a non-retryable 422.
+
+    A recording is either the transcript itself or an object with ``text``
+    and optional ``language`` and ``duration``, the same fields the Whisper
+    API returns.
+    """
+
+    name = "replay"
+
+    def __init__(self, recordings: Mapping[str, str | Mapping[str, object]], *, latency_seconds: float = 0.0) -> None:
+        self.recordings = {
+            audio_sha256: {"text": entry} if isinstance(entry, str) else dict(entry)
+            for audio_sha256, entry in recordings.items()
+        }
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    @classmethod
+    def from_env(cls) -> ReplayTranscriptionProvider:
+        path = os.getenv("TRANSCRIPTION_REPLAY_FILE")
+        if not path:
+            raise TranscriptionConfigError("TRANSCRIPTION_REPLAY_FILE is not configured")
+        try:
+            recordings = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            raise TranscriptionConfigError(f"Cannot load replay recordings from {path}: {exc}") from exc
+        return cls(recordings, latency_seconds=float(os.getenv("TRANSCRIPTION_REPLAY_LATENCY_SECONDS", "0")))
+
+    @staticmethod
+    def audio_key(data: AudioData) -> str:
+        if isinstance(data, bytes):
+            return hashlib.sha256(data).hexdigest()
+        digest = hashlib.sha256()
+        data.seek(0)
+        while chunk := data.read(READ_CHUNK_BYTES):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    async def transcribe(self, *, filename: str, content_type: str, data: AudioData) -> TranscriptionResult:
+        self.calls += 1
+        # A spooled upload is read back from disk to hash it, so that happens off the event loop.
+        recording = self.recordings.get(await asyncio.to_thread(self.audio_key, data))
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if recording is None:
+            raise TranscriptionProviderError("No recorded transcript for this audio", status_code=422)
+        return TranscriptionResult(
+            text=str(recording.get("text", "")),
+            language=recording.get("language"),
+            duration_seconds=recording.get("duration"),
+            provider=self.name,
+        )
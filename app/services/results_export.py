@@ -0,0 +1,113 @@
+"""Stream every finished game result as NDJSON or CSV.
+
+Usage::
+
+    python -m app.services.results_export --format csv --since 2024-01-01 --gzip -o results.csv.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import zlib
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+from typing import Any
+
+EXPORT_FIELDS = (
+    "game_id",
+    "finished_at",
+    "player",
+    "net_kopecks",
+    "card_price_kopecks",
+    "line_bonus_kopecks",
+    "line_closed",
+    "card_closed",
+)
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+# Rows are encoded in groups so a chunk is a few tens of KB rather than one tiny write per row.
+ROWS_PER_CHUNK = 500
+
+
+def export_chunks(
+    rows: Iterable[dict[str, Any]], fmt: str, *, rows_per_chunk: int = ROWS_PER_CHUNK
+) -> Iterator[bytes]:
+    """Encode ``rows`` lazily; memory use depends on ``rows_per_chunk``, not on the number of rows."""
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+        writer.writeheader()
+    pending = 0
+    for row in rows:
+        if writer is None:
+            buffer.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+            buffer.write("\n")
+        else:
+            writer.writerow({**row, "line_closed": int(row["line_closed"]), "card_closed": int(row["card_closed"])})
+        pending += 1
+        if pending == rows_per_chunk:
+            yield _drain(buffer)
+            pending = 0
+    tail = _drain(buffer)
+    if tail:
+        yield tail
+
+
+def gzip_chunks(chunks: Iterable[bytes], *, level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export finished game results as NDJSON or CSV")
+    parser.add_argument("--db-path", default=os.getenv("LOTTO_DB_PATH", "lotto.db"))
+    parser.add_argument("--format", choices=sorted(MEDIA_TYPES), default="ndjson")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--player", default=None)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("-o", "--output", default="-")
+    args = parser.parse_args(argv)
+
+    from app.repository import LottoRepository
+    from app.service import LottoService
+
+    rows = LottoService(LottoRepository(args.db_path)).export_results(
+        since=args.since, until=args.until, player=args.player
+    )
+    chunks = export_chunks(rows, args.format)
+    if args.gzip:
+        chunks = gzip_chunks(chunks)
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,177 @@
+"""Load test of ``/speech/transcribe`` + ``/speech/interpret`` against the replay provider.
+
+In-process by default: the app is built with a :class:`ReplayTranscriptionProvider`
+and driven over ASGI, so no server, network or API key is involved::
+
+    python -m app.services.speech_benchmark --requests 2000 --concurrency 200 --latency 0.05
+
+To load a running server instead, write the recordings it should replay and
+start it with ``TRANSCRIPTION_PROVIDER=replay``::
+
+    python -m app.services.speech_benchmark --write-recordings replay.json
+    TRANSCRIPTION_REPLAY_FILE=replay.json TRANSCRIPTION_PROVIDER=replay uvicorn app.main:app
+    python -m app.services.speech_benchmark --base-url http://127.0.0.1:8000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import httpx
+
+PLAYERS = ["Паша", "Лена", "Игорь", "Оля"]
+COMMANDS = ["закрыл линию {player}", "закрыл карту {player}"]
+
+
+def make_clips(count: int) -> dict[bytes, str]:
+    """``count`` distinct fake audio clips, each mapped to the command it stands for."""
+    clips = {}
+    for index in range(count):
+        player = PLAYERS[index % len(PLAYERS)]
+        command = COMMANDS[index // len(PLAYERS) % len(COMMANDS)]
+        clips[b"RIFF" + index.to_bytes(4, "big") + bytes(60)] = command.format(player=player.lower())
+    return clips
+
+
+def recordings_for(clips: dict[bytes, str]) -> dict[str, dict[str, Any]]:
+    return {
+        hashlib.sha256(audio).hexdigest(): {"text": text, "language": "ru", "duration": 1.0}
+        for audio, text in clips.items()
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient, clips: Sequence[bytes], *, requests: int, concurrency: int
+) -> dict[str, float | int]:
+    """Send ``requests`` transcribe-then-interpret pairs, ``concurrency`` at a time; returns latency stats."""
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < requests:
+            index, next_index = next_index, next_index + 1
+            started = time.perf_counter()
+            transcribed = await client.post(
+                "/speech/transcribe",
+                files={"file": (f"clip-{index}.webm", clips[index % len(clips)], "audio/webm")},
+            )
+            if transcribed.status_code != 200:
+                errors += 1
+                continue
+            interpreted = await client.post(
+                "/speech/interpret", json={"text": transcribed.json()["text"], "players": PLAYERS}
+            )
+            if interpreted.status_code != 200 or interpreted.json()["intent"] == "unknown":
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": seconds,
+        # Successful pairs only: under overload, fast 429s must pull throughput down, not up.
+        "throughput": len(latencies) / seconds if seconds else 0.0,
+        "error_throughput": errors / seconds if seconds else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_in_process(
+    *, requests: int, concurrency: int, clips: int, latency_seconds: float, db_path: str
+) -> dict[str, Any]:
+    """Benchmark a fresh app whose transcriber is the replay provider."""
+    import httpx
+
+    from app.main import create_app
+    from app.runtime import get_transcriber
+    from app.services.replay_transcription import ReplayTranscriptionProvider
+    from app.settings import Settings
+
+    recorded = make_clips(clips)
+    provider = ReplayTranscriptionProvider(recordings_for(recorded), latency_seconds=latency_seconds)
+    app = create_app(Settings(db_path=db_path, speech_max_concurrency=concurrency, speech_max_queue=concurrency))
+    app.dependency_overrides[get_transcriber] = lambda: provider
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            report = await drive(client, list(recorded), requests=requests, concurrency=concurrency)
+            metrics = (await client.get("/metrics")).json()
+    finally:
+        await app.state.runtime.aclose()
+    report["provider_calls"] = provider.calls
+    report["cache_hit_rate"] = metrics["transcription_cache"]["hit_rate"]
+    return report
+
+
+async def run_remote(*, base_url: str, requests: int, concurrency: int, clips: int) -> dict[str, Any]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        return await drive(client, list(make_clips(clips)), requests=requests, concurrency=concurrency)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the speech endpoints against the replay provider")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--clips", type=int, default=1000, help="distinct audio clips; fewer means more cache hits")
+    parser.add_argument("--latency", type=float, default=0.05, help="replay latency per call, in seconds")
+    parser.add_argument("--db-path", default=":memory:")
+    parser.add_argument("--base-url", default=None, help="benchmark a running server instead of an in-process app")
+    parser.add_argument("--write-recordings", default=None, help="write the replay recordings JSON and exit")
+    args = parser.parse_args(argv)
+
+    if args.write_recordings:
+        recordings = recordings_for(make_clips(args.clips))
+        Path(args.write_recordings).write_text(json.dumps(recordings, ensure_ascii=False), encoding="utf-8")
+        return 0
+
+    if args.base_url:
+        report = asyncio.run(
+            run_remote(base_url=args.base_url, requests=args.requests, concurrency=args.concurrency, clips=args.clips)
+        )
+    else:
+        report = asyncio.run(
+            run_in_process(
+                requests=args.requests,
+                concurrency=args.concurrency,
+                clips=args.clips,
+                latency_seconds=args.latency,
+                db_path=args.db_path,
+            )
+        )
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0 if not report["errors"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-import json
 import os
-import uuid
+from collections.abc import Callable
 from dataclasses import dataclass
-from urllib import error, request
+from typing import BinaryIO, Protocol
 
 
 @dataclass(slots=True)
@@ -28,113 +27,91 @@ class TranscriptionProviderError(RuntimeError):
         self.retryable = retryable
 
 
-def transcribe_audio(*, filename: str, content_type: str, data: bytes) -> TranscriptionResult:
-    provider = os.getenv("TRANSCRIPTION_PROVIDER", "openai").lower()
-    if provider != "openai":
-        raise TranscriptionConfigError(f"Unsupported transcription provider: {provider}")
-    return _transcribe_with_openai(filename=filename, content_type=content_type, data=data)
+# Uploads reach providers as a seekable binary file so they are never copied into memory whole;
+# a provider rewinds it before each call and streams it out in chunks.
+AudioData = bytes | BinaryIO
 
 
-def _transcribe_with_openai(*, filename: str, content_type: str, data: bytes) -> TranscriptionResult:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise TranscriptionConfigError("OPENAI_API_KEY is not configured")
+class TranscriptionProvider(Protocol):
+    name: str
 
-    model = os.getenv("OPENAI_WHISPER_MODEL", "whisper-1")
-    base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
-    url = f"{base_url}/audio/transcriptions"
+    def transcribe(self, *, filename: str, content_type: str, data: AudioData) -> TranscriptionResult: ...
 
-    form_fields = {
-        "model": model,
-        "response_format": "verbose_json",
-    }
-    body, boundary = _encode_multipart(form_fields, "file", filename, content_type, data)
 
-    req = request.Request(
-        url,
-        data=body,
-        method="POST",
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": f"multipart/form-data; boundary={boundary}",
-        },
-    )
+class AsyncTranscriptionProvider(Protocol):
+    """A provider whose ``transcribe`` is a coroutine; it runs on the event loop instead of a thread."""
 
+    name: str
+
+    async def transcribe(self, *, filename: str, content_type: str, data: AudioData) -> TranscriptionResult: ...
+
+
+ProviderFactory = Callable[[], "TranscriptionProvider | AsyncTranscriptionProvider"]
+
+
+def _openai_provider() -> TranscriptionProvider:
+    from app.services.openai_transcription import OpenAITranscriptionProvider
+
+    return OpenAITranscriptionProvider.from_env()
+
+
+def _openai_async_provider() -> AsyncTranscriptionProvider:
     try:
-        with request.urlopen(req, timeout=60) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except error.HTTPError as exc:
-        _handle_http_error(exc)
-    except error.URLError as exc:
-        raise TranscriptionProviderError(f"Transcription provider unavailable: {exc.reason}", status_code=503, retryable=True) from exc
+        from app.services.openai_async_transcription import AsyncOpenAITranscriptionProvider
+    except ImportError as exc:
+        raise TranscriptionConfigError('openai-async requires httpx: pip install ".[async]"') from exc
+
+    return AsyncOpenAITranscriptionProvider.from_env()
+
 
-    return TranscriptionResult(
-        text=payload.get("text", ""),
-        language=payload.get("language"),
-        duration_seconds=payload.get("duration"),
-        provider="openai",
-    )
+def _replay_provider() -> AsyncTranscriptionProvider:
+    from app.services.replay_transcription import ReplayTranscriptionProvider
 
+    return ReplayTranscriptionProvider.from_env()
 
-def _handle_http_error(exc: error.HTTPError) -> None:
-    raw_body = exc.read().decode("utf-8", errors="ignore")
-    message = _extract_error_message(raw_body) or "Transcription provider request failed"
 
-    if exc.code == 429:
-        raise TranscriptionProviderError(message, status_code=502, retryable=True) from exc
-    if exc.code >= 500:
-        raise TranscriptionProviderError(message, status_code=503, retryable=True) from exc
-    raise TranscriptionProviderError(message, status_code=502) from exc
+# Factories import their client modules themselves, so only the selected provider is ever loaded.
+_PROVIDERS: dict[str, ProviderFactory] = {
+    "openai": _openai_provider,
+    "openai-async": _openai_async_provider,
+    "replay": _replay_provider,
+}
 
 
-def _extract_error_message(raw_body: str) -> str | None:
+def register_provider(name: str, factory: ProviderFactory) -> None:
+    _PROVIDERS[name.lower()] = factory
+
+
+def available_providers() -> list[str]:
+    return sorted(_PROVIDERS)
+
+
+def create_provider(name: str) -> TranscriptionProvider | AsyncTranscriptionProvider:
+    """Build the provider registered as ``name``.
+
+    An unknown name still yields a provider: it fails every call with
+    :class:`TranscriptionConfigError`, the same way a provider missing its
+    credentials does, so a misconfiguration never stops the app from starting.
+    """
+    factory = _PROVIDERS.get(name.lower())
+    if factory is None:
+        return _UnavailableProvider(name, f"Unsupported transcription provider: {name}")
     try:
-        parsed = json.loads(raw_body)
-    except json.JSONDecodeError:
-        return raw_body or None
-
-    if isinstance(parsed, dict):
-        error_obj = parsed.get("error")
-        if isinstance(error_obj, dict):
-            message = error_obj.get("message")
-            if isinstance(message, str):
-                return message
-    return None
-
-
-def _encode_multipart(
-    form_fields: dict[str, str],
-    file_field_name: str,
-    filename: str,
-    content_type: str,
-    data: bytes,
-) -> tuple[bytes, str]:
-    boundary = f"----lotto-boundary-{uuid.uuid4().hex}"
-    lines: list[bytes] = []
-
-    for key, value in form_fields.items():
-        lines.extend(
-            [
-                f"--{boundary}".encode("utf-8"),
-                f'Content-Disposition: form-data; name="{key}"'.encode("utf-8"),
-                b"",
-                str(value).encode("utf-8"),
-            ]
-        )
-
-    lines.extend(
-        [
-            f"--{boundary}".encode("utf-8"),
-            (
-                f'Content-Disposition: form-data; name="{file_field_name}"; '
-                f'filename="{filename}"'
-            ).encode("utf-8"),
-            f"Content-Type: {content_type}".encode("utf-8"),
-            b"",
-            data,
-            f"--{boundary}--".encode("utf-8"),
-            b"",
-        ]
-    )
-
-    return b"\r\n".join(lines), boundary
+        return factory()
+    except TranscriptionConfigError as exc:
+        return _UnavailableProvider(name, str(exc))
+
+
+def transcribe_audio(*, filename: str, content_type: str, data: AudioData) -> TranscriptionResult:
+    """One-off transcription with the provider selected by ``TRANSCRIPTION_PROVIDER``; blocking providers only."""
+    provider = create_provider(os.getenv("TRANSCRIPTION_PROVIDER", "openai"))
+    return provider.transcribe(filename=filename, content_type=content_type, data=data)
+
+
+class _UnavailableProvider:
+    def __init__(self, name: str, reason: str) -> None:
+        self.name = name
+        self.reason = reason
+
+    def transcribe(self, *, filename: str, content_type: str, data: AudioData) -> TranscriptionResult:
+        raise TranscriptionConfigError(self.reason)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+DEFAULT_QUEUE_SIZE = 64
+
+RESYNC_FRAME = "event: resync\ndata: {}\n\n"
+
+
+@dataclass(eq=False)
+class Subscription:
+    session_id: int
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue[str]
+    dropped: int = field(default=0)
+
+    def push(self, frame: str) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # A slow watcher loses its backlog instead of holding anyone up;
+            # the resync event tells it to re-read the session once.
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_FRAME)
+
+
+class SessionEventBroker:
+    """Per-session fan-out of Server-Sent Events frames.
+
+    ``publish`` is called from sync handlers running in the threadpool; frames
+    are encoded once and handed to each event loop with a single thread-safe
+    callback, which then fills every subscriber's bounded queue without waiting.
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._published = 0
+
+    def subscribe(self, session_id: int) -> Subscription:
+        subscription = Subscription(
+            session_id=session_id,
+            loop=asyncio.get_running_loop(),
+            queue=asyncio.Queue(maxsize=self.queue_size),
+        )
+        with self._lock:
+            self._subscribers[session_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.session_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.session_id]
+
+    def publish(self, session_id: int, event: str, data: dict[str, Any], *, event_id: int | None = None) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(session_id, ()))
+            self._published += 1
+        if not subscribers:
+            return
+
+        frame = format_event(event, data, event_id=event_id)
+        by_loop: dict[asyncio.AbstractEventLoop, list[Subscription]] = defaultdict(list)
+        for subscription in subscribers:
+            by_loop[subscription.loop].append(subscription)
+        for loop, targets in by_loop.items():
+            if loop.is_closed():
+                continue
+            loop.call_soon_threadsafe(_deliver, targets, frame)
+
+    def metrics(self) -> dict[str, int]:
+        with self._lock:
+            subscriptions = [subscription for group in self._subscribers.values() for subscription in group]
+            return {
+                "sessions_watched": len(self._subscribers),
+                "subscribers": len(subscriptions),
+                "published": self._published,
+                "dropped": sum(subscription.dropped for subscription in subscriptions),
+            }
+
+
+def format_event(event: str, data: dict[str, Any], *, event_id: int | None = None) -> str:
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def frame_event_id(frame: str) -> int | None:
+    """The ``id`` of a frame built by :func:`format_event`, if it has one."""
+    if not frame.startswith("id: "):
+        return None
+    return int(frame[4 : frame.index("\n")])
+
+
+def _deliver(targets: list[Subscription], frame: str) -> None:
+    for subscription in targets:
+        subscription.push(frame)
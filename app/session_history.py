@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterator, Mapping, Sequence
+from datetime import datetime, timedelta
+from typing import Any
+
+_EPOCH = datetime(1970, 1, 1)
+
+_COLUMNS = (
+    "game_numbers",
+    "finished_at_us",
+    "nets",
+    "line_winners",
+    "line_offsets",
+    "card_winners",
+    "card_offsets",
+    "transfers",
+    "transfer_offsets",
+)
+
+
+class SessionHistory:
+    """Finished games of a session stored as flat integer arrays.
+
+    Players are referenced by their index in the session player list: nets are
+    ``player_count`` kopeck values per game, transfers are ``(from, to, amount)``
+    triples and winners are index runs, each delimited by per-game offsets.
+    Dict views are materialized only when an entry is read; running totals per
+    player are kept up to date so summaries never scan the games.
+    """
+
+    __slots__ = ("players", "_index", "_totals", *_COLUMNS)
+
+    def __init__(self, players: Sequence[str]) -> None:
+        self.players = list(players)
+        self._index = {player: idx for idx, player in enumerate(self.players)}
+        self._totals = array("q", [0] * len(self.players))
+        self.game_numbers = array("q")
+        self.finished_at_us = array("q")
+        self.nets = array("q")
+        self.line_winners = array("q")
+        self.line_offsets = array("q", [0])
+        self.card_winners = array("q")
+        self.card_offsets = array("q", [0])
+        self.transfers = array("q")
+        self.transfer_offsets = array("q", [0])
+
+    @property
+    def player_index(self) -> dict[str, int]:
+        """Player name to position; doubles as the session's player set."""
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self.game_numbers)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return (self.entry(position) for position in range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SessionHistory):
+            return NotImplemented
+        return self.players == other.players and self.to_state() == other.to_state()
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> SessionHistory:
+        clone = SessionHistory.__new__(SessionHistory)
+        clone.players = list(self.players)
+        clone._index = dict(self._index)
+        clone._totals = array("q", self._totals)
+        for name in _COLUMNS:
+            setattr(clone, name, array("q", getattr(self, name)))
+        return clone
+
+    def append(
+        self,
+        *,
+        game_number: int,
+        line_winners: Sequence[str],
+        card_winners: Sequence[str],
+        net: Mapping[str, int],
+        transfers: Sequence[Mapping[str, Any]],
+        finished_at: datetime,
+    ) -> None:
+        index = self._index
+        self.game_numbers.append(game_number)
+        self.finished_at_us.append((finished_at - _EPOCH) // timedelta(microseconds=1))
+        nets = [net.get(player, 0) for player in self.players]
+        self.nets.extend(nets)
+        for idx, amount in enumerate(nets):
+            self._totals[idx] += amount
+        self.line_winners.extend(index[player] for player in line_winners)
+        self.line_offsets.append(len(self.line_winners))
+        self.card_winners.extend(index[player] for player in card_winners)
+        self.card_offsets.append(len(self.card_winners))
+        for transfer in transfers:
+            self.transfers.extend((index[transfer["from"]], index[transfer["to"]], transfer["amount_kopecks"]))
+        self.transfer_offsets.append(len(self.transfers))
+
+    def entry(self, position: int) -> dict[str, Any]:
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("history position out of range")
+
+        players = self.players
+        base = position * len(players)
+        start, stop = self.transfer_offsets[position], self.transfer_offsets[position + 1]
+        raw = self.transfers[start:stop]
+        return {
+            "game_number": self.game_numbers[position],
+            "line_winners": self._names(self.line_winners, self.line_offsets, position),
+            "card_winners": self._names(self.card_winners, self.card_offsets, position),
+            "net": dict(zip(players, self.nets[base : base + len(players)])),
+            "transfers": [
+                {"from": players[raw[idx]], "to": players[raw[idx + 1]], "amount_kopecks": raw[idx + 2]}
+                for idx in range(0, len(raw), 3)
+            ],
+            "finished_at": (_EPOCH + timedelta(microseconds=self.finished_at_us[position])).isoformat(),
+        }
+
+    def window(self, *, limit: int | None = None, since_game_number: int | None = None) -> range:
+        """Positions of a history page.
+
+        Without ``since_game_number`` the page is the last ``limit`` games; with it,
+        the first ``limit`` games numbered after ``since_game_number``.
+        """
+        if since_game_number is None:
+            start = 0 if limit is None else max(len(self) - limit, 0)
+            return range(start, len(self))
+        start = bisect_right(self.game_numbers, since_game_number)
+        stop = len(self) if limit is None else min(start + limit, len(self))
+        return range(start, stop)
+
+    def totals(self) -> dict[str, int]:
+        return dict(zip(self.players, self._totals))
+
+    def to_state(self) -> dict[str, list[int]]:
+        """JSON-friendly form used for persistence."""
+        return {name: list(getattr(self, name)) for name in _COLUMNS}
+
+    @classmethod
+    def from_state(
+        cls,
+        players: Sequence[str],
+        state: Mapping[str, Any] | Sequence[Mapping[str, Any]],
+    ) -> SessionHistory:
+        history = cls(players)
+        if isinstance(state, Mapping):
+            for name in _COLUMNS:
+                setattr(history, name, array("q", state[name]))
+            player_count = len(history.players)
+            for position, amount in enumerate(history.nets):
+                history._totals[position % player_count] += amount
+            return history
+
+        # Sessions written before compact storage keep history as a list of dicts.
+        for game in state:
+            history.append(
+                game_number=game["game_number"],
+                line_winners=game["line_winners"],
+                card_winners=game["card_winners"],
+                net=game["net"],
+                transfers=game["transfers"],
+                finished_at=datetime.fromisoformat(game["finished_at"]),
+            )
+        return history
+
+    def _names(self, values: array, offsets: array, position: int) -> list[str]:
+        return [self.players[idx] for idx in values[offsets[position] : offsets[position + 1]]]
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.repository import LottoRepository
+from app.session_history import SessionHistory
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TTL_SECONDS = 300.0
+DEFAULT_LOCK_STRIPES = 64
+
+
+class SessionConflictError(RuntimeError):
+    """Raised when a session changed since it was read (another request or worker won)."""
+
+
+class StripedLocks:
+    """Fixed table of locks; a session always maps to the same stripe.
+
+    Mutations of one session are serialized while unrelated sessions only
+    contend when they happen to share a stripe.
+    """
+
+    def __init__(self, stripes: int = DEFAULT_LOCK_STRIPES) -> None:
+        if stripes < 1:
+            raise ValueError("stripes must be positive")
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def for_key(self, key: int) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+
+class SessionStore:
+    """Sessions persisted in the repository with a bounded LRU cache of hot sessions.
+
+    Every write goes straight to the database as a compare-and-swap on the
+    session ``version``, so several worker processes can share one database.
+    A cached entry is reused only while its version matches the stored one,
+    which costs a primary-key lookup instead of decoding the whole state.
+    """
+
+    def __init__(
+        self,
+        repo: LottoRepository,
+        *,
+        max_size: int = DEFAULT_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+        lock_stripes: int = DEFAULT_LOCK_STRIPES,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self.repo = repo
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._cache: OrderedDict[int, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._session_locks = StripedLocks(lock_stripes)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @contextmanager
+    def locked(self, session_id: int) -> Iterator[None]:
+        """Serialize a read-modify-write of one session within this process.
+
+        Other processes are still kept honest by the compare-and-swap in :meth:`save`.
+        """
+        with self._session_locks.for_key(session_id):
+            yield
+
+    def create(self, state: dict[str, Any]) -> dict[str, Any]:
+        now = self._wall_clock().isoformat()
+        session_id = self.repo.create_session(_encode(state), last_activity_at=now)
+        session = {"session_id": session_id, **state, "version": 1, "last_activity_at": now}
+        self._remember(session)
+        return session
+
+    def get(self, session_id: int) -> dict[str, Any] | None:
+        """Shared, read-only view of the current session state."""
+        cached = self._cached(session_id)
+        if cached is not None and cached["version"] == self.repo.get_session_version(session_id):
+            with self._lock:
+                self._hits += 1
+            return cached
+
+        with self._lock:
+            self._misses += 1
+        row = self.repo.get_session(session_id)
+        if row is None:
+            self._forget(session_id)
+            return None
+        session = _decode(row)
+        self._remember(session)
+        return session
+
+    def version(self, session_id: int) -> int | None:
+        return self.repo.get_session_version(session_id)
+
+    def get_for_update(self, session_id: int) -> dict[str, Any] | None:
+        """Private copy of the session that may be mutated and passed to :meth:`save`."""
+        session = self.get(session_id)
+        return None if session is None else copy.deepcopy(session)
+
+    def save(self, session: dict[str, Any]) -> None:
+        version = session["version"]
+        now = self._wall_clock().isoformat()
+        saved = self.repo.save_session(
+            session["session_id"], _encode(session), expected_version=version, last_activity_at=now
+        )
+        if not saved:
+            self._forget(session["session_id"])
+            raise SessionConflictError(f"session {session['session_id']} was modified concurrently")
+        session["version"] = version + 1
+        session["last_activity_at"] = now
+        self._remember(session)
+
+    def archive_idle(self, *, idle_ttl_seconds: float, batch_size: int) -> list[int]:
+        """Archive one batch of sessions idle for longer than ``idle_ttl_seconds``.
+
+        Archived sessions disappear from the API like deleted ones, but their
+        rows stay in the database untouched; nothing is finished on the way out.
+        """
+        idle_before = self._wall_clock() - timedelta(seconds=idle_ttl_seconds)
+        archived = self.repo.archive_idle_sessions(idle_before.isoformat(), batch_size)
+        with self._lock:
+            for session_id in archived:
+                self._cache.pop(session_id, None)
+        return archived
+
+    def metrics(self) -> dict[str, int | float]:
+        counts = self.repo.count_sessions()
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                **counts,
+                "cached": len(self._cache),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+    def _cached(self, session_id: int) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._cache.get(session_id)
+            if entry is None:
+                return None
+            expires_at, session = entry
+            if expires_at <= self._clock():
+                del self._cache[session_id]
+                self._expirations += 1
+                return None
+            self._cache.move_to_end(session_id)
+            return session
+
+    def _forget(self, session_id: int) -> None:
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+    def _remember(self, session: dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[session["session_id"]] = (self._clock() + self.ttl_seconds, session)
+            self._cache.move_to_end(session["session_id"])
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self._evictions += 1
+
+
+def _encode(session: dict[str, Any]) -> dict[str, Any]:
+    return {**session, "history": session["history"].to_state()}
+
+
+def _decode(row: dict[str, Any]) -> dict[str, Any]:
+    return {**row, "history": SessionHistory.from_state(row["players"], row["history"])}
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+
+from app.session_store import SessionStore
+
+DEFAULT_IDLE_TTL_SECONDS = 7 * 24 * 3600.0
+DEFAULT_SWEEP_INTERVAL_SECONDS = 300.0
+DEFAULT_SWEEP_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+class SessionSweeper:
+    """Background archiving of sessions nobody touched for ``idle_ttl_seconds``.
+
+    Each batch is its own short write transaction run off the event loop, so a
+    large backlog of abandoned sessions never holds the database for long.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        *,
+        idle_ttl_seconds: float = DEFAULT_IDLE_TTL_SECONDS,
+        interval_seconds: float = DEFAULT_SWEEP_INTERVAL_SECONDS,
+        batch_size: int = DEFAULT_SWEEP_BATCH_SIZE,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.store = store
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._sweeps = 0
+        self._archived = 0
+        self._failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.idle_ttl_seconds > 0
+
+    async def sweep(self) -> int:
+        """Archive every currently idle session, one bounded batch at a time."""
+        archived = 0
+        while True:
+            batch = await asyncio.to_thread(
+                self.store.archive_idle,
+                idle_ttl_seconds=self.idle_ttl_seconds,
+                batch_size=self.batch_size,
+            )
+            archived += len(batch)
+            if len(batch) < self.batch_size:
+                break
+        with self._lock:
+            self._sweeps += 1
+            self._archived += archived
+        return archived
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("session sweep failed")
+                with self._lock:
+                    self._failures += 1
+            await asyncio.sleep(self.interval_seconds)
+
+    def metrics(self) -> dict[str, int | float | bool]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "sweeps": self._sweeps,
+                "archived": self._archived,
+                "failures": self._failures,
+            }
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+from app.idempotency import (
+    DEFAULT_IDEMPOTENCY_LEASE_SECONDS,
+    DEFAULT_IDEMPOTENCY_MAX_KEYS,
+    DEFAULT_IDEMPOTENCY_TTL_SECONDS,
+)
+from app.results_snapshot import DEFAULT_SNAPSHOT_INTERVAL_SECONDS
+from app.session_store import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL_SECONDS, DEFAULT_LOCK_STRIPES
+from app.session_sweeper import (
+    DEFAULT_IDLE_TTL_SECONDS,
+    DEFAULT_SWEEP_BATCH_SIZE,
+    DEFAULT_SWEEP_INTERVAL_SECONDS,
+)
+from app.speech_defaults import (
+    DEFAULT_BREAKER_RESET_SECONDS,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BUDGET_SECONDS,
+    DEFAULT_SPEECH_MAX_CONCURRENCY,
+    DEFAULT_SPEECH_MAX_QUEUE,
+    DEFAULT_SPEECH_MAX_UPLOAD_BYTES,
+    DEFAULT_SPEECH_RETRY_AFTER_SECONDS,
+    DEFAULT_TRANSCRIPTION_CACHE_DISK_MAX_ENTRIES,
+    DEFAULT_TRANSCRIPTION_CACHE_SIZE,
+)
+from app.stats_cache import DEFAULT_STATS_CACHE_SIZE
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    db_path: str = "lotto.db"
+    session_cache_size: int = DEFAULT_CACHE_SIZE
+    session_cache_ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS
+    session_lock_stripes: int = DEFAULT_LOCK_STRIPES
+    session_idle_ttl_seconds: float = DEFAULT_IDLE_TTL_SECONDS
+    session_sweep_interval_seconds: float = DEFAULT_SWEEP_INTERVAL_SECONDS
+    session_sweep_batch_size: int = DEFAULT_SWEEP_BATCH_SIZE
+    speech_enabled: bool = True
+    transcription_provider: str = "openai"
+    speech_max_concurrency: int = DEFAULT_SPEECH_MAX_CONCURRENCY
+    speech_max_queue: int = DEFAULT_SPEECH_MAX_QUEUE
+    speech_retry_after_seconds: int = DEFAULT_SPEECH_RETRY_AFTER_SECONDS
+    speech_max_upload_bytes: int = DEFAULT_SPEECH_MAX_UPLOAD_BYTES
+    transcription_cache_size: int = DEFAULT_TRANSCRIPTION_CACHE_SIZE
+    transcription_cache_dir: str = ""
+    transcription_cache_disk_max_entries: int = DEFAULT_TRANSCRIPTION_CACHE_DISK_MAX_ENTRIES
+    transcription_retry_attempts: int = DEFAULT_RETRY_ATTEMPTS
+    transcription_retry_budget_seconds: float = DEFAULT_RETRY_BUDGET_SECONDS
+    transcription_breaker_threshold: int = DEFAULT_BREAKER_THRESHOLD
+    transcription_breaker_reset_seconds: float = DEFAULT_BREAKER_RESET_SECONDS
+    stats_cache_size: int = DEFAULT_STATS_CACHE_SIZE
+    stats_cache_shared: bool = True
+    stats_snapshot_path: str = ""
+    stats_snapshot_interval_seconds: float = DEFAULT_SNAPSHOT_INTERVAL_SECONDS
+    idempotency_ttl_seconds: float = DEFAULT_IDEMPOTENCY_TTL_SECONDS
+    idempotency_max_keys: int = DEFAULT_IDEMPOTENCY_MAX_KEYS
+    idempotency_lease_seconds: float = DEFAULT_IDEMPOTENCY_LEASE_SECONDS
+
+    @classmethod
+    def from_env(cls) -> Settings:
+        return cls(
+            db_path=os.getenv("LOTTO_DB_PATH", "lotto.db"),
+            session_cache_size=int(os.getenv("SESSION_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+            session_cache_ttl_seconds=float(os.getenv("SESSION_CACHE_TTL_SECONDS", DEFAULT_CACHE_TTL_SECONDS)),
+            session_lock_stripes=int(os.getenv("SESSION_LOCK_STRIPES", DEFAULT_LOCK_STRIPES)),
+            session_idle_ttl_seconds=float(os.getenv("SESSION_IDLE_TTL_SECONDS", DEFAULT_IDLE_TTL_SECONDS)),
+            session_sweep_interval_seconds=float(
+                os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", DEFAULT_SWEEP_INTERVAL_SECONDS)
+            ),
+            session_sweep_batch_size=int(os.getenv("SESSION_SWEEP_BATCH_SIZE", DEFAULT_SWEEP_BATCH_SIZE)),
+            speech_enabled=_env_flag("SPEECH_API_ENABLED", default=True),
+            transcription_provider=os.getenv("TRANSCRIPTION_PROVIDER", "openai").lower(),
+            speech_max_concurrency=int(os.getenv("SPEECH_MAX_CONCURRENCY", DEFAULT_SPEECH_MAX_CONCURRENCY)),
+            speech_max_queue=int(os.getenv("SPEECH_MAX_QUEUE", DEFAULT_SPEECH_MAX_QUEUE)),
+            speech_retry_after_seconds=int(
+                os.getenv("SPEECH_RETRY_AFTER_SECONDS", DEFAULT_SPEECH_RETRY_AFTER_SECONDS)
+            ),
+            speech_max_upload_bytes=int(os.getenv("SPEECH_MAX_UPLOAD_BYTES", DEFAULT_SPEECH_MAX_UPLOAD_BYTES)),
+            transcription_cache_size=int(os.getenv("TRANSCRIPTION_CACHE_SIZE", DEFAULT_TRANSCRIPTION_CACHE_SIZE)),
+            transcription_cache_dir=os.getenv("TRANSCRIPTION_CACHE_DIR", ""),
+            transcription_cache_disk_max_entries=int(
+                os.getenv("TRANSCRIPTION_CACHE_DISK_MAX_ENTRIES", DEFAULT_TRANSCRIPTION_CACHE_DISK_MAX_ENTRIES)
+            ),
+            transcription_retry_attempts=int(os.getenv("TRANSCRIPTION_RETRY_ATTEMPTS", DEFAULT_RETRY_ATTEMPTS)),
+            transcription_retry_budget_seconds=float(
+                os.getenv("TRANSCRIPTION_RETRY_BUDGET_SECONDS", DEFAULT_RETRY_BUDGET_SECONDS)
+            ),
+            transcription_breaker_threshold=int(
+                os.getenv("TRANSCRIPTION_BREAKER_THRESHOLD", DEFAULT_BREAKER_THRESHOLD)
+            ),
+            transcription_breaker_reset_seconds=float(
+                os.getenv("TRANSCRIPTION_BREAKER_RESET_SECONDS", DEFAULT_BREAKER_RESET_SECONDS)
+            ),
+            stats_cache_size=int(os.getenv("STATS_CACHE_SIZE", DEFAULT_STATS_CACHE_SIZE)),
+            stats_cache_shared=_env_flag("STATS_CACHE_SHARED", default=True),
+            stats_snapshot_path=os.getenv("STATS_SNAPSHOT_PATH", ""),
+            stats_snapshot_interval_seconds=float(
+                os.getenv("STATS_SNAPSHOT_INTERVAL_SECONDS", DEFAULT_SNAPSHOT_INTERVAL_SECONDS)
+            ),
+            idempotency_ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", DEFAULT_IDEMPOTENCY_TTL_SECONDS)),
+            idempotency_max_keys=int(os.getenv("IDEMPOTENCY_MAX_KEYS", DEFAULT_IDEMPOTENCY_MAX_KEYS)),
+            idempotency_lease_seconds=float(
+                os.getenv("IDEMPOTENCY_LEASE_SECONDS", DEFAULT_IDEMPOTENCY_LEASE_SECONDS)
+            ),
+        )
+
+
+def _env_flag(name: str, *, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in {"0", "false", "no", "off"}
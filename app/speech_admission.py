@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.speech_defaults import (
+    DEFAULT_SPEECH_MAX_CONCURRENCY,
+    DEFAULT_SPEECH_MAX_QUEUE,
+    DEFAULT_SPEECH_RETRY_AFTER_SECONDS,
+)
+
+T = TypeVar("T")
+
+
+class SpeechOverloaded(RuntimeError):
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("Too many transcriptions in progress")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class SpeechAdmission:
+    """Runs transcriptions at most ``max_concurrency`` at a time.
+
+    Blocking providers run on a thread pool of that size, async providers on
+    the event loop behind a semaphore. Up to ``max_queue`` more calls wait for
+    a free slot; anything beyond that is refused at once with
+    :class:`SpeechOverloaded` instead of queuing behind a slow upstream. The
+    game API never shares these slots, so a burst of voice commands cannot
+    take capacity away from it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = DEFAULT_SPEECH_MAX_CONCURRENCY,
+        max_queue: int = DEFAULT_SPEECH_MAX_QUEUE,
+        retry_after_seconds: int = DEFAULT_SPEECH_RETRY_AFTER_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be positive")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self._clock = clock
+        self._executor: ThreadPoolExecutor | None = None
+        # Coroutine providers run on the event loop; the semaphore plays the pool's part for them.
+        self._slots: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._started = 0
+        self._wait_seconds_total = 0.0
+        self._max_wait_seconds = 0.0
+
+    async def run(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        """Call ``fn`` once a slot is free: blocking functions on the pool, coroutine functions on the loop."""
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.max_queue:
+                self._rejected += 1
+                raise SpeechOverloaded(self.retry_after_seconds)
+            self._pending += 1
+            self._admitted += 1
+        submitted_at = self._clock()
+        if inspect.iscoroutinefunction(fn):
+            return await self._run_async(fn, submitted_at, args, kwargs)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="speech")
+            executor = self._executor
+
+        def call() -> T:
+            self._started_waiting_since(submitted_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._finished()
+
+        future = executor.submit(call)
+        # The slot is freed when the call really ends (or is cancelled while still queued),
+        # not when a disconnected client stops awaiting it.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def _run_async(
+        self, fn: Callable[..., Awaitable[T]], submitted_at: float, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> T:
+        try:
+            with self._lock:
+                if self._slots is None:
+                    self._slots = asyncio.Semaphore(self.max_concurrency)
+                slots = self._slots
+            async with slots:
+                self._started_waiting_since(submitted_at)
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self._finished()
+        finally:
+            self._release(None)
+
+    def _started_waiting_since(self, submitted_at: float) -> None:
+        waited = self._clock() - submitted_at
+        with self._lock:
+            self._active += 1
+            self._started += 1
+            self._wait_seconds_total += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+    def _finished(self) -> None:
+        with self._lock:
+            self._active -= 1
+
+    def _release(self, _future: Future[Any] | None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def aclose(self) -> None:
+        """Stop the speech threads; calls still waiting for one are cancelled."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def metrics(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": self._pending - self._active,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "wait_seconds_avg": self._wait_seconds_total / self._started if self._started else 0.0,
+                "wait_seconds_max": self._max_wait_seconds,
+            }
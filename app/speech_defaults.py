@@ -0,0 +1,20 @@
+"""Defaults of the speech settings.
+
+Kept apart from the modules that use them and free of imports, so
+:mod:`app.settings` can read them without loading the speech stack in
+deployments that run with ``SPEECH_API_ENABLED=0``.
+"""
+
+DEFAULT_SPEECH_MAX_CONCURRENCY = 4
+DEFAULT_SPEECH_MAX_QUEUE = 16
+DEFAULT_SPEECH_RETRY_AFTER_SECONDS = 1
+# The Whisper API refuses files over 25 MB, so there is no point in accepting more.
+DEFAULT_SPEECH_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+DEFAULT_TRANSCRIPTION_CACHE_SIZE = 256
+DEFAULT_TRANSCRIPTION_CACHE_DISK_MAX_ENTRIES = 10_000
+
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BUDGET_SECONDS = 10.0
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+
+from app.repository import LottoRepository
+from app.versioned_cache import VersionedCache
+
+DEFAULT_STATS_CACHE_SIZE = 256
+
+
+class StatsCache:
+    """Stats responses cached until the next game result is written.
+
+    Entries are keyed by endpoint and query parameters and tagged with the
+    results version. With ``shared`` the version is the counter stored next to
+    the results, so a game finished by any worker invalidates every worker's
+    cache; otherwise only writes made by this process are seen, which saves the
+    counter lookup when a single worker owns the database.
+    """
+
+    def __init__(
+        self,
+        repo: LottoRepository,
+        *,
+        max_size: int = DEFAULT_STATS_CACHE_SIZE,
+        shared: bool = True,
+    ) -> None:
+        self.repo = repo
+        self.shared = shared
+        self._entries = VersionedCache(max_size=max_size)
+
+    def version(self) -> int:
+        return self.repo.get_results_version() if self.shared else self.repo.local_results_version
+
+    def get_or_build(self, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        # The version is read before the data: a result written in between
+        # bumps it, so a body is never filed under a version newer than itself.
+        version = self.version()
+        body = self._entries.get(key, version)
+        if body is None:
+            body = build()
+            self._entries.put(key, version, body)
+        return body
+
+    def metrics(self) -> dict[str, int | float | bool]:
+        return {
+            **self._entries.metrics(),
+            "shared": self.shared,
+            "results_version": self.version(),
+        }
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict
+from pathlib import Path
+
+from app.services.transcription_service import TranscriptionResult
+from app.speech_defaults import DEFAULT_TRANSCRIPTION_CACHE_DISK_MAX_ENTRIES, DEFAULT_TRANSCRIPTION_CACHE_SIZE
+
+# The disk tier is trimmed back to its cap once every this many writes, not on each one.
+DISK_PRUNE_EVERY = 100
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One provider call for a key, shared by every request waiting on it."""
+
+    __slots__ = ("task", "waiters", "abandoned")
+
+    def __init__(self, task: asyncio.Task[TranscriptionResult]) -> None:
+        self.task = task
+        self.waiters = 0
+        # The request whose audio the call reads has gone away; its upload may already be closed.
+        self.abandoned = False
+
+
+class TranscriptionCache:
+    """Transcripts keyed by the SHA-256 of the audio and the provider/model that produced them.
+
+    Lookups go to an in-memory LRU first, then to ``directory`` when a disk
+    tier is configured (entries there survive restarts and are shared by
+    workers). Concurrent requests for the same audio are coalesced: the
+    provider is called once, in a task owned by the cache, and every request
+    awaits it shielded, so one of them going away neither cancels nor fails
+    the call for the rest; the call is cancelled only when nobody waits for it
+    any more. Failures are not cached.
+
+    The disk tier keeps at most ``disk_max_entries`` files, dropping the least
+    recently used ones; workers sharing the directory trim it independently.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = DEFAULT_TRANSCRIPTION_CACHE_SIZE,
+        directory: str | None = None,
+        disk_max_entries: int = DEFAULT_TRANSCRIPTION_CACHE_DISK_MAX_ENTRIES,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        if disk_max_entries < 1:
+            raise ValueError("disk_max_entries must be positive")
+        self.max_size = max_size
+        self.directory = Path(directory) if directory else None
+        self.disk_max_entries = disk_max_entries
+        self._entries: OrderedDict[str, TranscriptionResult] = OrderedDict()
+        self._in_flight: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._coalesced = 0
+        self._misses = 0
+        self._disk_writes = 0
+        self._disk_errors = 0
+
+    @staticmethod
+    def key(data: bytes, *, provider: str, model: str = "") -> str:
+        return TranscriptionCache.key_for_digest(hashlib.sha256(data).hexdigest(), provider=provider, model=model)
+
+    @staticmethod
+    def key_for_digest(audio_sha256: str, *, provider: str, model: str = "") -> str:
+        """Same key as :meth:`key`, from a SHA-256 of the audio computed while it was streamed in."""
+        return hashlib.sha256(f"{provider}\0{model}\0{audio_sha256}".encode("utf-8")).hexdigest()
+
+    async def get_or_transcribe(
+        self, key: str, transcribe: Callable[[], Awaitable[TranscriptionResult]]
+    ) -> TranscriptionResult:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                return result
+
+        if self.directory is not None:
+            result = await asyncio.to_thread(self._read_disk, key)
+            if result is not None:
+                with self._lock:
+                    self._disk_hits += 1
+                self._remember(key, result)
+                return result
+
+        while True:
+            with self._lock:
+                flight = self._in_flight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._in_flight[key] = _Flight(asyncio.ensure_future(self._fly(key, transcribe)))
+                    self._misses += 1
+                flight.waiters += 1
+            try:
+                result = await asyncio.shield(flight.task)
+            except asyncio.CancelledError:
+                with self._lock:
+                    flight.waiters -= 1
+                    flight.abandoned |= leader
+                    if not flight.waiters:
+                        flight.task.cancel()
+                        if self._in_flight.get(key) is flight:
+                            del self._in_flight[key]
+                raise
+            except Exception:
+                with self._lock:
+                    flight.waiters -= 1
+                    # The call read the upload of a request that has since gone away, so its
+                    # failure says nothing about this audio: call again with our own upload.
+                    retry = not leader and flight.abandoned
+                    if not leader and not retry:
+                        self._misses += 1
+                if retry:
+                    continue
+                raise
+            with self._lock:
+                flight.waiters -= 1
+                if not leader:
+                    self._coalesced += 1
+            return result
+
+    async def _fly(self, key: str, transcribe: Callable[[], Awaitable[TranscriptionResult]]) -> TranscriptionResult:
+        try:
+            result = await transcribe()
+            self._remember(key, result)
+            if self.directory is not None:
+                try:
+                    await asyncio.to_thread(self._write_disk, key, result)
+                except OSError:
+                    # The transcript is already in hand; a full or read-only disk only costs the disk tier.
+                    logger.exception("transcription cache disk write failed")
+                    with self._lock:
+                        self._disk_errors += 1
+            return result
+        finally:
+            with self._lock:
+                flight = self._in_flight.get(key)
+                if flight is not None and flight.task is asyncio.current_task():
+                    del self._in_flight[key]
+
+    def _remember(self, key: str, result: TranscriptionResult) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> TranscriptionResult | None:
+        path = self._path(key)
+        try:
+            result = TranscriptionResult(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+        # The modification time doubles as the last use, so pruning keeps entries that are still read.
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return result
+
+    def _write_disk(self, key: str, result: TranscriptionResult) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(asdict(result), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % DISK_PRUNE_EVERY == 0
+        if prune:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        for _, path in entries[: max(0, len(entries) - self.disk_max_entries)]:
+            path.unlink(missing_ok=True)
+
+    def metrics(self) -> dict[str, int | float | bool]:
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits + self._coalesced
+            lookups = hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "disk": self.directory is not None,
+                "disk_max_entries": self.disk_max_entries,
+                "disk_errors": self._disk_errors,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "coalesced": self._coalesced,
+                "misses": self._misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
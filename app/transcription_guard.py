@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from app.services.transcription_service import TranscriptionProviderError
+from app.speech_defaults import (
+    DEFAULT_BREAKER_RESET_SECONDS,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BUDGET_SECONDS,
+)
+
+DEFAULT_RETRY_BASE_DELAY_SECONDS = 0.2
+DEFAULT_RETRY_MAX_DELAY_SECONDS = 2.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+T = TypeVar("T")
+
+
+class ProviderCircuitOpen(TranscriptionProviderError):
+    """The provider has been failing; calls are refused until the breaker lets a probe through."""
+
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("Transcription provider is unavailable", status_code=503, retryable=True)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class TranscriptionGuard:
+    """Retries retryable provider errors and stops calling a provider that keeps failing.
+
+    A retryable :class:`TranscriptionProviderError` (429, 5xx, timeouts) is
+    retried up to ``attempts`` times in total, sleeping a full-jitter
+    exponential backoff in between, but never starting a retry whose backoff
+    would overrun ``budget_seconds`` measured from the first attempt.
+
+    After ``threshold`` consecutive retryable failures the breaker opens and
+    every call fails at once with :class:`ProviderCircuitOpen` instead of
+    waiting for the provider to time out. Once ``reset_seconds`` have passed
+    a single call is let through as a probe: success closes the breaker,
+    failure opens it for another ``reset_seconds``. Other errors, such as a
+    rejected upload, say nothing about the provider's health and are passed
+    through untouched.
+    """
+
+    def __init__(
+        self,
+        *,
+        attempts: int = DEFAULT_RETRY_ATTEMPTS,
+        budget_seconds: float = DEFAULT_RETRY_BUDGET_SECONDS,
+        base_delay_seconds: float = DEFAULT_RETRY_BASE_DELAY_SECONDS,
+        max_delay_seconds: float = DEFAULT_RETRY_MAX_DELAY_SECONDS,
+        threshold: int = DEFAULT_BREAKER_THRESHOLD,
+        reset_seconds: float = DEFAULT_BREAKER_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        jitter: Callable[[float, float], float] = random.uniform,
+    ) -> None:
+        if attempts < 1:
+            raise ValueError("attempts must be positive")
+        if threshold < 1:
+            raise ValueError("threshold must be positive")
+        self.attempts = attempts
+        self.budget_seconds = budget_seconds
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._jitter = jitter
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._calls = 0
+        self._retries = 0
+        self._short_circuited = 0
+        self._opened = 0
+
+    async def call(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Await ``attempt()`` under the retry policy; each retry calls it again from scratch."""
+        started_at = self._clock()
+        for number in range(1, self.attempts + 1):
+            probe = self._admit()
+            try:
+                result = await attempt()
+            except TranscriptionProviderError as exc:
+                if not exc.retryable:
+                    self._settle(probe, healthy=True)
+                    raise
+                self._settle(probe, healthy=False)
+                if number == self.attempts or self.state != CLOSED:
+                    raise
+                delay = self._jitter(0.0, min(self.max_delay_seconds, self.base_delay_seconds * 2 ** (number - 1)))
+                if self._clock() - started_at + delay >= self.budget_seconds:
+                    raise
+                with self._lock:
+                    self._retries += 1
+                await self._sleep(delay)
+            except BaseException:
+                self._settle(probe, healthy=None)
+                raise
+            else:
+                self._settle(probe, healthy=True)
+                return result
+        raise AssertionError("unreachable")
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return self._state
+
+    def _admit(self) -> bool:
+        """Let a call through or raise :class:`ProviderCircuitOpen`; returns whether it is the recovery probe."""
+        with self._lock:
+            self._calls += 1
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self._short_circuited += 1
+            remaining = self.reset_seconds - (self._clock() - self._opened_at)
+            raise ProviderCircuitOpen(max(1, round(remaining)))
+
+    def _settle(self, probe: bool, *, healthy: bool | None) -> None:
+        with self._lock:
+            if probe:
+                self._probing = False
+            if healthy is None:
+                # Cancelled or failed outside the provider: no verdict, but a probe must not stay claimed.
+                return
+            if healthy:
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if probe or (self._state == CLOSED and self._failures >= self.threshold):
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._opened += 1
+
+    def metrics(self) -> dict[str, int | float | str]:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "threshold": self.threshold,
+                "reset_seconds": self.reset_seconds,
+                "calls": self._calls,
+                "retries": self._retries,
+                "short_circuited": self._short_circuited,
+                "opened": self._opened,
+            }
@@ -0,0 +1,70 @@
+import pytest
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.settings import Settings
+
+
+def _play_game(client: TestClient, line: str, card: str) -> int:
+    game_id = client.post(
+        "/games",
+        json={"players": ["alice", "bob"], "card_price_kopecks": 1000, "line_bonus_kopecks": 500},
+    ).json()["game_id"]
+    client.post(f"/games/{game_id}/events/line", json={"players": [line]})
+    client.post(f"/games/{game_id}/events/card", json={"players": [card]})
+    client.post(f"/games/{game_id}/finish")
+    return game_id
+
+
+def test_database_is_opened_on_first_request(tmp_path) -> None:
+    db_path = tmp_path / "lotto.db"
+    client = TestClient(create_app(Settings(db_path=str(db_path))))
+    assert not db_path.exists()
+
+    _play_game(client, line="alice", card="bob")
+
+    assert db_path.exists()
+    assert client.get("/stats/balance").json()["games_finished"] == 1
+
+
+def test_apps_with_different_settings_share_nothing(tmp_path) -> None:
+    first = TestClient(create_app(Settings(db_path=str(tmp_path / "first.db"))))
+    second = TestClient(create_app(Settings(db_path=str(tmp_path / "second.db"))))
+
+    _play_game(first, line="alice", card="bob")
+
+    assert first.get("/stats/balance").json()["games_finished"] == 1
+    assert second.get("/stats/balance").json()["games_finished"] == 0
+
+
+def test_player_stats(tmp_path) -> None:
+    client = TestClient(create_app(Settings(db_path=str(tmp_path / "lotto.db"))))
+    first = _play_game(client, line="alice", card="bob")
+    second = _play_game(client, line="bob", card="bob")
+
+    response = client.get("/stats/player/bob")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["player"] == "bob"
+    assert body["games_count"] == 2
+    assert body["win_rate"] == 1.0
+    assert [game["game_id"] for game in body["history"]] == [second, first]
+    assert body["total_net_kopecks"] == sum(game["net_kopecks"] for game in body["history"])
+
+
+def test_stats_are_served_from_cache_until_a_game_finishes(tmp_path) -> None:
+    client = TestClient(create_app(Settings(db_path=str(tmp_path / "lotto.db"))))
+    _play_game(client, line="alice", card="bob")
+
+    first = client.get("/stats/balance").json()
+    assert client.get("/stats/balance").json() == first
+    _play_game(client, line="alice", card="alice")
+    second = client.get("/stats/balance").json()
+
+    assert second["games_finished"] == first["games_finished"] + 1
+    cache = client.get("/metrics").json()["stats_cache"]
+    assert (cache["hits"], cache["misses"]) == (1, 2)
+    assert cache["results_version"] == 2
@@ -0,0 +1,115 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.services.results_export import export_chunks, main
+from app.settings import Settings
+
+
+def _game(players: list[str], card: str, line: str | None = None, finished_at: str = "2024-03-01T12:00:00") -> dict:
+    return {
+        "players": players,
+        "card_price_kopecks": 1000,
+        "line_bonus_kopecks": 500,
+        "line_winners": [line] if line else [],
+        "card_winners": [card],
+        "finished_at": finished_at,
+    }
+
+
+@pytest.fixture
+def client(tmp_path) -> TestClient:
+    client = TestClient(create_app(Settings(db_path=str(tmp_path / "lotto.db"))))
+    client.post(
+        "/games/batch",
+        json={
+            "games": [
+                _game(["Паша", "Лена"], card="Лена", line="Паша", finished_at="2023-12-31T23:00:00"),
+                _game(["Паша", "Лена", "Альберт"], card="Паша", finished_at="2024-03-01T12:00:00"),
+            ]
+        },
+    )
+    return client
+
+
+def test_ndjson_export_streams_every_result_row(client: TestClient) -> None:
+    response = client.get("/export/results")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["game_id"], row["player"]) for row in rows] == [
+        (1, "Лена"),
+        (1, "Паша"),
+        (2, "Альберт"),
+        (2, "Лена"),
+        (2, "Паша"),
+    ]
+    assert rows[1] == {
+        "game_id": 1,
+        "finished_at": "2023-12-31T23:00:00+00:00",
+        "player": "Паша",
+        "net_kopecks": -500,
+        "card_price_kopecks": 1000,
+        "line_bonus_kopecks": 500,
+        "line_closed": True,
+        "card_closed": False,
+    }
+    assert sum(row["net_kopecks"] for row in rows) == 0
+
+
+def test_csv_export_applies_date_and_player_filters(client: TestClient) -> None:
+    response = client.get(
+        "/export/results", params={"format": "csv", "since": "2024-01-01", "player": "Паша"}
+    )
+
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["game_id"], row["player"], row["card_closed"]) for row in rows] == [("2", "Паша", "1")]
+
+
+def test_export_is_gzipped_when_the_client_accepts_it(client: TestClient) -> None:
+    response = client.get("/export/results", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.text.splitlines()) == 5
+
+
+@pytest.mark.parametrize("accept_encoding", ["gzip;q=0", "identity, *;q=0", "br, deflate", "x-gzip;q=0.0, *"])
+def test_export_is_not_gzipped_when_the_client_refuses_it(client: TestClient, accept_encoding: str) -> None:
+    response = client.get("/export/results", headers={"Accept-Encoding": accept_encoding})
+
+    assert "content-encoding" not in response.headers
+    assert len(response.text.splitlines()) == 5
+
+
+def test_export_is_gzipped_for_a_wildcard_or_weighted_gzip(client: TestClient) -> None:
+    for accept_encoding in ("*", "br;q=1.0, GZIP;q=0.5"):
+        response = client.get("/export/results", headers={"Accept-Encoding": accept_encoding})
+        assert response.headers["content-encoding"] == "gzip"
+
+
+def test_chunks_do_not_grow_with_the_number_of_rows() -> None:
+    rows = ({"game_id": i, "player": "p", "line_closed": False, "card_closed": True} for i in range(10_000))
+
+    chunks = list(export_chunks(rows, "ndjson", rows_per_chunk=100))
+
+    assert len(chunks) == 100
+    assert max(map(len, chunks)) < 10_000
+
+
+def test_cli_writes_gzipped_csv(client: TestClient, tmp_path) -> None:
+    db_path = client.app.state.runtime.settings.db_path
+    output = tmp_path / "results.csv.gz"
+
+    assert main(["--db-path", db_path, "--format", "csv", "--until", "2024-01-01", "--gzip", "-o", str(output)]) == 0
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(output.read_bytes()).decode("utf-8"))))
+    assert {row["player"] for row in rows} == {"Паша", "Лена"}
@@ -0,0 +1,61 @@
+import pytest
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+def _game(**overrides) -> dict:
+    return {
+        "players": ["alice", "bob", "charlie"],
+        "card_price_kopecks": 1000,
+        "line_bonus_kopecks": 500,
+        "line_winners": ["alice"],
+        "card_winners": ["bob"],
+        **overrides,
+    }
+
+
+def test_batch_settles_valid_games_and_reports_errors(client: TestClient) -> None:
+    response = client.post(
+        "/games/batch",
+        json={
+            "games": [
+                _game(finished_at="2024-05-01T18:00:00+03:00"),
+                _game(card_winners=["mallory"]),
+                _game(players=["alice", "alice"]),
+                _game(line_winners=[], card_winners=["alice", "charlie"]),
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 2
+    assert body["failed"] == 2
+    first, unknown, duplicate, split = body["results"]
+    assert [result["index"] for result in body["results"]] == [0, 1, 2, 3]
+    assert "unknown" in unknown["error"]
+    assert "error" in duplicate
+    assert split["game_id"] == first["game_id"] + 1
+    assert split["net"] == {"alice": 500, "bob": -1000, "charlie": 500}
+
+    settlement = client.get(f"/games/{first['game_id']}/settlement")
+    assert settlement.status_code == 200
+    assert settlement.json()["net"] == first["net"]
+    assert settlement.json()["transfers"] == first["transfers"]
+
+
+def test_batch_games_count_in_stats(client: TestClient) -> None:
+    before = client.get("/stats/balance").json()["games_finished"]
+
+    response = client.post("/games/batch", json={"games": [_game(), _game()]})
+
+    assert response.json()["created"] == 2
+    assert client.get("/stats/balance").json()["games_finished"] == before + 2
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from app.api.idempotency import _fingerprint
+from app.idempotency import IdempotencyStore
+from app.main import create_app
+from app.repository import LottoRepository
+from app.runtime import get_service
+from app.session_store import SessionConflictError
+from app.settings import Settings
+
+PLAYERS = {"players": ["alice", "bob"], "card_price_kopecks": 1000, "line_bonus_kopecks": 500}
+
+
+@pytest.fixture
+def client(tmp_path) -> TestClient:
+    return TestClient(create_app(Settings(db_path=str(tmp_path / "lotto.db"))))
+
+
+def test_retried_game_event_is_answered_from_the_stored_response(client: TestClient) -> None:
+    game_id = client.post("/games", json=PLAYERS).json()["game_id"]
+    headers = {"Idempotency-Key": "line-1"}
+
+    first = client.post(f"/games/{game_id}/events/line", json={"players": ["alice"]}, headers=headers)
+    retry = client.post(f"/games/{game_id}/events/line", json={"players": ["alice"]}, headers=headers)
+    without_key = client.post(f"/games/{game_id}/events/line", json={"players": ["alice"]})
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert without_key.status_code == 400
+
+
+def test_retried_session_finish_appends_history_once(client: TestClient) -> None:
+    session_id = client.post("/sessions", json=PLAYERS).json()["session_id"]
+    client.post(f"/sessions/{session_id}/card", json={"players": ["bob"]})
+
+    for _ in range(3):
+        response = client.post(f"/sessions/{session_id}/finish", headers={"Idempotency-Key": "finish-1"})
+        assert response.status_code == 200
+
+    assert client.get(f"/sessions/{session_id}").json()["summary"]["games_count"] == 1
+    metrics = client.get("/metrics").json()["idempotency"]
+    assert (metrics["claims"], metrics["replays"], metrics["keys"]) == (1, 2, 1)
+
+
+def test_key_reused_for_another_request_is_rejected(client: TestClient) -> None:
+    headers = {"Idempotency-Key": "create"}
+    assert client.post("/games", json=PLAYERS, headers=headers).status_code == 200
+
+    response = client.post("/games", json={**PLAYERS, "card_price_kopecks": 2000}, headers=headers)
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["code"] == "idempotency_key_reused"
+
+
+def test_retry_while_the_first_attempt_runs_gets_409(client: TestClient) -> None:
+    body = b'{"players":["alice","bob"],"card_price_kopecks":1000,"line_bonus_kopecks":500}'
+    store = client.app.state.runtime.idempotency
+    scope = {"method": "POST", "path": "/games", "query_string": b""}
+    assert store.claim("in-flight", _fingerprint(scope, body)) is None
+
+    response = client.post(
+        "/games", content=body, headers={"Idempotency-Key": "in-flight", "Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 409
+    assert response.headers["retry-after"] == "1"
+
+
+def test_failed_attempt_can_be_retried(client: TestClient) -> None:
+    class BrokenService:
+        def start_game(self, *args: object) -> int:
+            raise RuntimeError("database is gone")
+
+    client.app.dependency_overrides[get_service] = BrokenService
+    failing = TestClient(client.app, raise_server_exceptions=False)
+    assert failing.post("/games", json=PLAYERS, headers={"Idempotency-Key": "k"}).status_code == 500
+
+    client.app.dependency_overrides.clear()
+    assert client.post("/games", json=PLAYERS, headers={"Idempotency-Key": "k"}).status_code == 200
+
+
+def test_retry_after_a_version_conflict_runs_again(client: TestClient, monkeypatch) -> None:
+    session_id = client.post("/sessions", json=PLAYERS).json()["session_id"]
+    sessions = client.app.state.runtime.sessions
+    save = sessions.save
+
+    def conflicting_save(session: dict) -> None:
+        monkeypatch.setattr(sessions, "save", save)
+        raise SessionConflictError("modified concurrently")
+
+    monkeypatch.setattr(sessions, "save", conflicting_save)
+    headers = {"Idempotency-Key": "line-1"}
+    conflict = client.post(f"/sessions/{session_id}/line", json={"players": ["alice"]}, headers=headers)
+    retry = client.post(f"/sessions/{session_id}/line", json={"players": ["alice"]}, headers=headers)
+
+    assert conflict.status_code == 409
+    assert retry.status_code == 200
+    assert "idempotent-replayed" not in retry.headers
+
+
+def test_keys_are_evicted_by_age_and_count(tmp_path) -> None:
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    store = IdempotencyStore(
+        LottoRepository(str(tmp_path / "lotto.db")), ttl_seconds=60, max_keys=2, wall_clock=lambda: now
+    )
+    for key in ("a", "b", "c"):
+        store.claim(key, "fp")
+        now += timedelta(seconds=1)
+
+    assert store.evict() == 1
+    assert store.claim("a", "fp") is None
+    assert store.claim("c", "fp") is not None
+
+    now += timedelta(seconds=120)
+    assert store.evict() == 3
+    assert store.metrics()["keys"] == 0
+
+
+def test_key_abandoned_mid_request_is_reclaimed_after_the_lease(tmp_path) -> None:
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    store = IdempotencyStore(
+        LottoRepository(str(tmp_path / "lotto.db")), lease_seconds=30, wall_clock=lambda: now
+    )
+    assert store.claim("crashed", "fp") is None
+    assert store.claim("done", "fp") is None
+    store.complete("done", 200, [], b"{}")
+
+    now += timedelta(seconds=10)
+    assert store.claim("crashed", "fp").status_code is None
+
+    now += timedelta(seconds=25)
+    assert store.claim("crashed", "fp") is None
+    assert store.claim("done", "fp").status_code == 200
@@ -0,0 +1,131 @@
+import pytest
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+def _create_session(client: TestClient) -> int:
+    create = client.post(
+        "/sessions",
+        json={
+            "players": ["alice", "bob", "charlie"],
+            "card_price_kopecks": 1000,
+            "line_bonus_kopecks": 500,
+        },
+    )
+    assert create.status_code == 200
+    return create.json()["session_id"]
+
+
+def test_get_session_revalidates_with_etag(client: TestClient) -> None:
+    session_id = _create_session(client)
+
+    first = client.get(f"/sessions/{session_id}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = client.get(f"/sessions/{session_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    client.post(f"/sessions/{session_id}/line", json={"players": ["alice"]})
+    changed = client.get(f"/sessions/{session_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["active_game"]["line_winners"] == ["alice"]
+
+
+def test_get_unknown_session_is_404(client: TestClient) -> None:
+    response = client.get("/sessions/999999999")
+
+    assert response.status_code == 404
+
+
+def _play_game(client: TestClient, session_id: int, line: str, card: str) -> None:
+    client.post(f"/sessions/{session_id}/line", json={"players": [line]})
+    client.post(f"/sessions/{session_id}/card", json={"players": [card]})
+    assert client.post(f"/sessions/{session_id}/finish").status_code == 200
+    assert client.post(f"/sessions/{session_id}/new-game").status_code == 200
+
+
+def test_get_session_paginates_history_and_returns_summary(client: TestClient) -> None:
+    session_id = _create_session(client)
+    for line, card in [("alice", "bob"), ("bob", "charlie"), ("charlie", "alice")]:
+        _play_game(client, session_id, line, card)
+
+    full = client.get(f"/sessions/{session_id}").json()
+    assert [game["game_number"] for game in full["history"]] == [1, 2, 3]
+    summary = full["summary"]
+    assert summary["games_count"] == 3
+    assert summary["last_game_number"] == 3
+    assert sum(summary["totals"].values()) == 0
+    for player, total in summary["totals"].items():
+        assert total == sum(game["net"][player] for game in full["history"])
+        assert summary["totals_rub"][player] == total / 100
+
+    latest = client.get(f"/sessions/{session_id}", params={"history_limit": 1}).json()
+    assert [game["game_number"] for game in latest["history"]] == [3]
+    assert latest["summary"] == summary
+
+    since = client.get(f"/sessions/{session_id}", params={"since_game_number": 1, "history_limit": 1}).json()
+    assert [game["game_number"] for game in since["history"]] == [2]
+    assert "net_rub" in since["history"][0]
+
+    nothing_new = client.get(f"/sessions/{session_id}", params={"since_game_number": 3}).json()
+    assert nothing_new["history"] == []
+
+
+def test_event_stream_for_unknown_session_is_404(client: TestClient) -> None:
+    response = client.get("/sessions/999999999/events")
+
+    assert response.status_code == 404
+
+
+def test_record_game_in_one_request(client: TestClient) -> None:
+    session_id = _create_session(client)
+
+    response = client.post(
+        f"/sessions/{session_id}/games",
+        json={"line_winners": ["alice"], "card_winners": ["bob", " bob "]},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["game"]["game_number"] == 1
+    assert body["game"]["line_winners"] == ["alice"]
+    assert body["game"]["card_winners"] == ["bob"]
+    assert body["game"]["net_rub"]["bob"] == body["game"]["net"]["bob"] / 100
+    assert body["active_game"] == {"game_number": 2, "line_winners": [], "card_winners": []}
+
+    last = client.post(f"/sessions/{session_id}/games", json={"card_winners": ["charlie"], "start_next": False})
+    assert last.status_code == 200
+    assert last.json()["game"]["line_winners"] == []
+    assert last.json()["active_game"]["game_number"] == 2
+
+    repeated = client.post(f"/sessions/{session_id}/finish")
+    assert repeated.status_code == 400
+
+    session = client.get(f"/sessions/{session_id}").json()
+    assert session["summary"]["games_count"] == 2
+
+
+def test_record_game_rejects_unknown_player_atomically(client: TestClient) -> None:
+    session_id = _create_session(client)
+
+    response = client.post(
+        f"/sessions/{session_id}/games",
+        json={"line_winners": ["alice"], "card_winners": ["mallory"]},
+    )
+
+    assert response.status_code == 400
+    session = client.get(f"/sessions/{session_id}").json()
+    assert session["active_game"]["line_winners"] == []
+    assert session["history"] == []
@@ -0,0 +1,77 @@
+import pytest
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.settings import Settings
+
+
+@pytest.fixture
+def client(tmp_path) -> TestClient:
+    return TestClient(create_app(Settings(db_path=str(tmp_path / "lotto.db"))))
+
+
+def _finished_game(client: TestClient) -> dict:
+    game_id = client.post(
+        "/games",
+        json={"players": ["Паша", "Лена", "Альберт"], "card_price_kopecks": 1000, "line_bonus_kopecks": 500},
+    ).json()["game_id"]
+    client.post(f"/games/{game_id}/events/line", json={"players": ["Паша"]})
+    client.post(f"/games/{game_id}/events/card", json={"players": ["Лена"]})
+    return client.post(f"/games/{game_id}/finish").json()
+
+
+def test_settlement_is_served_from_the_ledger_as_immutable(client: TestClient) -> None:
+    finished = _finished_game(client)
+
+    response = client.get(f"/games/{finished['game_id']}/settlement")
+
+    assert response.status_code == 200
+    assert response.json() == finished
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    cached = client.get(f"/games/{finished['game_id']}/settlement", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+
+def test_batch_games_are_written_to_the_ledger(client: TestClient) -> None:
+    created = client.post(
+        "/games/batch",
+        json={"games": [{"players": ["a", "b"], "card_price_kopecks": 1000, "line_bonus_kopecks": 500, "card_winners": ["a"]}]},
+    ).json()["results"][0]
+
+    runtime = client.app.state.runtime
+    assert runtime.repo.get_settlement(created["game_id"]) is not None
+    response = client.get(f"/games/{created['game_id']}/settlement")
+    assert response.json() == {key: created[key] for key in ("game_id", "net", "transfers")}
+
+
+def test_games_finished_before_the_ledger_are_backfilled_on_read(client: TestClient) -> None:
+    finished = _finished_game(client)
+    repo = client.app.state.runtime.repo
+    repo.conn.execute("DELETE FROM settlements")
+    repo.conn.commit()
+
+    first = client.get(f"/games/{finished['game_id']}/settlement")
+    second = client.get(f"/games/{finished['game_id']}/settlement")
+
+    assert first.json() == finished
+    assert repo.get_settlement(finished["game_id"]) is not None
+    assert second.headers["etag"] == first.headers["etag"]
+
+
+def test_unfinished_game_has_no_cacheable_settlement(client: TestClient) -> None:
+    game_id = client.post(
+        "/games",
+        json={"players": ["a", "b"], "card_price_kopecks": 1000, "line_bonus_kopecks": 500},
+    ).json()["game_id"]
+
+    response = client.get(f"/games/{game_id}/settlement")
+
+    assert response.status_code == 400
+    assert "cache-control" not in response.headers
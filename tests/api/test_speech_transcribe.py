@@ -0,0 +1,264 @@
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.runtime import Runtime, get_transcriber
+from app.services.transcription_service import (
+    AudioData,
+    TranscriptionProviderError,
+    TranscriptionResult,
+    create_provider,
+    register_provider,
+)
+from app.settings import Settings
+
+
+class _FakeProvider:
+    name = "fake"
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+        self.calls: list[tuple[str, str, bytes]] = []
+
+    def transcribe(self, *, filename: str, content_type: str, data: AudioData) -> TranscriptionResult:
+        self.calls.append((filename, content_type, data if isinstance(data, bytes) else data.read()))
+        if self.error is not None:
+            raise self.error
+        return TranscriptionResult(text="закрыл линию паша", language="ru", duration_seconds=1.5, provider=self.name)
+
+
+def _client(tmp_path, provider: _FakeProvider | None = None, **settings: object) -> TestClient:
+    app = create_app(Settings(db_path=str(tmp_path / "lotto.db"), **settings))
+    if provider is not None:
+        app.dependency_overrides[get_transcriber] = lambda: provider
+    return TestClient(app)
+
+
+def _upload(client: TestClient, content_type: str = "audio/webm", data: bytes = b"RIFF"):
+    return client.post("/speech/transcribe", files={"file": ("clip.webm", data, content_type)})
+
+
+def test_transcribe_uses_injected_provider(tmp_path) -> None:
+    provider = _FakeProvider()
+    response = _upload(_client(tmp_path, provider))
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "text": "закрыл линию паша",
+        "language": "ru",
+        "duration_seconds": 1.5,
+        "provider": "fake",
+    }
+    assert provider.calls == [("clip.webm", "audio/webm", b"RIFF")]
+
+
+def test_transcribe_maps_provider_errors(tmp_path) -> None:
+    provider = _FakeProvider(TranscriptionProviderError("upstream is down", status_code=503, retryable=True))
+    response = _upload(_client(tmp_path, provider))
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "upstream is down"
+
+
+def test_transcribe_rejects_unsupported_audio_without_calling_provider(tmp_path) -> None:
+    provider = _FakeProvider()
+    response = _upload(_client(tmp_path, provider), content_type="text/plain")
+
+    assert response.status_code == 400
+    assert provider.calls == []
+
+
+def test_unknown_provider_reports_configuration_error(tmp_path) -> None:
+    response = _upload(_client(tmp_path, transcription_provider="nope"))
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Unsupported transcription provider: nope"
+
+
+def test_async_provider_without_httpx_reports_configuration_error(tmp_path, monkeypatch) -> None:
+    monkeypatch.setitem(sys.modules, "httpx", None)
+    monkeypatch.delitem(sys.modules, "app.services.openai_async_transcription", raising=False)
+
+    response = _upload(_client(tmp_path, transcription_provider="openai-async"))
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == 'openai-async requires httpx: pip install ".[async]"'
+
+
+def test_registered_provider_is_resolved_once(tmp_path) -> None:
+    built: list[_FakeProvider] = []
+    register_provider("fake", lambda: built.append(_FakeProvider()) or built[-1])
+    runtime = Runtime(Settings(db_path=str(tmp_path / "lotto.db"), transcription_provider="fake"))
+
+    assert runtime.transcriber is runtime.transcriber
+    assert built == [runtime.transcriber]
+    assert isinstance(create_provider("FAKE"), _FakeProvider)
+
+
+class _BlockingProvider(_FakeProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def transcribe(self, *, filename: str, content_type: str, data: AudioData) -> TranscriptionResult:
+        self.release.wait(timeout=5)
+        return super().transcribe(filename=filename, content_type=content_type, data=data)
+
+
+def test_transcribe_rejects_beyond_concurrency_and_queue(tmp_path) -> None:
+    provider = _BlockingProvider()
+    client = _client(tmp_path, provider, speech_max_concurrency=1, speech_max_queue=1, speech_retry_after_seconds=3)
+    admission = client.app.state.runtime.speech_admission
+    statuses: list[int] = []
+    callers = [
+        threading.Thread(target=lambda data=data: statuses.append(_upload(client, data=data).status_code))
+        for data in (b"RIFF-1", b"RIFF-2")
+    ]
+    for caller in callers:
+        caller.start()
+    deadline = time.monotonic() + 5
+    while admission.metrics()["queued"] + admission.metrics()["active"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    rejected = _upload(client, data=b"RIFF-3")
+    game = client.post("/games", json={"players": ["a", "b"], "card_price_kopecks": 1, "line_bonus_kopecks": 1})
+    provider.release.set()
+    for caller in callers:
+        caller.join()
+
+    assert rejected.status_code == 429
+    assert rejected.headers["retry-after"] == "3"
+    assert game.status_code == 200
+    assert statuses == [200, 200]
+    metrics = client.get("/metrics").json()["speech_admission"]
+    assert (metrics["admitted"], metrics["rejected"], metrics["active"], metrics["queued"]) == (2, 1, 0, 0)
+    assert metrics["wait_seconds_max"] > 0
+
+
+def test_repeated_upload_is_served_from_the_transcription_cache(tmp_path) -> None:
+    provider = _FakeProvider()
+    client = _client(tmp_path, provider)
+
+    first = _upload(client)
+    second = _upload(client)
+
+    assert second.json() == first.json()
+    assert len(provider.calls) == 1
+    cache = client.get("/metrics").json()["transcription_cache"]
+    assert (cache["memory_hits"], cache["misses"], cache["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_transient_provider_error_is_retried(tmp_path) -> None:
+    provider = _FakeProvider(TranscriptionProviderError("rate limited", status_code=502, retryable=True))
+    original = provider.transcribe
+
+    def flaky(**kwargs: object) -> TranscriptionResult:
+        if provider.calls:
+            provider.error = None
+        return original(**kwargs)
+
+    provider.transcribe = flaky
+    response = _upload(_client(tmp_path, provider))
+
+    assert response.status_code == 200
+    assert len(provider.calls) == 2
+
+
+def test_open_breaker_fails_fast_without_calling_provider(tmp_path) -> None:
+    provider = _FakeProvider(TranscriptionProviderError("upstream is down", status_code=503, retryable=True))
+    client = _client(tmp_path, provider, transcription_retry_attempts=1, transcription_breaker_threshold=1)
+
+    assert _upload(client, data=b"RIFF-1").status_code == 503
+    refused = _upload(client, data=b"RIFF-2")
+
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "30"
+    assert len(provider.calls) == 1
+    guard = client.get("/metrics").json()["transcription_guard"]
+    assert (guard["state"], guard["short_circuited"]) == ("open", 1)
+
+
+def test_oversized_upload_is_rejected_while_reading(tmp_path) -> None:
+    provider = _FakeProvider()
+    client = _client(tmp_path, provider, speech_max_upload_bytes=1024)
+
+    assert _upload(client, data=b"x" * 1024).status_code == 200
+    response = _upload(client, data=b"y" * 1025)
+
+    assert response.status_code == 413
+    assert len(provider.calls) == 1
+
+
+def _post_raw(app, headers: list[tuple[bytes, bytes]], chunks: list[bytes]) -> tuple[int, int]:
+    """POST ``chunks`` straight to the ASGI app; returns the status and how many chunks it read."""
+    read = 0
+    statuses = []
+
+    async def receive() -> dict:
+        nonlocal read
+        read += 1
+        return {"type": "http.request", "body": chunks[read - 1], "more_body": read < len(chunks)}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/speech/transcribe",
+        "raw_path": b"/speech/transcribe",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=b"), *headers],
+        "client": ("test", 1),
+        "server": ("test", 80),
+        "app": app,
+    }
+    asyncio.run(app(scope, receive, send))
+    return statuses[0], read
+
+
+def test_oversized_content_length_is_rejected_before_the_body_is_read(tmp_path) -> None:
+    provider = _FakeProvider()
+    app = _client(tmp_path, provider, speech_max_upload_bytes=1024).app
+
+    status, read = _post_raw(app, [(b"content-length", str(10 * 1024 * 1024).encode())], [b"--b\r\n"])
+
+    assert (status, read) == (413, 0)
+    assert provider.calls == []
+
+
+def test_oversized_streamed_body_is_cut_off_while_it_arrives(tmp_path) -> None:
+    provider = _FakeProvider()
+    app = _client(tmp_path, provider, speech_max_upload_bytes=1024).app
+    head = b'--b\r\nContent-Disposition: form-data; name="file"; filename="a.webm"\r\nContent-Type: audio/webm\r\n\r\n'
+
+    status, read = _post_raw(app, [], [head, *(b"x" * 16 * 1024 for _ in range(100))])
+
+    assert status == 413
+    assert read < 10
+    assert provider.calls == []
+
+
+def test_speech_threads_are_stopped_on_shutdown(tmp_path) -> None:
+    provider = _FakeProvider()
+    with _client(tmp_path, provider) as client:
+        assert _upload(client).status_code == 200
+        admission = client.app.state.runtime.speech_admission
+        workers = list(admission._executor._threads)
+
+    assert admission._executor is None
+    for worker in workers:
+        worker.join(timeout=5)
+    assert not any(worker.is_alive() for worker in workers)
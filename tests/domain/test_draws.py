@@ -0,0 +1,50 @@
+import pytest
+
+from app.domain import DomainValidationError, DrawLog, LottoCard, draw_order, replay_draws
+
+
+def _card(player: str, numbers: list[int]) -> LottoCard:
+    return LottoCard(player=player, rows=(tuple(numbers[0:5]), tuple(numbers[5:10]), tuple(numbers[10:15])))
+
+
+def test_draw_order_is_deterministic_permutation() -> None:
+    order = draw_order(42)
+
+    assert order == draw_order(42)
+    assert sorted(order) == list(range(1, 91))
+    assert DrawLog.from_seed(42, count=10).matches_seed()
+    assert not DrawLog(seed=42, numbers=tuple(reversed(order[:10]))).matches_seed()
+
+
+def test_replay_finds_first_line_and_card_with_ties() -> None:
+    order = draw_order(7)
+    cards = [
+        _card("alice", order[0:15]),
+        _card("bob", order[0:15]),
+        _card("carol", [*order[2:4], *order[20:33]]),
+    ]
+
+    outcome = replay_draws(order[:15], cards)
+
+    assert outcome.line_winners == ("alice", "bob")
+    assert outcome.line_draw == 5
+    assert outcome.card_winners == ("alice", "bob")
+    assert outcome.card_draw == 15
+
+
+def test_replay_without_closed_card() -> None:
+    order = draw_order(3)
+
+    outcome = replay_draws(order[:4], [_card("alice", order[0:15])])
+
+    assert outcome.line_winners == ()
+    assert outcome.card_draw is None
+
+
+def test_card_and_draw_validation() -> None:
+    with pytest.raises(DomainValidationError):
+        DrawLog(seed=1, numbers=(1, 1))
+    with pytest.raises(DomainValidationError):
+        DrawLog(seed=1, numbers=(91,))
+    with pytest.raises(DomainValidationError):
+        LottoCard(player="alice", rows=((1, 2, 3, 4, 5),))
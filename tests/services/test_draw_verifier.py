@@ -0,0 +1,107 @@
+import pytest
+
+from app.domain import DrawLog, GameEventType, GameSettings, LottoCard, build_transfers, calculate_net, draw_order
+from app.repository import LottoRepository
+from app.services.draw_verifier import main, verify_games
+
+PLAYERS = ["alice", "bob", "carol"]
+
+
+def _card(player: str, numbers: list[int]) -> LottoCard:
+    return LottoCard(player=player, rows=(tuple(numbers[0:5]), tuple(numbers[5:10]), tuple(numbers[10:15])))
+
+
+def _cards(seed: int) -> list[LottoCard]:
+    order = draw_order(seed)
+    return [_card("alice", order[0:15]), _card("bob", order[20:35]), _card("carol", order[40:55])]
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return str(tmp_path / "lotto.db")
+
+
+def _record_game(repo: LottoRepository, seed: int) -> int:
+    game_id = repo.create_game(PLAYERS, 1000, 500)
+    repo.save_draw_log(game_id, DrawLog(seed=seed, numbers=tuple(draw_order(seed)[:15])), _cards(seed))
+    repo.append_winners(game_id, GameEventType.LINE_CLOSED, ["alice"])
+    repo.append_winners(game_id, GameEventType.CARD_CLOSED, ["alice"])
+    repo.finish_game(game_id)
+    net = calculate_net(PLAYERS, GameSettings(card_price_kopecks=1000, line_bonus_kopecks=500), ["alice"], ["alice"])
+    repo.save_result(game_id, net, build_transfers(net))
+    return game_id
+
+
+def test_verify_games_accepts_consistent_games_across_processes(db_path) -> None:
+    repo = LottoRepository(db_path)
+    game_ids = [_record_game(repo, seed) for seed in range(4)]
+    repo.create_game(PLAYERS, 1000, 500)
+
+    results = verify_games(db_path, workers=2, chunk_size=2)
+
+    assert sorted(result.game_id for result in results) == game_ids
+    assert all(result.ok for result in results)
+
+
+def test_verify_games_reports_tampered_results_and_winners(db_path) -> None:
+    repo = LottoRepository(db_path)
+    tampered_net = _record_game(repo, seed=1)
+    tampered_winners = _record_game(repo, seed=2)
+    repo.append_winners(tampered_winners, GameEventType.LINE_CLOSED, ["bob"])
+    repo.conn.execute(
+        "UPDATE game_results SET net_kopecks = 1 WHERE game_id = ? AND player = 'alice'", (tampered_net,)
+    )
+    repo.conn.commit()
+
+    results = {result.game_id: result for result in verify_games(db_path, workers=1)}
+
+    assert any("net mismatch" in error for error in results[tampered_net].errors)
+    assert any("line winners mismatch" in error for error in results[tampered_winners].errors)
+    assert verify_games(db_path, [999], workers=1)[0].errors == ["game not found"]
+
+
+def test_verify_game_played_through_the_api(db_path) -> None:
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+    from app.settings import Settings
+
+    seed = 7
+    cards = [{"player": card.player, "rows": [list(row) for row in card.rows]} for card in _cards(seed)]
+    with TestClient(create_app(Settings(db_path=db_path))) as client:
+        game_id = client.post(
+            "/games", json={"players": PLAYERS, "card_price_kopecks": 1000, "line_bonus_kopecks": 500}
+        ).json()["game_id"]
+        drawn = client.post(
+            f"/games/{game_id}/draw", json={"seed": seed, "numbers": draw_order(seed)[:15], "cards": cards}
+        )
+        too_big = client.post(
+            f"/games/{game_id}/draw", json={"seed": 2**70, "numbers": draw_order(seed)[:15], "cards": cards}
+        )
+        client.post(f"/games/{game_id}/events/line", json={"players": ["alice"]})
+        client.post(f"/games/{game_id}/events/card", json={"players": ["alice"]})
+        client.post(f"/games/{game_id}/finish")
+        late = client.post(
+            f"/games/{game_id}/draw", json={"seed": seed, "numbers": draw_order(seed)[:15], "cards": cards}
+        )
+
+    assert drawn.status_code == 200
+    assert too_big.status_code == 422
+    assert (late.status_code, late.json()["detail"]) == (400, "game already finished")
+    [result] = verify_games(db_path, workers=1)
+    assert (result.game_id, result.errors) == (game_id, [])
+
+
+def test_cli_refuses_a_missing_or_empty_database(tmp_path, db_path, capsys) -> None:
+    missing = str(tmp_path / "typo.db")
+
+    assert main(["--db-path", missing]) == 2
+    assert not (tmp_path / "typo.db").exists()
+
+    LottoRepository(db_path)
+    assert main(["--db-path", db_path, "--workers", "1"]) == 1
+    assert "no draw logs" in capsys.readouterr().err
+
+    _record_game(LottoRepository(db_path), seed=3)
+    assert main(["--db-path", db_path, "--workers", "1"]) == 0
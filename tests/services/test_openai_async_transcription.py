@@ -0,0 +1,136 @@
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from app.services.openai_async_transcription import AsyncOpenAITranscriptionProvider
+from app.services.transcription_service import TranscriptionProviderError, create_provider
+
+
+class _StandInAPI(BaseHTTPRequestHandler):
+    """Just enough of ``POST /v1/audio/transcriptions`` to exercise the client."""
+
+    protocol_version = "HTTP/1.1"
+    connections: list[tuple[str, int]] = []
+
+    def setup(self) -> None:
+        super().setup()
+        self.connections.append(self.client_address)
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path != "/v1/audio/transcriptions" or self.headers["Authorization"] != "Bearer test-key":
+            self._reply(401, {"error": {"message": "bad credentials"}})
+        elif b'name="model"' not in body or b"whisper-1" not in body:
+            self._reply(400, {"error": {"message": "model is required"}})
+        elif b"slow-audio" in body:
+            time.sleep(0.5)
+            self._reply(200, {"text": "too late"})
+        elif b"busy-audio" in body:
+            self._reply(429, {"error": {"message": "Rate limit reached"}})
+        else:
+            self._reply(200, {"text": "закрыл линию паша", "language": "ru", "duration": 1.5})
+
+    def _reply(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def base_url() -> Iterator[str]:
+    _StandInAPI.connections = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def _provider(base_url: str, **kwargs: float) -> AsyncOpenAITranscriptionProvider:
+    return AsyncOpenAITranscriptionProvider(api_key="test-key", base_url=base_url, **kwargs)
+
+
+def test_calls_reuse_one_pooled_connection(base_url: str) -> None:
+    provider = _provider(base_url)
+
+    async def scenario() -> list:
+        try:
+            return [
+                await provider.transcribe(filename="a.webm", content_type="audio/webm", data=b"RIFF") for _ in range(3)
+            ]
+        finally:
+            await provider.aclose()
+
+    results = asyncio.run(scenario())
+
+    assert [result.text for result in results] == ["закрыл линию паша"] * 3
+    assert (results[0].language, results[0].duration_seconds, results[0].provider) == ("ru", 1.5, "openai-async")
+    assert len(_StandInAPI.connections) == 1
+
+
+def test_read_timeout_is_a_retryable_gateway_timeout(base_url: str) -> None:
+    provider = _provider(base_url, read_timeout_seconds=0.1)
+
+    async def scenario() -> None:
+        try:
+            await provider.transcribe(filename="a.webm", content_type="audio/webm", data=b"slow-audio")
+        finally:
+            await provider.aclose()
+
+    with pytest.raises(TranscriptionProviderError) as exc_info:
+        asyncio.run(scenario())
+
+    assert (exc_info.value.status_code, exc_info.value.retryable) == (504, True)
+
+
+def test_upstream_errors_are_mapped_like_the_blocking_provider(base_url: str) -> None:
+    provider = _provider(base_url)
+
+    async def scenario() -> None:
+        try:
+            await provider.transcribe(filename="a.webm", content_type="audio/webm", data=b"busy-audio")
+        finally:
+            await provider.aclose()
+
+    with pytest.raises(TranscriptionProviderError) as exc_info:
+        asyncio.run(scenario())
+
+    assert str(exc_info.value) == "Rate limit reached"
+    assert (exc_info.value.status_code, exc_info.value.retryable) == (502, True)
+
+
+def test_transcribe_endpoint_with_async_provider(base_url: str, tmp_path, monkeypatch) -> None:
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+    from app.settings import Settings
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+    assert isinstance(create_provider("openai-async"), AsyncOpenAITranscriptionProvider)
+    app = create_app(Settings(db_path=str(tmp_path / "lotto.db"), transcription_provider="openai-async"))
+
+    with TestClient(app) as client:
+        responses = [
+            client.post("/speech/transcribe", files={"file": ("clip.webm", b"RIFF", "audio/webm")}) for _ in range(2)
+        ]
+        provider = client.app.state.runtime.transcriber
+
+    assert [response.json()["text"] for response in responses] == ["закрыл линию паша"] * 2
+    assert len(_StandInAPI.connections) == 1
+    assert provider._client is None
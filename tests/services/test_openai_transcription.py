@@ -0,0 +1,33 @@
+import tempfile
+
+from app.services.openai_transcription import UPLOAD_CHUNK_BYTES, _encode_multipart
+
+FIELDS = {"model": "whisper-1", "response_format": "verbose_json"}
+
+
+def test_multipart_body_streams_a_spooled_file_in_bounded_chunks() -> None:
+    audio = bytes(range(256)) * 1024
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024)
+    spooled.write(audio)
+
+    chunks, length, boundary = _encode_multipart(FIELDS, "file", "clip.webm", "audio/webm", spooled)
+    chunks = list(chunks)
+    body = b"".join(chunks)
+
+    assert length == len(body)
+    assert max(len(chunk) for chunk in chunks) <= UPLOAD_CHUNK_BYTES
+    assert body.endswith(b"\r\n\r\n" + audio + f"\r\n--{boundary}--\r\n".encode())
+    assert b'name="file"; filename="clip.webm"\r\nContent-Type: audio/webm' in body
+
+
+def test_multipart_body_is_rewound_for_a_retry() -> None:
+    spooled = tempfile.SpooledTemporaryFile()
+    spooled.write(b"RIFF")
+
+    first, _, _ = _encode_multipart(FIELDS, "file", "clip.webm", "audio/webm", spooled)
+    first_body = b"".join(first)
+    second, length, _ = _encode_multipart(FIELDS, "file", "clip.webm", "audio/webm", spooled)
+    second_body = b"".join(second)
+
+    assert len(second_body) == length
+    assert first_body.split(b"\r\n", 1)[1].count(b"RIFF") == second_body.split(b"\r\n", 1)[1].count(b"RIFF") == 1
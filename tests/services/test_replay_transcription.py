@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from app.services.replay_transcription import ReplayTranscriptionProvider
+from app.services.transcription_service import (
+    TranscriptionConfigError,
+    TranscriptionProviderError,
+    available_providers,
+    create_provider,
+)
+
+
+def _recordings() -> dict:
+    return {
+        hashlib.sha256(b"RIFF-line").hexdigest(): "закрыл линию паша",
+        hashlib.sha256(b"RIFF-card").hexdigest(): {"text": "закрыл карту лена", "language": "ru", "duration": 2.0},
+    }
+
+
+def test_replays_recorded_transcripts_after_the_configured_latency() -> None:
+    provider = ReplayTranscriptionProvider(_recordings(), latency_seconds=0.05)
+
+    started = time.perf_counter()
+    line = asyncio.run(provider.transcribe(filename="a.webm", content_type="audio/webm", data=b"RIFF-line"))
+    elapsed = time.perf_counter() - started
+    card = asyncio.run(provider.transcribe(filename="b.webm", content_type="audio/webm", data=io.BytesIO(b"RIFF-card")))
+
+    assert elapsed >= 0.05
+    assert (line.text, line.language, line.provider) == ("закрыл линию паша", None, "replay")
+    assert (card.text, card.language, card.duration_seconds) == ("закрыл карту лена", "ru", 2.0)
+
+    with pytest.raises(TranscriptionProviderError) as exc_info:
+        asyncio.run(provider.transcribe(filename="c.webm", content_type="audio/webm", data=b"unrecorded"))
+    assert (exc_info.value.status_code, exc_info.value.retryable) == (422, False)
+
+
+def test_audio_is_hashed_off_the_event_loop(monkeypatch) -> None:
+    provider = ReplayTranscriptionProvider(_recordings())
+    hashed_on = []
+
+    def audio_key(data) -> str:
+        hashed_on.append(threading.get_ident())
+        return hashlib.sha256(data.read()).hexdigest()
+
+    monkeypatch.setattr(provider, "audio_key", audio_key)
+    asyncio.run(provider.transcribe(filename="a.webm", content_type="audio/webm", data=io.BytesIO(b"RIFF-line")))
+
+    assert hashed_on and hashed_on[0] != threading.get_ident()
+
+
+def test_registry_builds_replay_provider_from_env(tmp_path, monkeypatch) -> None:
+    assert "replay" in available_providers()
+
+    monkeypatch.delenv("TRANSCRIPTION_REPLAY_FILE", raising=False)
+    unconfigured = create_provider("replay")
+    with pytest.raises(TranscriptionConfigError):
+        unconfigured.transcribe(filename="a.webm", content_type="audio/webm", data=b"RIFF-line")
+
+    path = tmp_path / "replay.json"
+    path.write_text(json.dumps(_recordings(), ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setenv("TRANSCRIPTION_REPLAY_FILE", str(path))
+    monkeypatch.setenv("TRANSCRIPTION_REPLAY_LATENCY_SECONDS", "0.25")
+    provider = create_provider("replay")
+
+    assert isinstance(provider, ReplayTranscriptionProvider)
+    assert provider.latency_seconds == 0.25
+    assert len(provider.recordings) == 2
+
+
+def test_speech_pipeline_against_replay_calls_the_provider_once_per_clip(tmp_path) -> None:
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from app.services.speech_benchmark import run_in_process
+
+    report = asyncio.run(
+        run_in_process(requests=20, concurrency=5, clips=10, latency_seconds=0.0, db_path=str(tmp_path / "lotto.db"))
+    )
+
+    assert report["errors"] == 0
+    assert report["provider_calls"] == 10
+    assert report["cache_hit_rate"] == 0.5
+
+
+def test_rejected_requests_do_not_count_as_throughput() -> None:
+    httpx = pytest.importorskip("httpx")
+    from app.services.speech_benchmark import drive
+
+    async def scenario() -> dict:
+        transport = httpx.MockTransport(lambda request: httpx.Response(429, json={"detail": "busy"}))
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            return await drive(client, [b"RIFF"], requests=10, concurrency=2)
+
+    report = asyncio.run(scenario())
+
+    assert report["errors"] == 10
+    assert report["throughput"] == 0.0
+    assert report["error_throughput"] > 0
+
+
+@pytest.mark.benchmark
+def test_speech_pipeline_benchmark_against_replay(tmp_path) -> None:
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from app.services.speech_benchmark import run_in_process
+
+    report = asyncio.run(
+        run_in_process(
+            requests=200, concurrency=50, clips=100, latency_seconds=0.02, db_path=str(tmp_path / "lotto.db")
+        )
+    )
+
+    print(
+        f"{report['requests']} requests x{report['concurrency']}: {report['throughput']:.0f} req/s, "
+        f"p50 {report['p50_ms']:.1f} ms, p95 {report['p95_ms']:.1f} ms, cache hit rate {report['cache_hit_rate']:.2f}"
+    )
+    assert report["errors"] == 0
+    assert report["provider_calls"] == 100
+    assert report["cache_hit_rate"] == 0.5
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from app.repository import FinishedGameRow, LottoRepository
+from app.results_snapshot import ResultsSnapshot, SnapshotStats, build_snapshot, day_number
+
+PLAYERS = ["Альберт", "Лена", "Паша", "Оля"]
+
+
+def _games(count: int, *, start_day: int = 0) -> list[FinishedGameRow]:
+    games = []
+    for number in range(count):
+        winner = PLAYERS[number % len(PLAYERS)]
+        net = {player: -1000 for player in PLAYERS}
+        net[winner] = 1000 * (len(PLAYERS) - 1)
+        day = date.fromordinal(date(2022, 1, 1).toordinal() + start_day + number // 3)
+        games.append(
+            FinishedGameRow(
+                players=PLAYERS,
+                card_price_kopecks=1000,
+                line_bonus_kopecks=500,
+                line_winners=[],
+                card_winners=[winner],
+                finished_at=f"{day.isoformat()}T20:00:00+00:00",
+                net=net,
+                transfers=[],
+            )
+        )
+    return games
+
+
+@pytest.fixture
+def repo(tmp_path) -> LottoRepository:
+    repo = LottoRepository(str(tmp_path / "lotto.db"))
+    repo.create_finished_games(_games(30))
+    return repo
+
+
+def test_snapshot_aggregates_match_sql(repo: LottoRepository, tmp_path) -> None:
+    path = str(tmp_path / "results.col")
+    assert build_snapshot(repo, path) == 30 * len(PLAYERS)
+    snapshot = ResultsSnapshot(path)
+
+    assert snapshot.player_summaries() == repo.get_player_summaries()
+    assert snapshot._player_summaries_python(None, None) == repo.get_player_summaries()
+    since, until = date(2022, 1, 3), date(2022, 1, 6)
+    ranged = repo.get_player_summaries(since=since.isoformat(), until=until.isoformat())
+    assert sum(summary["games_count"] for summary in ranged.values()) == 9 * len(PLAYERS)
+    assert snapshot.player_summaries(since_day=day_number(since), until_day=day_number(until)) == ranged
+    assert snapshot._player_summaries_python(day_number(since), day_number(until)) == ranged
+
+
+def test_concurrent_rebuilds_never_publish_a_partial_file(repo: LottoRepository, tmp_path) -> None:
+    path = str(tmp_path / "results.col")
+    errors: list[BaseException] = []
+
+    def rebuild() -> None:
+        worker_repo = LottoRepository(repo.db_path)
+        try:
+            for _ in range(5):
+                build_snapshot(worker_repo, path)
+                assert ResultsSnapshot(path).player_summaries() == repo.get_player_summaries()
+        except BaseException as exc:
+            errors.append(exc)
+
+    workers = [threading.Thread(target=rebuild) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith("results")) == ["results.col"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_stale_snapshot_falls_back_to_sql_until_rebuilt(repo: LottoRepository, tmp_path) -> None:
+    stats = SnapshotStats(repo, str(tmp_path / "results.col"))
+    assert stats.player_summaries() == repo.get_player_summaries()
+    assert stats.rebuild() is True
+    assert stats.rebuild() is False
+    stats.player_summaries()
+
+    repo.create_finished_games(_games(3, start_day=100))
+    assert stats.player_summaries()["Альберт"]["games_count"] == 33
+    assert stats.rebuild() is True
+    assert stats.player_summaries() == repo.get_player_summaries()
+
+    metrics = stats.metrics()
+    assert (metrics["snapshot_queries"], metrics["sql_queries"], metrics["rebuilds"]) == (2, 2, 2)
+    assert metrics["rows"] == 33 * len(PLAYERS)
+
+
+def test_player_summaries_endpoint(tmp_path) -> None:
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+    from app.settings import Settings
+
+    client = TestClient(
+        create_app(Settings(db_path=str(tmp_path / "lotto.db"), stats_snapshot_path=str(tmp_path / "results.col")))
+    )
+    runtime = client.app.state.runtime
+    runtime.repo.create_finished_games(_games(12))
+    runtime.stats_snapshot.rebuild()
+
+    response = client.get("/stats/players", params={"since": "2022-01-02"})
+
+    assert response.status_code == 200
+    assert response.json()["Паша"] == {
+        "games_count": 9,
+        "total_net_kopecks": -1000,
+        "min_net_kopecks": -1000,
+        "max_net_kopecks": 3000,
+        "card_wins": 2,
+    }
+    assert client.get("/metrics").json()["stats_snapshot"]["snapshot_queries"] == 1
+
+
+@pytest.mark.benchmark
+def test_snapshot_benchmark_against_sql(tmp_path) -> None:
+    repo = LottoRepository(str(tmp_path / "lotto.db"))
+    repo.create_finished_games(_games(20_000))
+    path = str(tmp_path / "results.col")
+
+    started = time.perf_counter()
+    build_snapshot(repo, path)
+    build_seconds = time.perf_counter() - started
+    snapshot = ResultsSnapshot(path)
+
+    started = time.perf_counter()
+    from_sql = repo.get_player_summaries()
+    sql_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    from_snapshot = snapshot.player_summaries()
+    snapshot_seconds = time.perf_counter() - started
+
+    print(
+        f"{snapshot.rows} rows: build {build_seconds * 1000:.1f} ms, "
+        f"SQL {sql_seconds * 1000:.1f} ms, snapshot {snapshot_seconds * 1000:.1f} ms"
+    )
+    assert from_snapshot == from_sql
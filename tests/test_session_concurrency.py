@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi import HTTPException
+
+from app.api import sessions as api
+from app.runtime import Runtime
+from app.session_store import SessionStore
+from app.settings import Settings
+
+PLAYERS = ["alice", "bob", "charlie"]
+
+
+@pytest.fixture
+def runtime(tmp_path) -> Runtime:
+    return Runtime(Settings(db_path=str(tmp_path / "lotto.db")))
+
+
+@pytest.fixture
+def store(runtime: Runtime) -> SessionStore:
+    return runtime.sessions
+
+
+def _create_session(runtime: Runtime) -> int:
+    payload = api.SessionCreateRequest(players=PLAYERS, card_price_kopecks=1000, line_bonus_kopecks=500)
+    return api.create_session(payload, sessions=runtime.sessions)["session_id"]
+
+
+def _play_rounds(runtime: Runtime, session_id: int, rounds: int) -> tuple[int, int, int]:
+    deps = {"sessions": runtime.sessions, "events": runtime.session_events}
+    finished = rejected = conflicts = 0
+    for round_number in range(rounds):
+        winners = api.SessionWinnersRequest(players=[PLAYERS[round_number % 3]])
+        try:
+            api.session_line(session_id, winners, **deps)
+            api.session_card(session_id, winners, **deps)
+            api.finish_session_game(session_id, **deps)
+            finished += 1
+        except HTTPException as exc:
+            if exc.status_code == 409:
+                conflicts += 1
+            else:
+                rejected += 1
+        api.new_game_in_session(session_id, **deps)
+    return finished, rejected, conflicts
+
+
+def _run(runtime: Runtime, jobs: list[int], rounds: int, workers: int) -> list[tuple[int, int, int]]:
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda session_id: _play_rounds(runtime, session_id, rounds), jobs))
+
+
+def test_hammering_one_session_never_loses_or_duplicates_games(runtime: Runtime, store: SessionStore) -> None:
+    session_id = _create_session(runtime)
+
+    results = _run(runtime, [session_id] * 8, rounds=25, workers=8)
+
+    finished = sum(result[0] for result in results)
+    history = store.get(session_id)["history"]
+    numbers = list(history.game_numbers)
+    assert sum(result[2] for result in results) == 0
+    assert len(history) == finished
+    assert numbers == sorted(set(numbers))
+    assert sum(history.totals().values()) == 0
+
+
+def test_many_sessions_progress_in_parallel(runtime: Runtime, store: SessionStore) -> None:
+    session_ids = [_create_session(runtime) for _ in range(32)]
+
+    results = _run(runtime, session_ids, rounds=10, workers=16)
+
+    assert all(result == (10, 0, 0) for result in results)
+    for session_id in session_ids:
+        history = store.get(session_id)["history"]
+        assert list(history.game_numbers) == list(range(1, 11))
+
+
+@pytest.mark.benchmark
+def test_session_mutation_throughput(runtime: Runtime) -> None:
+    one_session = [_create_session(runtime)] * 8
+    many_sessions = [_create_session(runtime) for _ in range(32)]
+
+    started = time.perf_counter()
+    _run(runtime, one_session, rounds=25, workers=8)
+    one_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    _run(runtime, many_sessions, rounds=10, workers=16)
+    many_seconds = time.perf_counter() - started
+
+    print(
+        f"one session: {8 * 25 * 4 / one_seconds:.0f} mutations/s, "
+        f"32 sessions: {32 * 10 * 4 / many_seconds:.0f} mutations/s"
+    )
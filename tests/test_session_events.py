@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from app.session_events import RESYNC_FRAME, SessionEventBroker, format_event
+
+
+def test_format_event_builds_sse_frame() -> None:
+    frame = format_event("game_finished", {"game_number": 1, "net": {"Паша": 500}}, event_id=7)
+
+    assert frame == 'id: 7\nevent: game_finished\ndata: {"game_number":1,"net":{"Паша":500}}\n\n'
+
+
+def test_publish_from_worker_thread_fans_out_to_all_watchers() -> None:
+    async def scenario() -> None:
+        broker = SessionEventBroker()
+        watchers = [broker.subscribe(1) for _ in range(300)]
+        other_session = broker.subscribe(2)
+
+        await asyncio.to_thread(broker.publish, 1, "game_started", {"game_number": 2}, event_id=3)
+        frames = await asyncio.gather(*(asyncio.wait_for(watcher.queue.get(), 1) for watcher in watchers))
+
+        assert {frame for frame in frames} == {format_event("game_started", {"game_number": 2}, event_id=3)}
+        assert other_session.queue.empty()
+        assert broker.metrics()["subscribers"] == 301
+
+        for watcher in watchers:
+            broker.unsubscribe(watcher)
+        assert broker.metrics()["sessions_watched"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_slow_watcher_is_resynced_without_blocking_others() -> None:
+    async def scenario() -> None:
+        broker = SessionEventBroker(queue_size=2)
+        fast = broker.subscribe(1)
+        slow = broker.subscribe(1)
+        received = []
+
+        for number in range(5):
+            await asyncio.to_thread(broker.publish, 1, "game_finished", {"game_number": number})
+            received.append(json.loads((await asyncio.wait_for(fast.queue.get(), 1)).split("data: ")[1]))
+
+        assert [event["game_number"] for event in received] == [0, 1, 2, 3, 4]
+        assert slow.queue.qsize() == 1
+        assert slow.queue.get_nowait() == RESYNC_FRAME
+        assert broker.metrics()["dropped"] > 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_resyncs_on_changes_made_by_another_worker(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("fastapi")
+    from app.api import sessions as api
+    from app.runtime import Runtime
+    from app.settings import Settings
+
+    settings = Settings(db_path=str(tmp_path / "lotto.db"))
+    watched, writer = Runtime(settings), Runtime(settings)
+    payload = api.SessionCreateRequest(players=["alice", "bob"], card_price_kopecks=1000, line_bonus_kopecks=500)
+    session_id = api.create_session(payload, sessions=writer.sessions)["session_id"]
+    monkeypatch.setattr(api, "SSE_KEEPALIVE_SECONDS", 0.05)
+
+    async def scenario() -> list[str]:
+        response = await api.session_event_stream(session_id, sessions=watched.sessions, events=watched.session_events)
+        frames = response.body_iterator
+        received = [await anext(frames), await anext(frames)]
+        await asyncio.to_thread(
+            api.session_line,
+            session_id,
+            api.SessionWinnersRequest(players=["alice"]),
+            sessions=writer.sessions,
+            events=writer.session_events,
+        )
+        received.append(await anext(frames))
+        await frames.aclose()
+        return received
+
+    ready, idle, changed = asyncio.run(scenario())
+
+    assert ready.startswith("id: 1\nevent: ready")
+    assert idle == ": keepalive\n\n"
+    assert changed == format_event("resync", {}, event_id=2)
@@ -0,0 +1,102 @@
+import copy
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from app.domain import GameSettings, build_transfers, calculate_net
+from app.session_history import SessionHistory
+
+PLAYERS = ["Альберт", "Паша", "Лена", "Оля"]
+SETTINGS = GameSettings(card_price_kopecks=1000, line_bonus_kopecks=500)
+
+
+def _game(number: int) -> dict:
+    line_winners = [PLAYERS[number % 4]]
+    card_winners = [PLAYERS[(number + 1) % 4], PLAYERS[(number + 2) % 4]]
+    net = calculate_net(PLAYERS, SETTINGS, line_winners, card_winners)
+    return {
+        "game_number": number,
+        "line_winners": line_winners,
+        "card_winners": card_winners,
+        "net": net,
+        "transfers": build_transfers(net),
+        "finished_at": datetime(2025, 1, 1, 12, 30, number % 60, 123456),
+    }
+
+
+def test_entry_materializes_dict_view() -> None:
+    history = SessionHistory(PLAYERS)
+    game = _game(1)
+    history.append(**game)
+
+    entry = history.entry(-1)
+
+    assert entry == {**game, "finished_at": "2025-01-01T12:30:01.123456"}
+    assert list(history) == [entry]
+
+
+def test_state_round_trip_and_legacy_lists() -> None:
+    history = SessionHistory(PLAYERS)
+    for number in range(1, 4):
+        history.append(**_game(number))
+
+    assert SessionHistory.from_state(PLAYERS, history.to_state()) == history
+    assert SessionHistory.from_state(PLAYERS, list(history)) == history
+
+
+def test_deepcopy_is_independent() -> None:
+    history = SessionHistory(PLAYERS)
+    history.append(**_game(1))
+
+    clone = copy.deepcopy(history)
+    clone.append(**_game(2))
+
+    assert len(history) == 1
+    assert len(clone) == 2
+
+
+def _allocated(build) -> tuple[int, object]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        value = build()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")), value
+
+
+@pytest.mark.benchmark
+def test_memory_benchmark_thousand_games() -> None:
+    games = [_game(number) for number in range(1, 1001)]
+
+    def build_dicts() -> list:
+        return [
+            {
+                **game,
+                "line_winners": list(game["line_winners"]),
+                "card_winners": list(game["card_winners"]),
+                "net": dict(game["net"]),
+                "transfers": [dict(transfer) for transfer in game["transfers"]],
+                "net_rub": {player: amount / 100 for player, amount in game["net"].items()},
+                "transfers_rub": [
+                    {**transfer, "amount_rub": transfer["amount_kopecks"] / 100} for transfer in game["transfers"]
+                ],
+                "finished_at": game["finished_at"].isoformat(),
+            }
+            for game in games
+        ]
+
+    def build_compact() -> SessionHistory:
+        history = SessionHistory(PLAYERS)
+        for game in games:
+            history.append(**game)
+        return history
+
+    dict_bytes, _ = _allocated(build_dicts)
+    compact_bytes, compact = _allocated(build_compact)
+
+    print(f"1000 games: dict history {dict_bytes} B, compact history {compact_bytes} B")
+    assert len(compact) == 1000
+    assert compact_bytes * 10 < dict_bytes
@@ -0,0 +1,99 @@
+import pytest
+
+from app.repository import LottoRepository
+from app.session_history import SessionHistory
+from app.session_store import SessionConflictError, SessionStore
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _state(players: list[str]) -> dict:
+    return {
+        "players": players,
+        "card_price_kopecks": 1000,
+        "line_bonus_kopecks": 500,
+        "active_game": {"game_number": 1, "line_winners": [], "card_winners": []},
+        "history": SessionHistory(players),
+    }
+
+
+def test_sessions_survive_restart(tmp_path) -> None:
+    db_path = str(tmp_path / "lotto.db")
+    store = SessionStore(LottoRepository(db_path))
+    session = store.create(_state(["alice", "bob"]))
+    session["active_game"]["line_winners"] = ["alice"]
+    store.save(session)
+
+    restarted = SessionStore(LottoRepository(db_path))
+    loaded = restarted.get(session["session_id"])
+
+    assert loaded == session
+    assert restarted.metrics()["misses"] == 1
+
+
+def test_lru_cache_is_bounded_and_counts_evictions(tmp_path) -> None:
+    store = SessionStore(LottoRepository(str(tmp_path / "lotto.db")), max_size=2)
+    first = store.create(_state(["a", "b"]))
+    second = store.create(_state(["c", "d"]))
+    store.get(first["session_id"])
+    third = store.create(_state(["e", "f"]))
+
+    metrics = store.metrics()
+    assert metrics["cached"] == 2
+    assert metrics["evictions"] == 1
+
+    assert store.get(first["session_id"]) is first
+    assert store.get(third["session_id"]) is third
+    assert store.get(second["session_id"]) == second
+    assert store.metrics()["hits"] == 3
+    assert store.metrics()["misses"] == 1
+
+
+def test_ttl_expires_cached_sessions(tmp_path) -> None:
+    clock = _Clock()
+    store = SessionStore(LottoRepository(str(tmp_path / "lotto.db")), ttl_seconds=10, clock=clock)
+    session = store.create(_state(["a", "b"]))
+
+    clock.now = 11
+    reloaded = store.get(session["session_id"])
+
+    assert reloaded == session
+    assert reloaded is not session
+    assert store.metrics()["expirations"] == 1
+
+
+def test_concurrent_writers_conflict_instead_of_losing_updates(tmp_path) -> None:
+    db_path = str(tmp_path / "lotto.db")
+    worker_a = SessionStore(LottoRepository(db_path))
+    worker_b = SessionStore(LottoRepository(db_path))
+    session_id = worker_a.create(_state(["a", "b"]))["session_id"]
+
+    first = worker_a.get_for_update(session_id)
+    second = worker_b.get_for_update(session_id)
+    first["active_game"]["line_winners"] = ["a"]
+    worker_a.save(first)
+
+    second["active_game"]["line_winners"] = ["b"]
+    with pytest.raises(SessionConflictError):
+        worker_b.save(second)
+
+    current = worker_b.get(session_id)
+    assert current["version"] == 2
+    assert current["active_game"]["line_winners"] == ["a"]
+    assert worker_a.get(session_id) is first
+
+
+def test_get_for_update_returns_private_copy(tmp_path) -> None:
+    store = SessionStore(LottoRepository(str(tmp_path / "lotto.db")))
+    session_id = store.create(_state(["a", "b"]))["session_id"]
+
+    draft = store.get_for_update(session_id)
+    draft["active_game"]["line_winners"] = ["a"]
+
+    assert store.get(session_id)["active_game"]["line_winners"] == []
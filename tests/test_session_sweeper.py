@@ -0,0 +1,82 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.repository import LottoRepository
+from app.session_history import SessionHistory
+from app.session_store import SessionConflictError, SessionStore
+from app.session_sweeper import SessionSweeper
+
+
+class _WallClock:
+    def __init__(self) -> None:
+        self.now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def _state(players: list[str]) -> dict:
+    return {
+        "players": players,
+        "card_price_kopecks": 1000,
+        "line_bonus_kopecks": 500,
+        "active_game": {"game_number": 1, "line_winners": [], "card_winners": []},
+        "history": SessionHistory(players),
+    }
+
+
+def test_sweeper_archives_idle_sessions_in_batches(tmp_path) -> None:
+    clock = _WallClock()
+    repo = LottoRepository(str(tmp_path / "lotto.db"))
+    store = SessionStore(repo, wall_clock=clock)
+    idle = store.create(_state(["alice", "bob"]))
+    idle["active_game"]["card_winners"] = ["alice"]
+    store.save(idle)
+    active = store.create(_state(["carol", "dave"]))
+    other_idle = store.create(_state(["erin", "frank"]))
+
+    clock.now += timedelta(hours=2)
+    store.save(active)
+    clock.now += timedelta(minutes=30)
+
+    sweeper = SessionSweeper(store, idle_ttl_seconds=3600, batch_size=1)
+    archived = asyncio.run(sweeper.sweep())
+
+    assert archived == 2
+    assert store.get(idle["session_id"]) is None
+    assert store.get(other_idle["session_id"]) is None
+    assert store.get(active["session_id"]) == active
+    assert store.metrics()["live"] == 1
+    assert store.metrics()["archived"] == 2
+    assert sweeper.metrics()["archived"] == 2
+    assert sweeper.metrics()["sweeps"] == 1
+
+    # Archiving keeps the row as is: the unfinished game is not settled.
+    row = repo.conn.execute("SELECT state_json FROM sessions WHERE id = ?", (idle["session_id"],)).fetchone()
+    state = json.loads(row["state_json"])
+    assert state["active_game"]["card_winners"] == ["alice"]
+    assert state["history"]["game_numbers"] == []
+
+
+def test_archived_session_cannot_be_saved(tmp_path) -> None:
+    clock = _WallClock()
+    store = SessionStore(LottoRepository(str(tmp_path / "lotto.db")), wall_clock=clock)
+    session = store.create(_state(["alice", "bob"]))
+    stale = store.get_for_update(session["session_id"])
+
+    clock.now += timedelta(days=8)
+    assert store.archive_idle(idle_ttl_seconds=7 * 24 * 3600, batch_size=10) == [session["session_id"]]
+
+    stale["active_game"]["line_winners"] = ["bob"]
+    with pytest.raises(SessionConflictError):
+        store.save(stale)
+    assert store.version(session["session_id"]) is None
+
+
+def test_sweeper_disabled_with_zero_ttl(tmp_path) -> None:
+    store = SessionStore(LottoRepository(str(tmp_path / "lotto.db")))
+
+    assert not SessionSweeper(store, idle_ttl_seconds=0).enabled
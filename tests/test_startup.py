@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Self time of the app's own modules (route and model definitions included); FastAPI itself is excluded.
+APP_IMPORT_BUDGET_MS = 250
+# Whole `import app.main`, framework included; catches a heavy dependency creeping back in.
+TOTAL_IMPORT_BUDGET_MS = 3000
+
+LAZY_MODULES = (
+    "sqlalchemy",
+    "app.storage",
+    "app.services.openai_transcription",
+    "urllib.request",
+    "app.services.draw_verifier",
+    "numpy",
+)
+
+SPEECH_MODULES = (
+    "app.api.speech",
+    "app.services.command_parser",
+    "app.services.transcription_service",
+    "app.speech_admission",
+    "app.transcription_cache",
+    "app.transcription_guard",
+)
+
+
+def _import_app(cwd: Path, **env: str) -> tuple[set[str], dict[str, tuple[int, int]]]:
+    """Import ``app.main`` in a fresh interpreter; returns loaded modules and ``-X importtime`` rows."""
+    code = "import sys, app.main; print(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": str(ROOT), **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        timings[name] = (int(self_us), int(cumulative_us))
+    return set(result.stdout.split()), timings
+
+
+def test_import_has_no_side_effects_and_loads_no_optional_modules(tmp_path) -> None:
+    modules, _ = _import_app(tmp_path)
+
+    assert list(tmp_path.iterdir()) == []
+    assert not [name for name in modules if name.startswith(LAZY_MODULES)]
+
+
+def test_session_only_deployment_skips_the_speech_router(tmp_path) -> None:
+    modules, _ = _import_app(tmp_path, SPEECH_API_ENABLED="0")
+
+    assert not [name for name in modules if name.startswith(SPEECH_MODULES)]
+
+
+@pytest.mark.benchmark
+def test_import_time_budget(tmp_path) -> None:
+    _, timings = _import_app(tmp_path)
+
+    app_self_ms = sum(self_us for name, (self_us, _) in timings.items() if name.split(".")[0] == "app") / 1000
+    total_ms = timings["app.main"][1] / 1000
+    print(f"import app.main: {total_ms:.0f} ms total, {app_self_ms:.0f} ms in app modules")
+    assert app_self_ms < APP_IMPORT_BUDGET_MS
+    assert total_ms < TOTAL_IMPORT_BUDGET_MS
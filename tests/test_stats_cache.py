@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from app.repository import FinishedGameRow, LottoRepository
+from app.stats_cache import StatsCache
+
+
+def _finished_game() -> FinishedGameRow:
+    return FinishedGameRow(
+        players=["alice", "bob"],
+        card_price_kopecks=1000,
+        line_bonus_kopecks=500,
+        line_winners=[],
+        card_winners=["alice"],
+        finished_at="2024-01-01T00:00:00+00:00",
+        net={"alice": 1000, "bob": -1000},
+        transfers=[{"from": "bob", "to": "alice", "amount_kopecks": 1000}],
+    )
+
+
+def _balance(repo: LottoRepository) -> bytes:
+    return json.dumps(repo.get_global_balance()).encode()
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_cache_is_reused_until_a_result_is_written(tmp_path, shared: bool) -> None:
+    repo = LottoRepository(str(tmp_path / "lotto.db"))
+    cache = StatsCache(repo, shared=shared)
+    builds = []
+
+    def build() -> bytes:
+        builds.append(1)
+        return _balance(repo)
+
+    assert cache.get_or_build(("balance",), build) == b"{}"
+    assert cache.get_or_build(("balance",), build) == b"{}"
+    repo.create_finished_games([_finished_game()])
+    assert json.loads(cache.get_or_build(("balance",), build)) == {"alice": 1000, "bob": -1000}
+
+    game_id = repo.create_game(["alice", "bob"], 1000, 500)
+    repo.save_result(game_id, {"alice": -1000, "bob": 1000}, [{"from": "alice", "to": "bob", "amount_kopecks": 1000}])
+    assert json.loads(cache.get_or_build(("balance",), build)) == {"alice": 0, "bob": 0}
+
+    assert len(builds) == 3
+    metrics = cache.metrics()
+    assert (metrics["hits"], metrics["misses"]) == (1, 3)
+    assert metrics["hit_rate"] == 0.25
+
+
+def test_shared_version_sees_writes_from_other_workers(tmp_path) -> None:
+    db_path = str(tmp_path / "lotto.db")
+    worker = LottoRepository(db_path)
+    other_worker = LottoRepository(db_path)
+    shared = StatsCache(worker, shared=True)
+    local = StatsCache(worker, shared=False)
+
+    shared.get_or_build(("balance",), lambda: _balance(worker))
+    local.get_or_build(("balance",), lambda: _balance(worker))
+    other_worker.create_finished_games([_finished_game()])
+
+    assert shared.get_or_build(("balance",), lambda: _balance(worker)) != b"{}"
+    assert local.get_or_build(("balance",), lambda: _balance(worker)) == b"{}"
+    assert worker.get_results_version() == 1
+
+
+def test_keys_are_cached_independently(tmp_path) -> None:
+    repo = LottoRepository(str(tmp_path / "lotto.db"))
+    cache = StatsCache(repo)
+
+    assert cache.get_or_build(("player", "alice"), lambda: b"alice") == b"alice"
+    assert cache.get_or_build(("player", "bob"), lambda: b"bob") == b"bob"
+    assert cache.get_or_build(("player", "alice"), lambda: b"stale") == b"alice"
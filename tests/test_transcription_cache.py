@@ -0,0 +1,203 @@
+import asyncio
+
+import pytest
+
+from app.services.transcription_service import TranscriptionProviderError, TranscriptionResult
+from app.transcription_cache import DISK_PRUNE_EVERY, TranscriptionCache
+
+
+class _Provider:
+    def __init__(self, error: Exception | None = None) -> None:
+        self.calls = 0
+        self.error = error
+
+    async def transcribe(self) -> TranscriptionResult:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return TranscriptionResult(text=f"call {self.calls}", language="ru", duration_seconds=1.0, provider="fake")
+
+
+def _key(data: bytes, model: str = "whisper-1") -> str:
+    return TranscriptionCache.key(data, provider="fake", model=model)
+
+
+def test_identical_audio_is_transcribed_once_and_evicted_lru() -> None:
+    cache = TranscriptionCache(max_size=2)
+    provider = _Provider()
+
+    async def scenario() -> list[str]:
+        texts = []
+        for data in (b"a", b"a", b"b", b"c", b"a"):
+            texts.append((await cache.get_or_transcribe(_key(data), provider.transcribe)).text)
+        return texts
+
+    assert asyncio.run(scenario()) == ["call 1", "call 1", "call 2", "call 3", "call 4"]
+    assert _key(b"a") != _key(b"a", model="whisper-2")
+    metrics = cache.metrics()
+    assert (metrics["memory_hits"], metrics["misses"], metrics["size"]) == (1, 4, 2)
+    assert metrics["hit_rate"] == 0.2
+
+
+def test_concurrent_identical_uploads_share_one_provider_call() -> None:
+    cache = TranscriptionCache()
+    provider = _Provider()
+
+    async def scenario() -> list[TranscriptionResult]:
+        return await asyncio.gather(*(cache.get_or_transcribe(_key(b"shout"), provider.transcribe) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert provider.calls == 1
+    assert {result.text for result in results} == {"call 1"}
+    assert cache.metrics()["coalesced"] == 4
+
+
+def test_failures_reach_every_waiter_and_are_not_cached() -> None:
+    cache = TranscriptionCache()
+    failing = _Provider(TranscriptionProviderError("upstream is down", status_code=503, retryable=True))
+
+    async def scenario() -> list:
+        return await asyncio.gather(
+            *(cache.get_or_transcribe(_key(b"shout"), failing.transcribe) for _ in range(3)), return_exceptions=True
+        )
+
+    errors = asyncio.run(scenario())
+
+    assert failing.calls == 1
+    assert all(isinstance(error, TranscriptionProviderError) for error in errors)
+    retried = asyncio.run(cache.get_or_transcribe(_key(b"shout"), _Provider().transcribe))
+    assert retried.text == "call 1"
+
+
+def test_disk_tier_is_shared_across_instances(tmp_path) -> None:
+    provider = _Provider()
+    first = TranscriptionCache(directory=str(tmp_path))
+    asyncio.run(first.get_or_transcribe(_key(b"shout"), provider.transcribe))
+
+    second = TranscriptionCache(directory=str(tmp_path))
+    result = asyncio.run(second.get_or_transcribe(_key(b"shout"), provider.transcribe))
+
+    assert provider.calls == 1
+    assert result == TranscriptionResult(text="call 1", language="ru", duration_seconds=1.0, provider="fake")
+    assert second.metrics()["disk_hits"] == 1
+
+
+def test_unwritable_disk_tier_does_not_fail_the_transcription(tmp_path) -> None:
+    not_a_directory = tmp_path / "cache"
+    not_a_directory.write_text("", encoding="utf-8")
+    cache = TranscriptionCache(directory=str(not_a_directory))
+    provider = _Provider()
+
+    async def scenario() -> list[TranscriptionResult]:
+        return await asyncio.gather(*(cache.get_or_transcribe(_key(b"shout"), provider.transcribe) for _ in range(3)))
+
+    assert [result.text for result in asyncio.run(scenario())] == ["call 1"] * 3
+    assert provider.calls == 1
+    assert cache.metrics()["disk_errors"] == 1
+
+
+def test_cache_size_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        TranscriptionCache(max_size=0)
+
+
+def test_cancelled_follower_does_not_fail_the_leader() -> None:
+    cache = TranscriptionCache()
+    provider = _Provider()
+
+    async def scenario() -> TranscriptionResult:
+        leader = asyncio.create_task(cache.get_or_transcribe(_key(b"shout"), provider.transcribe))
+        follower = asyncio.create_task(cache.get_or_transcribe(_key(b"shout"), provider.transcribe))
+        await asyncio.sleep(0)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(scenario()).text == "call 1"
+    assert provider.calls == 1
+    assert cache.metrics()["coalesced"] == 0
+
+
+def test_cancelled_leader_still_answers_followers() -> None:
+    cache = TranscriptionCache()
+    provider = _Provider()
+
+    async def scenario() -> list[TranscriptionResult]:
+        leader = asyncio.create_task(cache.get_or_transcribe(_key(b"shout"), provider.transcribe))
+        await asyncio.sleep(0)
+        followers = [
+            asyncio.create_task(cache.get_or_transcribe(_key(b"shout"), provider.transcribe)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    assert [result.text for result in asyncio.run(scenario())] == ["call 1", "call 1"]
+    assert provider.calls == 1
+
+
+def test_followers_call_again_when_an_abandoned_leader_fails() -> None:
+    cache = TranscriptionCache()
+    closed = _Provider(ValueError("I/O operation on closed file"))
+    provider = _Provider()
+
+    async def scenario() -> TranscriptionResult:
+        leader = asyncio.create_task(cache.get_or_transcribe(_key(b"shout"), closed.transcribe))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_transcribe(_key(b"shout"), provider.transcribe))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()).text == "call 1"
+    assert (closed.calls, provider.calls) == (1, 1)
+
+
+def test_call_nobody_waits_for_is_cancelled() -> None:
+    cache = TranscriptionCache()
+    provider = _Provider()
+
+    async def scenario() -> None:
+        leader = asyncio.create_task(cache.get_or_transcribe(_key(b"shout"), provider.transcribe))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0.02)
+
+    asyncio.run(scenario())
+
+    assert cache.metrics()["size"] == 0
+    assert asyncio.run(cache.get_or_transcribe(_key(b"shout"), provider.transcribe)).text == "call 2"
+
+
+def test_failed_coalesced_waits_are_not_hits() -> None:
+    cache = TranscriptionCache()
+    failing = _Provider(TranscriptionProviderError("upstream is down", status_code=503, retryable=True))
+
+    async def scenario() -> None:
+        await asyncio.gather(
+            *(cache.get_or_transcribe(_key(b"shout"), failing.transcribe) for _ in range(3)), return_exceptions=True
+        )
+
+    asyncio.run(scenario())
+
+    metrics = cache.metrics()
+    assert (metrics["coalesced"], metrics["misses"], metrics["hit_rate"]) == (0, 3, 0.0)
+
+
+def test_disk_tier_keeps_the_most_recently_used_entries(tmp_path) -> None:
+    cache = TranscriptionCache(max_size=1, directory=str(tmp_path), disk_max_entries=10)
+    provider = _Provider()
+
+    async def scenario() -> None:
+        await cache.get_or_transcribe(_key(b"kept"), provider.transcribe)
+        for index in range(DISK_PRUNE_EVERY - 1):
+            await cache.get_or_transcribe(_key(str(index).encode()), provider.transcribe)
+            if index % 10 == 0:
+                await cache.get_or_transcribe(_key(b"kept"), provider.transcribe)
+
+    asyncio.run(scenario())
+
+    assert len(list(tmp_path.glob("*/*.json"))) == 10
+    kept = _key(b"kept")
+    assert (tmp_path / kept[:2] / f"{kept}.json").exists()
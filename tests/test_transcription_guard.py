@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from app.services.transcription_service import TranscriptionProviderError
+from app.transcription_guard import ProviderCircuitOpen, TranscriptionGuard
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class _Upstream:
+    def __init__(self, *outcomes: Exception | str) -> None:
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _down() -> TranscriptionProviderError:
+    return TranscriptionProviderError("upstream is down", status_code=503, retryable=True)
+
+
+def _guard(clock: _Clock, **kwargs: float) -> TranscriptionGuard:
+    return TranscriptionGuard(clock=clock, sleep=clock.sleep, jitter=lambda low, high: high, **kwargs)
+
+
+def test_retryable_errors_are_retried_with_exponential_backoff() -> None:
+    clock = _Clock()
+    guard = _guard(clock, attempts=3, base_delay_seconds=0.2)
+    upstream = _Upstream(_down(), _down(), "ok")
+
+    assert asyncio.run(guard.call(upstream)) == "ok"
+    assert upstream.calls == 3
+    assert clock.sleeps == [0.2, 0.4]
+    assert guard.metrics()["retries"] == 2
+    assert guard.metrics()["consecutive_failures"] == 0
+
+
+def test_retries_stop_at_the_latency_budget_and_skip_client_errors() -> None:
+    clock = _Clock()
+    guard = _guard(clock, attempts=5, base_delay_seconds=1.0, budget_seconds=2.5)
+    upstream = _Upstream(_down(), _down(), _down())
+
+    with pytest.raises(TranscriptionProviderError):
+        asyncio.run(guard.call(upstream))
+    assert clock.sleeps == [1.0]
+
+    rejected = _Upstream(TranscriptionProviderError("bad audio", status_code=502))
+    with pytest.raises(TranscriptionProviderError):
+        asyncio.run(guard.call(rejected))
+    assert rejected.calls == 1
+    assert guard.metrics()["consecutive_failures"] == 0
+
+
+def test_breaker_fails_fast_then_probes_for_recovery() -> None:
+    clock = _Clock()
+    guard = _guard(clock, attempts=1, threshold=2, reset_seconds=30.0)
+    upstream = _Upstream(_down(), _down(), _down(), "ok")
+
+    for _ in range(2):
+        with pytest.raises(TranscriptionProviderError):
+            asyncio.run(guard.call(upstream))
+    with pytest.raises(ProviderCircuitOpen) as exc_info:
+        asyncio.run(guard.call(upstream))
+    assert (upstream.calls, exc_info.value.retry_after_seconds, guard.state) == (2, 30, "open")
+
+    clock.now += 30.0
+    assert guard.state == "half_open"
+    with pytest.raises(TranscriptionProviderError):
+        asyncio.run(guard.call(upstream))
+    assert guard.state == "open"
+
+    clock.now += 30.0
+    assert asyncio.run(guard.call(upstream)) == "ok"
+    metrics = guard.metrics()
+    assert (metrics["state"], metrics["opened"], metrics["short_circuited"]) == ("closed", 2, 1)
+
+
+def test_only_one_probe_is_let_through_while_half_open() -> None:
+    clock = _Clock()
+    guard = _guard(clock, attempts=1, threshold=1, reset_seconds=5.0)
+    with pytest.raises(TranscriptionProviderError):
+        asyncio.run(guard.call(_Upstream(_down())))
+    clock.now += 5.0
+
+    async def slow_probe() -> str:
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def scenario() -> list:
+        return await asyncio.gather(guard.call(slow_probe), guard.call(slow_probe), return_exceptions=True)
+
+    first, second = asyncio.run(scenario())
+
+    assert first == "ok"
+    assert isinstance(second, ProviderCircuitOpen)
+    assert guard.state == "closed"